@@ -0,0 +1,70 @@
+import json
+from typing import Dict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Headroom for multipart boundaries and part headers on top of the file bytes
+MULTIPART_OVERHEAD = 64 * 1024
+
+class _BodyTooLarge(Exception):
+    pass
+
+class RequestSizeLimitMiddleware:
+    """
+    Reject request bodies larger than a per-path limit before they are parsed.
+
+    FastAPI spools the whole multipart body before any dependency or endpoint
+    runs, so upload size checks there come too late. A declared
+    Content-Length over the limit is answered with 413 straight away; bodies
+    without one (chunked uploads) are counted as they are received and cut
+    off with 413 once they cross the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = {path.rstrip("/"): limit for path, limit in limits.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope.get("path", "").rstrip("/")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            # The app's own error response for the aborted body is replaced by the 413
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            pass
+        if exceeded:
+            await self._reject(send, limit)
+
+    async def _reject(self, send: Send, limit: int) -> None:
+        body = json.dumps({"detail": f"Request body exceeds the maximum size of {limit} bytes"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
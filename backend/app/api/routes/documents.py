@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.config import settings
+from app.core.security import get_optional_user
+from app.core.dependencies import get_vector_store, get_file_store, get_queue_service, get_answer_cache, get_lexical_index
+from app.domain.models.document import DocumentStatus
+from app.domain.ports.queue import QueueService
+from app.domain.ports.vector_store import VectorStore
+from app.infrastructure.database.models import get_db
+from app.infrastructure.database.document_repository import DocumentRepository
+from app.infrastructure.storage.file_store import FileStore
+
+router = APIRouter()
+
+def _is_visible(record, user: Optional[str]) -> bool:
+    # Shared documents are visible to everyone, private ones only to their owner
+    return not record.owner or record.owner == user
+
+def _is_admin(user: Optional[str]) -> bool:
+    return user is not None and user in settings.ADMIN_USERS
+
+@router.get("/documents")
+async def list_documents(
+    status: Optional[DocumentStatus] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    user: Optional[str] = Depends(get_optional_user)
+):
+    """List registered documents, newest first; signed-in users see their own and shared ones, anonymous callers only shared ones."""
+    records = await DocumentRepository(db).list(
+        status=status.value if status else None, limit=limit, offset=offset, owner=user
+    )
+    return {"documents": [record.to_dict() for record in records]}
+
+@router.get("/documents/{document_id}")
+async def get_document(
+    document_id: str,
+    db: AsyncSession = Depends(get_db),
+    user: Optional[str] = Depends(get_optional_user)
+):
+    """Return a document's registry entry and ingestion status."""
+    record = await DocumentRepository(db).get(document_id)
+    # Other users' documents are reported as missing so their IDs are not confirmed
+    if record is None or not _is_visible(record, user):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return record.to_dict()
+
+@router.delete("/documents/{document_id}")
+async def delete_document(
+    document_id: str,
+    db: AsyncSession = Depends(get_db),
+    vector_store: VectorStore = Depends(get_vector_store),
+    file_store: FileStore = Depends(get_file_store),
+    queue: QueueService = Depends(get_queue_service),
+    user: Optional[str] = Depends(get_optional_user)
+):
+    """Remove a document's chunks from the index, its stored file and its registry entry; users delete their own documents, administrators any."""
+    repository = DocumentRepository(db)
+    record = await repository.get(document_id)
+    # Other users' documents are reported as missing so their IDs are not confirmed
+    if record is None or not (_is_visible(record, user) or _is_admin(user)):
+        raise HTTPException(status_code=404, detail="Document not found")
+    # Shared documents are used by everyone, so only administrators remove them
+    if not record.owner and not _is_admin(user):
+        raise HTTPException(status_code=403, detail="Only administrators can delete shared documents")
+    if record.status == DocumentStatus.PROCESSING.value:
+        raise HTTPException(status_code=409, detail="Document is being processed, try again later")
+
+    # Chunks are filtered on the indexed document_id metadata field
+    await vector_store.delete_document_chunks(document_id)
+    lexical_index = get_lexical_index()
+    if lexical_index:
+        await lexical_index.delete_document_chunks(document_id)
+    await repository.delete(document_id)
+    # Stored files are content-addressed, so another owner's copy may share the path
+    if record.file_path and not await repository.files_in_use([record.file_path]):
+        await file_store.delete_file(record.file_path)
+
+    answer_cache = get_answer_cache()
+    if answer_cache:
+        answer_cache.invalidate_document(document_id)
+    await queue.publish_event({"type": "deleted", "document_id": document_id})
+
+    return {"status": "deleted", "document_id": document_id}
@@ -1,44 +1,242 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, BackgroundTasks
+from app.core.config import settings
 from app.core.dependencies import get_queue_service, get_file_store
+from app.core.security import get_optional_user
 from app.domain.ports.queue import QueueService
-from app.infrastructure.storage.file_store import FileStore
-from app.domain.models.document import Document
+from app.infrastructure.storage.file_store import FileStore, FileTooLargeError
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.models.search_filter import SHARED_OWNER
+from app.infrastructure.database.models import get_db
+from app.infrastructure.database.document_repository import DocumentRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+import hashlib
 import shutil
 import os
+import tarfile
+import zipfile
 
 router = APIRouter()
 
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2")
+
+def _iter_archive_members(file: UploadFile) -> Iterator[Tuple[str, BinaryIO]]:
+    """Yield (filename, file object) for every regular file inside a zip or tar upload."""
+    name = file.filename.lower()
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(file.file) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, member
+    else:
+        with tarfile.open(fileobj=file.file, mode="r:*") as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                member = archive.extractfile(info)
+                if member is not None:
+                    yield info.name, member
+
+def _is_hidden(member_name: str) -> bool:
+    return any(part.startswith(".") or part == "__MACOSX" for part in Path(member_name).parts)
+
+def _reject_if_too_large(file: UploadFile) -> None:
+    # The multipart parser already knows the part size; fail before copying anything
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{file.filename} exceeds the maximum upload size of {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+
+def _document_id(content_sha256: str, owner: Optional[str]) -> str:
+    """Content hash, namespaced per owner so users' private copies of a file stay separate."""
+    if not owner:
+        return content_sha256
+    return hashlib.sha256(f"{owner}\x00{content_sha256}".encode("utf-8")).hexdigest()
+
+def _is_known(record) -> bool:
+    # Failed documents may be retried by uploading them again
+    return record is not None and record.status != DocumentStatus.FAILED.value
+
 @router.post("/ingest")
 async def ingest_document(
     file: UploadFile = File(...),
     queue: QueueService = Depends(get_queue_service),
-    file_store: FileStore = Depends(get_file_store)
+    file_store: FileStore = Depends(get_file_store),
+    db: AsyncSession = Depends(get_db),
+    owner: Optional[str] = Depends(get_optional_user),
+    replaces: Optional[str] = Form(None)
 ):
+    """
+    Queue a document for indexing.
+
+    Every upload is its own source unless `replaces` names an existing
+    document, in which case this upload becomes that document's new version:
+    unchanged chunks keep their embeddings and the old version is removed
+    once the new one is indexed.
+    """
     try:
-        # Save file contents
-        content = await file.read()
-        saved_path = await file_store.save_file(file.filename, content)
+        _reject_if_too_large(file)
+
+        repository = DocumentRepository(db)
+        replaced = None
+        if replaces:
+            replaced = await repository.get(replaces)
+            if replaced is None:
+                raise HTTPException(status_code=404, detail="Document to replace not found")
+            if (replaced.owner or None) != (owner or None):
+                raise HTTPException(status_code=403, detail="Not allowed to replace this document")
 
-        # Create document record (in memory/db if we had one, for now just passing ID)
+        # Stream file contents to disk in chunks instead of reading them into memory
+        stored = await file_store.save_stream(file.filename, file.file)
+
+        # Document identity is the content hash, so re-uploading the same bytes is a no-op
         doc = Document(
+            id=_document_id(stored.sha256, owner),
             filename=file.filename,
             content="", # We don't store full content in model here to save memory
             content_type=file.content_type,
-            size=len(content)
+            size=stored.size
         )
 
+        existing = await repository.get(doc.id)
+        if _is_known(existing):
+            # A duplicate uploaded under another name was written to a new path nothing refers to
+            if stored.created and not await repository.files_in_use([stored.path]):
+                await file_store.delete_file(stored.path)
+            return {"status": existing.status, "document_id": doc.id, "filename": doc.filename, "duplicate": True}
+        # Same-named uploads are unrelated unless the client explicitly replaces a document
+        source_id = replaced.source_id if replaced is not None else doc.id
+        await repository.save_queued([doc], [source_id], [stored.path], owner=owner)
+
         # Push to queue
         message = {
             "document_id": doc.id,
+            "source_id": source_id,
             "filename": doc.filename,
-            "file_path": saved_path
+            "file_path": stored.path,
+            "size": stored.size,
+            "owner": owner or SHARED_OWNER
         }
         
         success = await queue.publish(message)
         if not success:
+            await repository.set_status(doc.id, DocumentStatus.FAILED, error="Failed to queue document")
             raise HTTPException(status_code=500, detail="Failed to queue document")
 
         return {"status": "queued", "document_id": doc.id, "filename": doc.filename}
     
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ingest/bulk")
+async def ingest_documents_bulk(
+    files: List[UploadFile] = File(...),
+    queue: QueueService = Depends(get_queue_service),
+    file_store: FileStore = Depends(get_file_store),
+    db: AsyncSession = Depends(get_db),
+    owner: Optional[str] = Depends(get_optional_user)
+):
+    """Ingest many files, or zip/tar archives of files, publishing all jobs in one round trip."""
+    try:
+        staged = []
+        created_paths = []
+        staged_bytes = 0
+
+        async def stage(filename: str, content_type: str, fileobj: BinaryIO):
+            nonlocal staged_bytes
+            filename = Path(filename).name
+            # Archive members are only capped one by one; the whole request shares one budget
+            stored = await file_store.save_stream(
+                filename, fileobj, max_size=settings.MAX_BULK_UPLOAD_SIZE - staged_bytes
+            )
+            staged_bytes += stored.size
+            if stored.created:
+                created_paths.append(stored.path)
+            doc = Document(
+                id=_document_id(stored.sha256, owner),
+                filename=filename,
+                content="",
+                content_type=content_type,
+                size=stored.size
+            )
+            staged.append((doc, doc.id, stored.path))
+
+        try:
+            for file in files:
+                if file.filename.lower().endswith(ARCHIVE_SUFFIXES):
+                    # Archives are bounded by the request budget; their members by the per-file cap
+                    for member_name, member in _iter_archive_members(file):
+                        if _is_hidden(member_name):
+                            continue
+                        await stage(member_name, "application/octet-stream", member)
+                else:
+                    _reject_if_too_large(file)
+                    await stage(file.filename, file.content_type, file.file)
+        except BaseException:
+            # Nothing of a rejected request is queued, so drop the files it already wrote
+            for path in created_paths:
+                await file_store.delete_file(path)
+            raise
+
+        # Skip documents whose exact contents are already known
+        repository = DocumentRepository(db)
+        existing = await repository.get_many(doc.id for doc, _, _ in staged)
+        documents = []
+        to_queue = {}
+        for doc, source_id, file_path in staged:
+            record = existing.get(doc.id)
+            if _is_known(record):
+                status = record.status
+            else:
+                status = DocumentStatus.QUEUED.value
+                to_queue.setdefault(doc.id, (doc, source_id, file_path))
+            documents.append({"document_id": doc.id, "filename": doc.filename, "size": doc.size, "status": status})
+
+        queued = list(to_queue.values())
+        # Duplicates uploaded under another name were written to paths nothing refers to
+        unused = set(created_paths) - {file_path for _, _, file_path in queued}
+        for path in unused - await repository.files_in_use(unused):
+            await file_store.delete_file(path)
+
+        await repository.save_queued(
+            [doc for doc, _, _ in queued],
+            [source_id for _, source_id, _ in queued],
+            [file_path for _, _, file_path in queued],
+            owner=owner
+        )
+        messages = [
+            {
+                "document_id": doc.id,
+                "source_id": source_id,
+                "filename": doc.filename,
+                "file_path": file_path,
+                "size": doc.size,
+                "owner": owner or SHARED_OWNER
+            }
+            for doc, source_id, file_path in queued
+        ]
+
+        success = await queue.publish_many(messages)
+        if not success:
+            for doc, _, _ in queued:
+                await repository.set_status(doc.id, DocumentStatus.FAILED, error="Failed to queue document")
+            raise HTTPException(status_code=500, detail="Failed to queue documents")
+
+        return {"status": "queued", "count": len(messages), "documents": documents}
+
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid archive: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,8 @@
+import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, status
+from pydantic import ValidationError
 from app.core.dependencies import get_rag_service
+from app.domain.models.search_filter import SearchFilter, SHARED_OWNER
 from app.services.rag_service import RAGService
 from app.core.security import get_current_user
 import logging
@@ -7,6 +10,26 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def parse_message(data: str, username: str):
+    """
+    Split a chat message into the query and its search filter.
+
+    Messages are either plain query text or JSON {"query": ..., "filters": {...}}.
+    The owner restriction is always replaced so users only search their own
+    and shared documents.
+    """
+    query, filters = data, {}
+    try:
+        message = json.loads(data)
+    except ValueError:
+        message = None
+    if isinstance(message, dict) and "query" in message:
+        query, filters = str(message["query"]), message.get("filters") or {}
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be a JSON object")
+    search_filter = SearchFilter.model_validate({**filters, "owners": [username, SHARED_OWNER]})
+    return query, search_filter
+
 @router.websocket("/chat")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -14,7 +37,7 @@ async def websocket_endpoint(
     rag_service: RAGService = Depends(get_rag_service)
 ):
     try:
-        await get_current_user(token)
+        username = await get_current_user(token)
     except Exception:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
@@ -24,9 +47,14 @@ async def websocket_endpoint(
         while True:
             data = await websocket.receive_text()
             logger.info(f"Received query: {data}")
-            
+            try:
+                query, search_filter = parse_message(data, username)
+            except (ValidationError, ValueError) as e:
+                await websocket.send_json({"type": "error", "payload": f"Invalid filters: {e}"})
+                continue
+
             # Streaming response
-            async for message in rag_service.query_stream(data):
+            async for message in rag_service.query_stream(query, search_filter):
                 await websocket.send_json(message)
             
     except WebSocketDisconnect:
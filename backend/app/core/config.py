@@ -1,4 +1,4 @@
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,6 +6,8 @@ class Settings(BaseSettings):
     APP_NAME: str = "RAG System"
     API_V1_STR: str = "/api/v1"
     DEBUG: bool = False
+    # Usernames allowed to delete shared documents and any user's documents
+    ADMIN_USERS: List[str] = []
     
     # LLM Provider Config
     LLM_PROVIDER: Literal["openai", "groq", "gemini", "local"] = "openai"
@@ -15,17 +17,90 @@ class Settings(BaseSettings):
     LOCAL_LLM_URL: str = "http://localhost:11434"
     
     # Vector DB Config
+    VECTOR_BACKEND: Literal["chroma", "numpy", "ivf"] = "chroma"
     VECTOR_DB_PATH: str = "./chroma_db"
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    VECTOR_STORE_WORKERS: int = 4
+    VECTOR_UPSERT_BATCH_SIZE: int = 5000
+    VECTOR_UPSERT_CONCURRENCY: int = 2
+    VECTOR_INDEX_PATH: str = "./vector_index"
+    VECTOR_IVF_NLIST: int = 1024
+    VECTOR_IVF_NPROBE: int = 16
+    VECTOR_QUANTIZATION: Literal["none", "int8", "binary"] = "none"
+    VECTOR_RERANK_FACTOR: int = 4
+    VECTOR_SHARDING: Literal["none", "tenant", "hash"] = "none"
+    VECTOR_SHARD_COUNT: int = 8
+    VECTOR_MAX_OPEN_SHARDS: int = 16
+    
+    # Embedding Inference Config
+    EMBEDDING_MAX_WORKERS: int = 2
+    EMBEDDING_MAX_PENDING: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: Optional[str] = "./embedding_cache/embeddings.db"
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 50000
+    EMBEDDING_BACKEND: Literal["torch", "onnx", "int8"] = "torch"
+    EMBEDDING_ONNX_FILE: Optional[str] = None  # e.g. onnx/model_qint8_avx2.onnx for a pre-quantized export
+    EMBEDDING_THREADS: Optional[int] = None
+    EMBEDDING_MAX_SEQ_LENGTH: Optional[int] = None
+    EMBEDDING_ENCODE_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_TOKENS: Optional[int] = None  # Padded-token cap per encode batch
+    EMBEDDING_PARITY_CHECK: bool = False
+    EMBEDDING_PARITY_MIN_COSINE: float = 0.99
     
     # Redis Config
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_QUEUE_NAME: str = "rag_ingestion_queue"
+    REDIS_EVENTS_CHANNEL: str = "rag_document_events"
+    QUEUE_VISIBILITY_TIMEOUT: int = 300
+    QUEUE_MAX_RETRIES: int = 3
+    QUEUE_RETRY_BACKOFF_SECONDS: float = 5.0
+    QUEUE_POLL_TIMEOUT: int = 5
+    
+    # Retrieval Config
+    RETRIEVAL_TOP_K: int = 3
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_CANDIDATES: int = 20
+    RRF_K: int = 60
+    LEXICAL_INDEX_PATH: str = "./lexical_index/bm25.db"
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    # Terms in more than this fraction of chunks only score chunks matched by rarer query terms
+    BM25_COMMON_TERM_RATIO: float = 0.1
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_TIMEOUT_MS: float = 300.0
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_MAX_LENGTH: int = 256
+    RERANK_MAX_WORKERS: int = 1
+
+    # Prompt Context Config (input tokens spent on retrieved context per provider)
+    CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {"openai": 6000, "groq": 4000, "gemini": 8000, "local": 2000}
+    CONTEXT_ENCODING: str = "cl100k_base"
+    CONTEXT_DEDUP_THRESHOLD: float = 0.9
+
+    # Semantic Answer Cache Config
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    
+    # Upload Config
+    MAX_UPLOAD_SIZE: int = 200 * 1024 * 1024
+    MAX_BULK_UPLOAD_SIZE: int = 1024 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
     
     # Ingestion Config
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
+    INGEST_BATCH_SIZE: int = 256
+    INGEST_PDF_WORKERS: Optional[int] = None
+    INGEST_PAGES_PER_TASK: int = 8
+    INGEST_MAX_INFLIGHT_TASKS: int = 4
+    WORKER_CONCURRENCY: int = 4
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
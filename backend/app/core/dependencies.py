@@ -1,17 +1,25 @@
 from functools import lru_cache
 from app.core.config import settings
+from app.core.logging import logger
 from app.infrastructure.llm.factory import get_llm_provider
-from app.infrastructure.vector.chroma_store import ChromaVectorStore
+from app.infrastructure.vector.factory import create_vector_store
 from app.infrastructure.queue.redis_queue import RedisQueue
 from app.infrastructure.storage.file_store import FileStore
 from app.infrastructure.embedding.embedding_service import EmbeddingService
+from app.infrastructure.embedding.embedding_cache import EmbeddingCache
+from app.infrastructure.embedding.inference_executor import InferenceExecutor
+from app.infrastructure.embedding.micro_batcher import MicroBatchEmbedder
+from app.infrastructure.embedding.reranker import CrossEncoderReranker
+from app.infrastructure.lexical.bm25_index import SqliteBM25Index
 from app.services.rag_service import RAGService
 from app.services.context_builder import ContextBuilder
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.retriever import HybridRetriever
 
 # Singletons
 @lru_cache()
 def get_vector_store():
-    return ChromaVectorStore()
+    return create_vector_store()
 
 @lru_cache()
 def get_queue_service():
@@ -19,20 +27,114 @@ def get_queue_service():
 
 @lru_cache()
 def get_file_store():
-    return FileStore()
+    return FileStore(chunk_size=settings.UPLOAD_CHUNK_SIZE, max_size=settings.MAX_UPLOAD_SIZE)
 
 @lru_cache()
 def get_context_builder():
-    return ContextBuilder()
+    return ContextBuilder(
+        token_budget=settings.CONTEXT_TOKEN_BUDGETS.get(settings.LLM_PROVIDER, 3000),
+        encoding_name=settings.CONTEXT_ENCODING,
+        near_duplicate_threshold=settings.CONTEXT_DEDUP_THRESHOLD
+    )
 
 @lru_cache()
 def get_embedding_service():
-    return EmbeddingService()
+    executor = InferenceExecutor(
+        max_workers=settings.EMBEDDING_MAX_WORKERS,
+        max_pending=settings.EMBEDDING_MAX_PENDING,
+        name="embedding"
+    )
+    cache = None
+    if settings.EMBEDDING_CACHE_ENABLED:
+        cache = EmbeddingCache(
+            path=settings.EMBEDDING_CACHE_PATH,
+            memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS
+        )
+    service = EmbeddingService(
+        model_name=settings.EMBEDDING_MODEL,
+        executor=executor,
+        cache=cache,
+        backend=settings.EMBEDDING_BACKEND,
+        threads=settings.EMBEDDING_THREADS,
+        max_seq_length=settings.EMBEDDING_MAX_SEQ_LENGTH,
+        batch_size=settings.EMBEDDING_ENCODE_BATCH_SIZE,
+        onnx_file=settings.EMBEDDING_ONNX_FILE,
+        max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS
+    )
+    if settings.EMBEDDING_PARITY_CHECK:
+        drift = service.check_parity()
+        log = logger.warning if drift["min_cosine"] < settings.EMBEDDING_PARITY_MIN_COSINE else logger.info
+        log(f"Embedding parity of {settings.EMBEDDING_BACKEND} backend vs PyTorch reference: {drift}")
+    return service
+
+@lru_cache()
+def get_query_embedder():
+    return MicroBatchEmbedder(
+        embedding_service=get_embedding_service(),
+        window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+        max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE
+    )
+
+@lru_cache()
+def get_answer_cache():
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    return SemanticAnswerCache(
+        similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+        ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+        max_entries=settings.ANSWER_CACHE_MAX_ENTRIES
+    )
+
+@lru_cache()
+def get_lexical_index():
+    if not settings.HYBRID_SEARCH_ENABLED:
+        return None
+    return SqliteBM25Index(
+        path=settings.LEXICAL_INDEX_PATH,
+        k1=settings.BM25_K1,
+        b=settings.BM25_B,
+        common_term_ratio=settings.BM25_COMMON_TERM_RATIO
+    )
+
+@lru_cache()
+def get_retriever():
+    lexical_index = get_lexical_index()
+    if lexical_index is None:
+        return None
+    return HybridRetriever(
+        vector_store=get_vector_store(),
+        lexical_index=lexical_index,
+        candidates=settings.HYBRID_CANDIDATES,
+        rrf_k=settings.RRF_K
+    )
+
+@lru_cache()
+def get_reranker():
+    if not settings.RERANK_ENABLED:
+        return None
+    executor = InferenceExecutor(
+        max_workers=settings.RERANK_MAX_WORKERS,
+        max_pending=settings.EMBEDDING_MAX_PENDING,
+        name="rerank"
+    )
+    return CrossEncoderReranker(
+        model_name=settings.RERANK_MODEL,
+        executor=executor,
+        batch_size=settings.RERANK_BATCH_SIZE,
+        max_length=settings.RERANK_MAX_LENGTH
+    )
 
 def get_rag_service():
     return RAGService(
         llm_provider=get_llm_provider(),
         vector_store=get_vector_store(),
         context_builder=get_context_builder(),
-        embedding_service=get_embedding_service()
+        embedding_service=get_embedding_service(),
+        query_embedder=get_query_embedder(),
+        answer_cache=get_answer_cache(),
+        retriever=get_retriever(),
+        top_k=settings.RETRIEVAL_TOP_K,
+        reranker=get_reranker(),
+        rerank_candidates=settings.RERANK_CANDIDATES,
+        rerank_timeout=settings.RERANK_TIMEOUT_MS / 1000
     )
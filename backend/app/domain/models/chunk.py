@@ -1,12 +1,27 @@
 from uuid import uuid4
-from typing import Dict, Any, List
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, Optional
+import numpy as np
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer
+
+def _as_float32(value: Any) -> np.ndarray:
+    # Arrays from the model pass through without a copy; lists are converted once
+    return np.asarray(value, dtype=np.float32)
+
+# Contiguous float32 vector; validated as one array instead of float by float
+Embedding = Annotated[
+    np.ndarray,
+    BeforeValidator(_as_float32),
+    PlainSerializer(lambda vector: vector.tolist(), return_type=list, when_used="json"),
+]
 
 class Chunk(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     id: str = Field(default_factory=lambda: str(uuid4()))
     document_id: str
     content: str
-    embedding: List[float] = Field(default_factory=list)
+    embedding: Embedding = Field(default_factory=lambda: np.empty(0, dtype=np.float32))
     metadata: Dict[str, Any] = Field(default_factory=dict)
     page_number: int = 0
     chunk_index: int = 0
+    score: Optional[float] = None  # Similarity to the query (higher is closer); set on search results only
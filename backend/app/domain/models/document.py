@@ -1,8 +1,15 @@
 from datetime import datetime
+from enum import Enum
 from uuid import uuid4
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 
+class DocumentStatus(str, Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    INDEXED = "indexed"
+    FAILED = "failed"
+
 class Document(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     filename: str
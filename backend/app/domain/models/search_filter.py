@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+# Owner recorded for documents uploaded without authentication; visible to everyone
+SHARED_OWNER = ""
+
+class SearchFilter(BaseModel):
+    """
+    Structured restriction of a search to a subset of chunks.
+
+    Every set field must match (AND); list fields match any of their values
+    (IN). Date bounds apply to the time the chunk's document was indexed.
+    """
+    owners: Optional[List[str]] = None
+    document_ids: Optional[List[str]] = None
+    filenames: Optional[List[str]] = None
+    indexed_after: Optional[datetime] = None
+    indexed_before: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return not any(value is not None for value in self.model_dump().values())
+
+    def matches_nothing(self) -> bool:
+        """True when a list field is set but empty, so no chunk can match."""
+        return any(values is not None and not values for values in (self.owners, self.document_ids, self.filenames))
+
+    def cache_scope(self) -> str:
+        """Stable key identifying the searchable subset, for caches of search results."""
+        return self.model_dump_json(exclude_none=True)
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
+
+class LexicalIndex(ABC):
+    """Abstract base class for keyword (term-based) chunk retrieval."""
+
+    @abstractmethod
+    async def add_chunks(self, chunks: List[Chunk]) -> bool:
+        """Index (or re-index) the text of chunks."""
+        pass
+
+    @abstractmethod
+    async def search(self, query: str, k: int = 10, filters: Optional[SearchFilter] = None) -> List[Tuple[str, float]]:
+        """Return up to k (chunk_id, score) pairs of chunks matching `filters`, best first."""
+        pass
+
+    @abstractmethod
+    async def update_chunk_metadata(self, chunks: List[Chunk]) -> bool:
+        """Refresh the document and filterable metadata of existing chunks without re-indexing text."""
+        pass
+
+    @abstractmethod
+    async def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        """Delete chunks by ID."""
+        pass
+
+    @abstractmethod
+    async def delete_document_chunks(self, document_id: str) -> bool:
+        """Delete all chunks for a specific document."""
+        pass
+
+    @abstractmethod
+    async def backfill_metadata(self, defaults: Dict[str, Any]) -> int:
+        """Set `defaults` on chunks missing those filterable fields; returns the number of chunks changed."""
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Awaitable
+from typing import Any, AsyncContextManager, Callable, Awaitable, List
 
 class QueueService(ABC):
     """Abstract base class for Queue operations."""
@@ -10,6 +10,44 @@ class QueueService(ABC):
         pass
 
     @abstractmethod
-    async def consume(self, callback: Callable[[dict], Awaitable[None]]) -> None:
-        """Consume messages from the queue and trigger callback."""
+    async def publish_many(self, messages: List[dict]) -> bool:
+        """Publish several messages in a single round trip."""
+        pass
+
+    @abstractmethod
+    async def consume(self, callback: Callable[[dict], Awaitable[None]], concurrency: int = 1) -> None:
+        """
+        Consume messages from the queue and trigger callback, with up to `concurrency` in flight.
+
+        A message is acked when the callback returns and nacked when it raises.
+        """
+        pass
+
+    @abstractmethod
+    async def ack(self, receipt: str) -> None:
+        """Acknowledge a delivered message so it is not redelivered."""
+        pass
+
+    @abstractmethod
+    async def nack(self, receipt: str, error: str) -> None:
+        """Reject a delivered message; it is retried with backoff or dead-lettered."""
+        pass
+
+    @abstractmethod
+    async def publish_event(self, event: dict) -> bool:
+        """Broadcast a document lifecycle event to all listeners."""
+        pass
+
+    @abstractmethod
+    async def listen_events(self, callback: Callable[[dict], Awaitable[None]]) -> None:
+        """Listen for document lifecycle events and trigger callback."""
+        pass
+
+    @abstractmethod
+    def lock(self, name: str) -> AsyncContextManager[None]:
+        """
+        Exclusive lock on `name` shared by every consumer, held for the duration of an `async with`.
+
+        Used to serialize jobs that touch the same data across workers.
+        """
         pass
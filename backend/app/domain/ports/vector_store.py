@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from numpy.typing import ArrayLike
 from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
 
 class VectorStore(ABC):
     """Abstract base class for Vector Store operations."""
@@ -11,11 +13,46 @@ class VectorStore(ABC):
         pass
 
     @abstractmethod
-    async def search(self, query_embedding: List[float], k: int = 5) -> List[Chunk]:
-        """Search for similar chunks."""
+    async def search(self, query_embedding: ArrayLike, k: int = 5, filters: Optional[SearchFilter] = None) -> List[Chunk]:
+        """Search for similar chunks, restricted to those matching `filters`."""
+        pass
+
+    @abstractmethod
+    async def search_many(
+        self,
+        query_embeddings: ArrayLike,
+        k: int = 5,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Chunk]]:
+        """Search for several query embeddings at once; returns one chunk list per query, in order."""
         pass
     
+    @abstractmethod
+    async def get_chunks(self, chunk_ids: List[str]) -> List[Chunk]:
+        """Fetch chunks by ID; unknown IDs are skipped."""
+        pass
+
     @abstractmethod
     async def delete_document_chunks(self, document_id: str) -> bool:
         """Delete all chunks for a specific document."""
         pass
+
+    @abstractmethod
+    async def get_source_chunks(self, source_id: str) -> Dict[str, str]:
+        """Return {chunk_id: document_id} for every chunk indexed from a source."""
+        pass
+
+    @abstractmethod
+    async def update_chunk_metadata(self, chunks: List[Chunk]) -> bool:
+        """Overwrite metadata of existing chunks without touching their embeddings."""
+        pass
+
+    @abstractmethod
+    async def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        """Delete chunks by ID."""
+        pass
+
+    @abstractmethod
+    async def backfill_metadata(self, defaults: Dict[str, Any]) -> int:
+        """Set `defaults` on chunks missing those metadata fields; returns the number of chunks changed."""
+        pass
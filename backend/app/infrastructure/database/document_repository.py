@@ -0,0 +1,113 @@
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import select, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.database.models import DocumentRecord
+
+class DocumentRepository:
+    """Persistence for the document registry and its ingestion status."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, document_id: str) -> Optional[DocumentRecord]:
+        return await self.session.get(DocumentRecord, document_id)
+
+    async def get_many(self, document_ids: Iterable[str]) -> Dict[str, DocumentRecord]:
+        ids = list(set(document_ids))
+        if not ids:
+            return {}
+        result = await self.session.execute(select(DocumentRecord).where(DocumentRecord.id.in_(ids)))
+        return {record.id: record for record in result.scalars().all()}
+
+    async def files_in_use(self, file_paths: Iterable[str]) -> Set[str]:
+        """Return the paths among `file_paths` that a registry row still points at."""
+        paths = list(set(file_paths))
+        if not paths:
+            return set()
+        result = await self.session.execute(
+            select(DocumentRecord.file_path).where(DocumentRecord.file_path.in_(paths)).distinct()
+        )
+        return set(result.scalars().all())
+
+    async def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        owner: Optional[str] = None
+    ) -> List[DocumentRecord]:
+        """List the documents visible to `owner`: their own and shared ones, only shared ones when anonymous."""
+        query = select(DocumentRecord).order_by(DocumentRecord.created_at.desc()).limit(limit).offset(offset)
+        if status:
+            query = query.where(DocumentRecord.status == status)
+        if owner:
+            query = query.where(or_(DocumentRecord.owner == owner, DocumentRecord.owner.is_(None)))
+        else:
+            query = query.where(DocumentRecord.owner.is_(None))
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def save_queued(
+        self,
+        documents: List[Document],
+        source_ids: List[str],
+        file_paths: List[str],
+        owner: Optional[str] = None
+    ) -> None:
+        """Create or reset registry rows for documents about to be queued by `owner`."""
+        for doc, source_id, file_path in zip(documents, source_ids, file_paths):
+            record = await self.get(doc.id)
+            if record is None:
+                record = DocumentRecord(id=doc.id)
+                self.session.add(record)
+            record.source_id = source_id
+            record.owner = owner
+            record.filename = doc.filename
+            record.content_type = doc.content_type
+            record.size = doc.size
+            record.file_path = file_path
+            record.status = DocumentStatus.QUEUED.value
+            record.error = None
+        await self.session.commit()
+
+    async def set_status(
+        self,
+        document_id: str,
+        status: DocumentStatus,
+        chunk_count: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> None:
+        record = await self.get(document_id)
+        if record is None:
+            return
+        record.status = status.value
+        record.error = error
+        if chunk_count is not None:
+            record.chunk_count = chunk_count
+        await self.session.commit()
+
+    async def delete(self, document_id: str) -> None:
+        await self.session.execute(delete(DocumentRecord).where(DocumentRecord.id == document_id))
+        await self.session.commit()
+
+    async def delete_superseded(self, source_id: str, current_id: str) -> List[DocumentRecord]:
+        """Remove rows of versions of a source queued before `current_id`; returns the removed rows."""
+        current = await self.get(current_id)
+        if current is None:
+            return []
+        # A newer replacement queued meanwhile must survive an older version finishing late
+        result = await self.session.execute(
+            select(DocumentRecord).where(
+                DocumentRecord.source_id == source_id,
+                DocumentRecord.id != current_id,
+                DocumentRecord.created_at <= current.created_at
+            )
+        )
+        superseded = list(result.scalars().all())
+        if superseded:
+            await self.session.execute(
+                delete(DocumentRecord).where(DocumentRecord.id.in_([record.id for record in superseded]))
+            )
+            await self.session.commit()
+        return superseded
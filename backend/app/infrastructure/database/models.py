@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, create_engine
+from sqlalchemy import Column, String, Integer, DateTime, create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -20,10 +20,46 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class DocumentRecord(Base):
+    __tablename__ = "documents"
+
+    id = Column(String, primary_key=True)  # SHA-256 of the file contents
+    source_id = Column(String, index=True, nullable=False)
+    owner = Column(String, index=True, nullable=True)  # Uploading user; None for shared documents
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    size = Column(Integer, default=0)
+    file_path = Column(String, nullable=True)
+    status = Column(String, index=True, nullable=False, default="queued")
+    chunk_count = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        return {
+            "document_id": self.id,
+            "source_id": self.source_id,
+            "owner": self.owner,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+            "status": self.status,
+            "chunk_count": self.chunk_count,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
 # Create tables
 def init_db():
     engine = create_engine(SYNC_DATABASE_URL, connect_args={"check_same_thread": False})
     Base.metadata.create_all(bind=engine)
+    # Registries created before documents had owners
+    if "owner" not in {column["name"] for column in inspect(engine).get_columns("documents")}:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE documents ADD COLUMN owner VARCHAR"))
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_documents_owner ON documents (owner)"))
 
 # Async session maker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
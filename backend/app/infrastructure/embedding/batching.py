@@ -0,0 +1,29 @@
+from typing import List, Optional, Sequence
+
+def length_bucketed_batches(
+    lengths: Sequence[int],
+    batch_size: int,
+    max_tokens: Optional[int] = None
+) -> List[List[int]]:
+    """
+    Group input indices into batches of similar length, longest first.
+
+    Every sequence in a batch is padded to the batch's longest one, so
+    sorting by length keeps padding small. A batch holds at most
+    `batch_size` inputs and, when `max_tokens` is set, at most that many
+    padded tokens (a single longer input still gets a batch of its own).
+    Callers restore the original order from the returned indices.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for index in order:
+        # Descending order: the first index of a batch is its longest
+        padded = lengths[batch[0]] * (len(batch) + 1) if batch else 0
+        if batch and (len(batch) >= batch_size or (max_tokens and padded > max_tokens)):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
@@ -1,21 +1,104 @@
-from typing import List
+from typing import Any, Dict, List, Literal, Optional, Sequence
 from sentence_transformers import SentenceTransformer
+from app.infrastructure.embedding.embedding_cache import EmbeddingCache
+from app.infrastructure.embedding.inference_executor import InferenceExecutor
+from app.infrastructure.embedding.batching import length_bucketed_batches
+from app.infrastructure.embedding.parity import PARITY_SAMPLE_TEXTS, cosine_drift
+import numpy as np
 import logging
+import torch
 
 logger = logging.getLogger(__name__)
 
+EmbeddingBackend = Literal["torch", "onnx", "int8"]
+
 class EmbeddingService:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        executor: Optional[InferenceExecutor] = None,
+        cache: Optional[EmbeddingCache] = None,
+        backend: EmbeddingBackend = "torch",
+        threads: Optional[int] = None,
+        max_seq_length: Optional[int] = None,
+        batch_size: int = 32,
+        onnx_file: Optional[str] = None,
+        max_batch_tokens: Optional[int] = None
+    ):
         """
         Initialize the embedding service with a sentence-transformers model.
         Default model produces 384-dimensional embeddings.
+
+        `backend` selects the CPU runtime: "torch" (reference fp32),
+        "onnx" (ONNX Runtime; `onnx_file` picks a specific export such as a
+        pre-quantized one) or "int8" (PyTorch with Linear layers dynamically
+        quantized to int8). `threads` caps intra-op threads and
+        `max_seq_length` truncates inputs below the model default.
+
+        Inputs are sorted by token length and encoded in batches of up to
+        `batch_size` texts (and `max_batch_tokens` padded tokens), so short
+        chunks are not padded to the length of long ones.
+
+        Async callers go through `executor`, a bounded pool that keeps the
+        forward pass off the event loop. When `cache` is given, only texts
+        missing from it are sent to the model.
         """
-        logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        logger.info(f"Loading embedding model: {model_name} ({backend} backend)")
+        self.model_name = model_name
+        self.backend = backend
+        self.threads = threads
+        self.onnx_file = onnx_file
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.model = self._load_model(model_name)
+        if max_seq_length:
+            self.model.max_seq_length = max_seq_length
+        self.max_seq_length = self.model.max_seq_length
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        self.executor = executor or InferenceExecutor(name="embedding")
+        self.cache = cache
+        # Vectors from different runtimes or truncation lengths must not share cache entries
+        self.cache_namespace = "|".join(
+            [model_name]
+            + ([backend] if backend != "torch" else [])
+            + ([onnx_file] if backend == "onnx" and onnx_file else [])
+            + ([f"seq{max_seq_length}"] if max_seq_length else [])
+        )
         logger.info(f"Embedding model loaded. Dimension: {self.embedding_dim}")
+
+    def _load_model(self, model_name: str) -> SentenceTransformer:
+        if self.backend == "onnx":
+            model_kwargs: Dict[str, Any] = {"provider": "CPUExecutionProvider"}
+            if self.onnx_file:
+                model_kwargs["file_name"] = self.onnx_file
+            if self.threads:
+                # Only needed (and installed) for the ONNX backend
+                import onnxruntime
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = self.threads
+                model_kwargs["session_options"] = options
+            return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        if self.backend == "int8":
+            model = SentenceTransformer(model_name, device="cpu")
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        if self.backend == "torch":
+            return SentenceTransformer(model_name)
+        raise ValueError(f"Unknown embedding backend: {self.backend}")
+
+    def check_parity(self, texts: Sequence[str] = PARITY_SAMPLE_TEXTS) -> Dict[str, float]:
+        """
+        Cosine agreement of this backend with the reference fp32 PyTorch model
+        (default settings) on `texts`. Loads a second model copy; meant for
+        startup or benchmarking, not the request path.
+        """
+        reference = SentenceTransformer(self.model_name, device="cpu")
+        expected = reference.encode(list(texts), convert_to_numpy=True, show_progress_bar=False)
+        return cosine_drift(expected, self._encode(list(texts)))
     
-    def embed_text(self, text: str) -> List[float]:
+    def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text string.
         
@@ -23,12 +106,11 @@ class EmbeddingService:
             text: Input text to embed
             
         Returns:
-            List of floats representing the embedding vector
+            float32 array representing the embedding vector
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return self.embed_batch([text])[0]
     
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for a batch of texts (more efficient).
         
@@ -36,11 +118,65 @@ class EmbeddingService:
             texts: List of input texts to embed
             
         Returns:
-            List of embedding vectors
+            Contiguous float32 array with one embedding row per text
         """
-        embeddings = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
-        return embeddings.tolist()
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        if self.cache is None:
+            return self._encode(texts)
+
+        keys = [EmbeddingCache.make_key(self.cache_namespace, text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            encoded = self._encode(list(missing.values()))
+            fresh = dict(zip(missing.keys(), encoded))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+
+        return np.stack([cached[key] for key in keys])
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batches = length_bucketed_batches(self._token_lengths(texts), self.batch_size, self.max_batch_tokens)
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        for batch in batches:
+            embeddings[batch] = self.model.encode(
+                [texts[i] for i in batch], batch_size=len(batch), convert_to_numpy=True, show_progress_bar=False
+            )
+        return embeddings
+
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """Truncated token count per text; a fast tokenizer pass is cheap next to the forward pass."""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return [len(text) for text in texts]
+        encoded = tokenizer(texts, truncation=True, max_length=self.max_seq_length, add_special_tokens=True)
+        return [len(ids) for ids in encoded["input_ids"]]
     
+    async def aembed_text(self, text: str) -> np.ndarray:
+        """Async variant of `embed_text` that runs on the inference executor."""
+        return await self.executor.run(self.embed_text, text)
+
+    async def aembed_batch(self, texts: List[str]) -> np.ndarray:
+        """Async variant of `embed_batch` that runs on the inference executor."""
+        return await self.executor.run(self.embed_batch, texts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue-depth metrics of the inference executor and cache hit ratios."""
+        stats: Dict[str, Any] = {
+            "backend": self.backend,
+            "max_seq_length": self.max_seq_length,
+            "executor": self.executor.stats()
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
     def get_embedding_dimension(self) -> int:
         """Return the dimensionality of the embeddings."""
         return self.embedding_dim
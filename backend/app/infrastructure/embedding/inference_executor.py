@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for running blocking model inference off the event loop.
+
+    At most `max_workers` jobs execute at once and at most `max_pending` jobs
+    may be queued behind them; further submitters wait (backpressure) instead
+    of growing the pool's internal queue without bound.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64, name: str = "inference"):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._waiting = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run `fn(*args)` on the pool and await its result.
+
+        Waits for a free slot when the pool is saturated. A slot is held
+        until the job finishes or is cancelled before starting, so work
+        abandoned by a cancelled caller still counts against the bound.
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots.locked():
+            with self._lock:
+                self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+        else:
+            await self._slots.acquire()
+
+        with self._lock:
+            self._submitted += 1
+        try:
+            future = self._executor.submit(self._invoke, fn, args)
+        except BaseException:
+            with self._lock:
+                self._submitted -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._on_done(loop, f))
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, future: Future) -> None:
+        # Runs on a worker thread, or on the loop when a queued job is cancelled
+        if future.cancelled():
+            with self._lock:
+                self._cancelled += 1
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._slots.release)
+
+    def _invoke(self, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            result = fn(*args)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def is_busy(self) -> bool:
+        """True when every worker is taken, so new work would wait behind earlier calls."""
+        with self._lock:
+            in_flight = self._submitted - self._completed - self._failed - self._cancelled
+            return in_flight + self._waiting >= self.max_workers
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue-depth and throughput counters for this pool."""
+        with self._lock:
+            in_flight = self._submitted - self._completed - self._failed - self._cancelled
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "queued": max(in_flight - self._running, 0),
+                "waiting": self._waiting,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
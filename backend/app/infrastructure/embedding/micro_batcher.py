@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+if TYPE_CHECKING:
+    # Only for annotations; keeps this module importable without the model runtime
+    from app.infrastructure.embedding.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+class MicroBatchEmbedder:
+    """
+    Coalesces concurrent single-query embedding requests into one model call.
+
+    Texts are collected for up to `window_ms` milliseconds or until
+    `max_batch_size` are pending, then embedded with a single `aembed_batch`
+    call; each caller's future is resolved with its own vector.
+    """
+
+    def __init__(self, embedding_service: "EmbeddingService", window_ms: float = 5.0, max_batch_size: int = 32):
+        self.embedding_service = embedding_service
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; hold flushes until they finish
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a single query, sharing the model call with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(loop, delay=0)
+        elif self._timer is None:
+            self._schedule_flush(loop, delay=self.window)
+
+        return await future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._start_flush, loop)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self) -> None:
+        self._timer = None
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if self._pending:
+            self._schedule_flush(asyncio.get_running_loop(), delay=0)
+        if not batch:
+            return
+
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await self.embedding_service.aembed_batch(texts)
+        except Exception as e:
+            logger.error(f"Micro-batch embedding failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._items += len(batch)
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return batching counters."""
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "pending": len(self._pending),
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+        }
@@ -0,0 +1,28 @@
+from typing import Dict
+import numpy as np
+
+# Short, varied passages for comparing an optimized backend against the reference model
+PARITY_SAMPLE_TEXTS = [
+    "How do I reset my password?",
+    "The pump must be serviced every 500 operating hours or once a year, whichever comes first.",
+    "Error code 0x80070005 indicates that access to the requested resource was denied.",
+    "Quarterly revenue grew 12% year over year, driven mainly by subscription renewals in Europe.",
+    "Install the package with pip and set the API key as an environment variable before starting the server.",
+    "Le contrat peut être résilié par l'une ou l'autre des parties avec un préavis de trente jours.",
+    "Patients with a history of hypertension should have their blood pressure checked before the procedure.",
+    "Section 4.2: The tenant is responsible for minor repairs; structural repairs remain with the landlord.",
+]
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity between two embedding matrices of the same texts."""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    if reference.shape != candidate.shape:
+        raise ValueError(f"Embedding shapes differ: {reference.shape} vs {candidate.shape}")
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosines = np.sum(reference * candidate, axis=1) / np.maximum(norms, 1e-12)
+    return {
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "max_drift": float(1.0 - cosines.min()),
+    }
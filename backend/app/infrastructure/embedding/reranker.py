@@ -0,0 +1,40 @@
+from typing import List, Optional
+from sentence_transformers import CrossEncoder
+from app.infrastructure.embedding.inference_executor import InferenceExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CrossEncoderReranker:
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        executor: Optional[InferenceExecutor] = None,
+        batch_size: int = 32,
+        max_length: int = 256
+    ):
+        """
+        Score (query, passage) pairs with a small cross-encoder.
+
+        Scoring runs in batches on `executor`, a pool separate from the
+        embedding one so re-ranking never queues behind ingestion.
+        """
+        logger.info(f"Loading re-ranking model: {model_name}")
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, max_length=max_length)
+        self.batch_size = batch_size
+        self.executor = executor or InferenceExecutor(max_workers=1, name="rerank")
+
+    def score(self, query: str, passages: List[str]) -> List[float]:
+        """Relevance score of each passage for the query; higher is more relevant."""
+        if not passages:
+            return []
+        scores = self.model.predict(
+            [(query, passage) for passage in passages],
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return [float(score) for score in scores]
+
+    async def ascore(self, query: str, passages: List[str]) -> List[float]:
+        return await self.executor.run(self.score, query, passages)
@@ -0,0 +1,315 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.domain.ports.lexical_index import LexicalIndex
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
+
+logger = logging.getLogger(__name__)
+
+# Filterable chunk fields stored as columns of the chunks table, with their SQL types
+METADATA_COLUMNS = {"owner": "TEXT", "filename": "TEXT", "indexed_at": "REAL"}
+
+# Posting lists shorter than this are cheap to scan however common their term is
+MIN_COMMON_TERM_DF = 1000
+# Terms or chunks per SQLite IN list
+BATCH_SIZE = 500
+
+# Words plus joined identifiers such as part numbers (ab-123/x), error codes (0x80070005) or versions (1.2.3)
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./:]\w+)*")
+WORD_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; joined identifiers are indexed whole and as their parts."""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(WORD_PATTERN.findall(token))
+    return tokens
+
+class SqliteBM25Index(LexicalIndex):
+    """
+    Okapi BM25 over an inverted index stored in SQLite.
+
+    Postings are (term_id, chunk_rowid, tf) rows in a WITHOUT ROWID table,
+    so a term's postings are one clustered range scan; chunk text itself is
+    not stored. Owner, filename and index time are kept per chunk so
+    filtered searches are restricted inside the postings join. Collection
+    statistics (chunk count and total length) live in a one-row `stats`
+    table and each term's document frequency in `terms`, both updated in
+    the same transaction as every write and read per search, so an index
+    written by another process (the ingestion worker) is scored correctly.
+
+    Terms found in more than `common_term_ratio` of the chunks (stopwords
+    and other filler) do not select chunks: their postings are only looked
+    up for the chunks matched by the query's rarer terms, so their long
+    posting lists are never scanned.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        common_term_ratio: float = 0.1
+    ):
+        self.k1 = k1
+        self.b = b
+        self.common_term_ratio = common_term_ratio
+        self._lock = threading.Lock()
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, document_id TEXT, length INTEGER NOT NULL,
+                owner TEXT, filename TEXT, indexed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS ix_chunks_document ON chunks (document_id);
+            CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL, df INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS postings (
+                term_id INTEGER NOT NULL, chunk INTEGER NOT NULL, tf INTEGER NOT NULL,
+                PRIMARY KEY (term_id, chunk)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_postings_chunk ON postings (chunk);
+            CREATE TABLE IF NOT EXISTS stats (
+                id INTEGER PRIMARY KEY CHECK (id = 0), chunk_count INTEGER NOT NULL, total_length INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO stats (id, chunk_count, total_length)
+                SELECT 0, COUNT(*), COALESCE(SUM(length), 0) FROM chunks;
+            """
+        )
+        # Indexes created before chunks carried filterable metadata
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        for column, column_type in METADATA_COLUMNS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE chunks ADD COLUMN {column} {column_type}")
+        # Indexes created before document frequencies were stored with the terms
+        if "df" not in {row[1] for row in self._conn.execute("PRAGMA table_info(terms)")}:
+            self._conn.execute("ALTER TABLE terms ADD COLUMN df INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE terms SET df = (SELECT COUNT(*) FROM postings WHERE term_id = terms.id)")
+        self._conn.commit()
+
+    def _term_ids(self, terms: List[str]) -> Dict[str, int]:
+        ids = {}
+        for start in range(0, len(terms), BATCH_SIZE):
+            batch = terms[start:start + BATCH_SIZE]
+            self._conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", [(t,) for t in batch])
+            placeholders = ",".join("?" * len(batch))
+            ids.update(self._conn.execute(f"SELECT term, id FROM terms WHERE term IN ({placeholders})", batch))
+        return ids
+
+    def _remove(self, where: str, args: tuple) -> None:
+        rows = self._conn.execute(f"SELECT id, length FROM chunks WHERE {where}", args).fetchall()
+        if not rows:
+            return
+        self._conn.executemany(
+            "UPDATE terms SET df = df - 1 WHERE id IN (SELECT term_id FROM postings WHERE chunk = ?)",
+            [(row_id,) for row_id, _ in rows]
+        )
+        self._conn.executemany("DELETE FROM postings WHERE chunk = ?", [(row_id,) for row_id, _ in rows])
+        self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(row_id,) for row_id, _ in rows])
+        self._update_stats(-len(rows), -sum(length for _, length in rows))
+
+    def _update_stats(self, count: int, length: int) -> None:
+        # Part of the caller's transaction, so the statistics never disagree with the postings
+        self._conn.execute(
+            "UPDATE stats SET chunk_count = chunk_count + ?, total_length = total_length + ? WHERE id = 0",
+            (count, length)
+        )
+
+    def _add(self, chunks: List[Chunk]) -> None:
+        with self._lock:
+            counts = [Counter(tokenize(chunk.content)) for chunk in chunks]
+            term_ids = self._term_ids(sorted(set().union(*counts)))
+            added_length = 0
+            df_increments: Counter = Counter()
+            for chunk, tf in zip(chunks, counts):
+                self._remove("chunk_id = ?", (chunk.id,))
+                length = sum(tf.values())
+                row_id = self._conn.execute(
+                    "INSERT INTO chunks (chunk_id, document_id, length, owner, filename, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        chunk.id, chunk.document_id, length, chunk.metadata.get("owner"),
+                        chunk.metadata.get("filename"), chunk.metadata.get("indexed_at")
+                    )
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO postings (term_id, chunk, tf) VALUES (?, ?, ?)",
+                    [(term_ids[term], row_id, n) for term, n in tf.items()]
+                )
+                df_increments.update(term_ids[term] for term in tf)
+                added_length += length
+            self._conn.executemany(
+                "UPDATE terms SET df = df + ? WHERE id = ?", [(n, term_id) for term_id, n in df_increments.items()]
+            )
+            self._update_stats(len(chunks), added_length)
+            self._conn.commit()
+
+    @staticmethod
+    def _filter_clause(filters: Optional[SearchFilter]) -> Tuple[str, List[Any]]:
+        """SQL conditions on the chunks table (aliased c) for a filter."""
+        if filters is None:
+            return "", []
+        conditions = []
+        args: List[Any] = []
+        for column, values in (
+            ("owner", filters.owners),
+            ("document_id", filters.document_ids),
+            ("filename", filters.filenames),
+        ):
+            if values is not None:
+                conditions.append(f"c.{column} IN ({','.join('?' * len(values))})" if values else "0")
+                args.extend(values)
+        if filters.indexed_after is not None:
+            conditions.append("c.indexed_at >= ?")
+            args.append(filters.indexed_after.timestamp())
+        if filters.indexed_before is not None:
+            conditions.append("c.indexed_at <= ?")
+            args.append(filters.indexed_before.timestamp())
+        return "".join(f" AND {condition}" for condition in conditions), args
+
+    def _term_weight(self, tf: int, length: int, average_length: float) -> float:
+        norm = self.k1 * (1 - self.b + self.b * length / average_length)
+        return tf * (self.k1 + 1) / (tf + norm)
+
+    def _search(self, query: str, k: int, filters: Optional[SearchFilter] = None) -> List[Tuple[str, float]]:
+        terms = sorted(set(tokenize(query)))
+        where, where_args = self._filter_clause(filters)
+        with self._lock:
+            count, total_length = self._conn.execute(
+                "SELECT chunk_count, total_length FROM stats WHERE id = 0"
+            ).fetchone()
+            if not terms or not count:
+                return []
+            average_length = total_length / count
+
+            # Document frequency is collection-wide so filtered scores stay comparable
+            known: List[Tuple[int, int]] = []
+            for start in range(0, len(terms), BATCH_SIZE):
+                batch = terms[start:start + BATCH_SIZE]
+                known.extend(self._conn.execute(
+                    f"SELECT id, df FROM terms WHERE term IN ({','.join('?' * len(batch))}) AND df > 0", batch
+                ))
+            if not known:
+                return []
+            cutoff = max(self.common_term_ratio * count, MIN_COMMON_TERM_DF)
+            selective = [(term_id, df) for term_id, df in known if df <= cutoff]
+            common = [(term_id, df) for term_id, df in known if df > cutoff]
+            if not selective:
+                # Only common terms: the least common one has to select the chunks
+                common.sort(key=lambda term: term[1])
+                selective = [common.pop(0)]
+
+            scores: Dict[int, float] = defaultdict(float)
+            lengths: Dict[int, int] = {}
+            for term_id, df in selective:
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                for chunk, tf, length in self._conn.execute(
+                    "SELECT p.chunk, p.tf, c.length FROM postings p JOIN chunks c ON c.id = p.chunk "
+                    f"WHERE p.term_id = ?{where}",
+                    (term_id, *where_args)
+                ):
+                    lengths[chunk] = length
+                    scores[chunk] += idf * self._term_weight(tf, length, average_length)
+
+            # Common terms only add to chunks already matched, by primary key lookups
+            candidates = sorted(lengths)
+            for term_id, df in common:
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                for start in range(0, len(candidates), BATCH_SIZE):
+                    batch = candidates[start:start + BATCH_SIZE]
+                    for chunk, tf in self._conn.execute(
+                        f"SELECT chunk, tf FROM postings WHERE term_id = ? AND chunk IN ({','.join('?' * len(batch))})",
+                        (term_id, *batch)
+                    ):
+                        scores[chunk] += idf * self._term_weight(tf, lengths[chunk], average_length)
+
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            if not best:
+                return []
+            placeholders = ",".join("?" * len(best))
+            chunk_ids = dict(self._conn.execute(
+                f"SELECT id, chunk_id FROM chunks WHERE id IN ({placeholders})", [row_id for row_id, _ in best]
+            ))
+            return [(chunk_ids[row_id], score) for row_id, score in best]
+
+    def _update(self, chunks: List[Chunk]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE chunks SET document_id = ?, owner = ?, filename = ?, indexed_at = ? WHERE chunk_id = ?",
+                [
+                    (
+                        chunk.document_id, chunk.metadata.get("owner"), chunk.metadata.get("filename"),
+                        chunk.metadata.get("indexed_at"), chunk.id
+                    )
+                    for chunk in chunks
+                ]
+            )
+            self._conn.commit()
+
+    def _delete_ids(self, chunk_ids: List[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._remove("chunk_id = ?", (chunk_id,))
+            self._conn.commit()
+
+    def _delete_document(self, document_id: str) -> None:
+        with self._lock:
+            self._remove("document_id = ?", (document_id,))
+            self._conn.commit()
+
+    def _backfill(self, defaults: Dict[str, Any]) -> int:
+        columns = [column for column in METADATA_COLUMNS if column in defaults]
+        if not columns:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE chunks SET {', '.join(f'{c} = COALESCE({c}, ?)' for c in columns)} "
+                f"WHERE {' OR '.join(f'{c} IS NULL' for c in columns)}",
+                [defaults[column] for column in columns]
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    async def add_chunks(self, chunks: List[Chunk]) -> bool:
+        if chunks:
+            await asyncio.to_thread(self._add, chunks)
+        return True
+
+    async def search(self, query: str, k: int = 10, filters: Optional[SearchFilter] = None) -> List[Tuple[str, float]]:
+        return await asyncio.to_thread(self._search, query, k, filters)
+
+    async def update_chunk_metadata(self, chunks: List[Chunk]) -> bool:
+        if chunks:
+            await asyncio.to_thread(self._update, chunks)
+        return True
+
+    async def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        if chunk_ids:
+            await asyncio.to_thread(self._delete_ids, chunk_ids)
+        return True
+
+    async def delete_document_chunks(self, document_id: str) -> bool:
+        await asyncio.to_thread(self._delete_document, document_id)
+        return True
+
+    async def backfill_metadata(self, defaults: Dict[str, Any]) -> int:
+        return await asyncio.to_thread(self._backfill, defaults)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,40 +1,246 @@
 import json
 import logging
 import asyncio
-from typing import Callable, Awaitable
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Awaitable, List, Optional
+from uuid import uuid4
 from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError
 from app.domain.ports.queue import QueueService
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Move a message out of the processing list and either schedule a retry
+# (ZADD to the delayed set) or dead-letter it (RPUSH). Only the caller that
+# actually removed it from the processing list gets to requeue it.
+RETRY_SCRIPT = """
+local removed = redis.call('LREM', KEYS[1], 1, ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+if removed == 0 then
+    return 0
+end
+if ARGV[4] == 'dead' then
+    redis.call('RPUSH', KEYS[3], ARGV[2])
+else
+    redis.call('ZADD', KEYS[3], ARGV[3], ARGV[2])
+end
+return 1
+"""
+
+# Move retries whose backoff has elapsed back onto the ready queue.
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[1], raw)
+    redis.call('RPUSH', KEYS[2], raw)
+end
+return #due
+"""
+
 class RedisQueue(QueueService):
-    def __init__(self):
-        self.redis = Redis(
+    """
+    At-least-once job queue on Redis lists.
+
+    Consumers BLMOVE messages from the ready list to a processing list and
+    hold a lease (a deadline in a sorted set) that is extended while the job
+    runs. Acked messages are removed; failed or expired ones are retried with
+    exponential backoff via a delayed set, and dead-lettered after
+    QUEUE_MAX_RETRIES attempts.
+    """
+
+    def __init__(self, redis: Optional[Redis] = None):
+        self.redis = redis or Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             decode_responses=True
         )
         self.queue_name = settings.REDIS_QUEUE_NAME
+        self.processing_name = f"{self.queue_name}:processing"
+        self.leases_name = f"{self.queue_name}:leases"
+        self.delayed_name = f"{self.queue_name}:delayed"
+        self.dead_letter_name = f"{self.queue_name}:dead"
+        self.events_channel = settings.REDIS_EVENTS_CHANNEL
+        self.visibility_timeout = settings.QUEUE_VISIBILITY_TIMEOUT
+        self.max_retries = settings.QUEUE_MAX_RETRIES
+        self.retry_backoff = settings.QUEUE_RETRY_BACKOFF_SECONDS
+        self._retry_script = self.redis.register_script(RETRY_SCRIPT)
+        self._promote_script = self.redis.register_script(PROMOTE_SCRIPT)
+
+    @staticmethod
+    def _envelope(message: dict) -> str:
+        return json.dumps({"id": str(uuid4()), "attempts": 0, "body": message})
+
+    @staticmethod
+    def _open(raw: str) -> dict:
+        envelope = json.loads(raw)
+        if "body" not in envelope:
+            # Messages published before envelopes were introduced
+            envelope = {"id": str(uuid4()), "attempts": 0, "body": envelope}
+        return envelope
 
     async def publish(self, message: dict) -> bool:
         try:
-            await self.redis.rpush(self.queue_name, json.dumps(message))
+            await self.redis.rpush(self.queue_name, self._envelope(message))
             return True
         except Exception as e:
             logger.error(f"Failed to publish to Redis: {e}")
             return False
 
-    async def consume(self, callback: Callable[[dict], Awaitable[None]]) -> None:
-        logger.info(f"Starting Redis consumer on queue: {self.queue_name}")
+    async def publish_many(self, messages: List[dict]) -> bool:
+        if not messages:
+            return True
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for start in range(0, len(messages), 1000):
+                    pipe.rpush(self.queue_name, *(self._envelope(m) for m in messages[start:start + 1000]))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish batch to Redis: {e}")
+            return False
+
+    async def ack(self, receipt: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_name, 1, receipt)
+            pipe.zrem(self.leases_name, receipt)
+            await pipe.execute()
+
+    async def nack(self, receipt: str, error: str) -> None:
+        envelope = self._open(receipt)
+        envelope["attempts"] += 1
+        envelope["last_error"] = error
+
+        if envelope["attempts"] > self.max_retries:
+            logger.error(f"Dead-lettering message {envelope['id']} after {envelope['attempts']} attempts: {error}")
+            mode, target, score = "dead", self.dead_letter_name, 0
+        else:
+            delay = self.retry_backoff * (2 ** (envelope["attempts"] - 1))
+            logger.warning(f"Retrying message {envelope['id']} in {delay:.1f}s (attempt {envelope['attempts']}): {error}")
+            mode, target, score = "retry", self.delayed_name, time.time() + delay
+
+        await self._retry_script(
+            keys=[self.processing_name, self.leases_name, target],
+            args=[receipt, json.dumps(envelope), score, mode]
+        )
+
+    async def _extend_lease(self, receipt: str) -> None:
         while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self.redis.zadd(self.leases_name, {receipt: time.time() + self.visibility_timeout}, xx=True)
+            except Exception as e:
+                logger.warning(f"Failed to extend lease: {e}")
+
+    async def _maintain(self) -> None:
+        """Promote due retries and reclaim messages whose lease expired (crashed consumers)."""
+        now = time.time()
+        await self._promote_script(keys=[self.delayed_name, self.queue_name], args=[now, 100])
+
+        # A consumer may have died between BLMOVE and taking its lease; give such orphans one
+        in_flight = await self.redis.lrange(self.processing_name, 0, -1)
+        if in_flight:
+            await self.redis.zadd(self.leases_name, {receipt: now + self.visibility_timeout for receipt in in_flight}, nx=True)
+
+        expired = await self.redis.zrangebyscore(self.leases_name, "-inf", now, start=0, num=100)
+        for receipt in expired:
+            await self.nack(receipt, "visibility timeout expired")
+
+    async def consume(self, callback: Callable[[dict], Awaitable[None]], concurrency: int = 1) -> None:
+        logger.info(f"Starting Redis consumer on queue: {self.queue_name} (concurrency={concurrency})")
+        # A slot is taken before popping so we never hold messages we cannot start yet
+        slots = asyncio.Semaphore(concurrency)
+        tasks = set()
+        last_maintenance = 0.0
+
+        async def handle(receipt: str):
+            heartbeat = asyncio.create_task(self._extend_lease(receipt))
             try:
-                # BLPOP returns a tuple (queue_name, element)
-                result = await self.redis.blpop(self.queue_name, timeout=0)
-                if result:
-                    _, message_data = result
-                    message = json.loads(message_data)
-                    await callback(message)
+                envelope = self._open(receipt)
+                await callback(envelope["body"])
+                await self.ack(receipt)
             except Exception as e:
+                logger.error(f"Error handling message: {e}")
+                try:
+                    await self.nack(receipt, str(e))
+                except Exception as nack_error:
+                    logger.error(f"Failed to nack message, it will be reclaimed after its lease expires: {nack_error}")
+            finally:
+                heartbeat.cancel()
+                slots.release()
+
+        while True:
+            await slots.acquire()
+            receipt: Optional[str] = None
+            try:
+                if time.time() - last_maintenance >= settings.QUEUE_POLL_TIMEOUT:
+                    await self._maintain()
+                    last_maintenance = time.time()
+
+                # BLMOVE atomically hands the message to our processing list
+                receipt = await self.redis.blmove(
+                    self.queue_name, self.processing_name, settings.QUEUE_POLL_TIMEOUT, "LEFT", "RIGHT"
+                )
+                if receipt is not None:
+                    await self.redis.zadd(self.leases_name, {receipt: time.time() + self.visibility_timeout})
+            except Exception as e:
+                slots.release()
                 logger.error(f"Error consuming from Redis: {e}")
                 await asyncio.sleep(1) # Prevent tight loop on error
+                continue
+
+            if receipt is None:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(handle(receipt))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    async def _renew_lock(self, lock: Lock) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await lock.reacquire()
+            except Exception as e:
+                logger.warning(f"Failed to renew lock {lock.name}: {e}")
+
+    @asynccontextmanager
+    async def lock(self, name: str) -> AsyncIterator[None]:
+        # Renewed like a lease while held, so it outlives slow jobs but not crashed consumers
+        lock = self.redis.lock(f"{self.queue_name}:lock:{name}", timeout=self.visibility_timeout)
+        await lock.acquire()
+        renewal = asyncio.create_task(self._renew_lock(lock))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            try:
+                await lock.release()
+            except LockError as e:
+                logger.warning(f"Lock {lock.name} expired before release: {e}")
+
+    async def publish_event(self, event: dict) -> bool:
+        try:
+            await self.redis.publish(self.events_channel, json.dumps(event))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish event to Redis: {e}")
+            return False
+
+    async def listen_events(self, callback: Callable[[dict], Awaitable[None]]) -> None:
+        logger.info(f"Listening for document events on channel: {self.events_channel}")
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.events_channel)
+                async for item in pubsub.listen():
+                    if item.get("type") == "message":
+                        await callback(json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error listening for Redis events: {e}")
+                await asyncio.sleep(1)
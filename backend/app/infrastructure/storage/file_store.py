@@ -1,11 +1,29 @@
 import aiofiles
+import asyncio
+import hashlib
 import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Optional
+from uuid import uuid4
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+@dataclass
+class StoredFile:
+    path: str
+    size: int
+    sha256: str
+    # False when identical bytes were already stored under this name
+    created: bool = True
 
 class FileStore:
-    def __init__(self, upload_dir: str = "uploads"):
+    def __init__(self, upload_dir: str = "uploads", chunk_size: int = 1024 * 1024, max_size: Optional[int] = None):
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.max_size = max_size
 
     async def save_file(self, filename: str, content: bytes) -> str:
         file_path = self.upload_dir / filename
@@ -13,6 +31,48 @@ class FileStore:
             await f.write(content)
         return str(file_path.absolute())
 
+    async def save_stream(self, filename: str, fileobj: BinaryIO, max_size: Optional[int] = None) -> StoredFile:
+        """
+        Copy a blocking file object (an upload's spooled file or an archive
+        member) to disk in fixed-size chunks off the event loop, hashing it
+        on the way. The stored name is prefixed with the content hash.
+
+        Raises FileTooLargeError as soon as more than `max_size` bytes have
+        been read; the partial file is removed. A per-call `max_size` can
+        only tighten the store's own limit.
+        """
+        return await asyncio.to_thread(self._copy_fileobj, filename, fileobj, max_size)
+
+    def _copy_fileobj(self, filename: str, fileobj: BinaryIO, max_size: Optional[int] = None) -> StoredFile:
+        limits = [limit for limit in (self.max_size, max_size) if limit is not None]
+        max_size = min(limits) if limits else None
+        name = Path(filename).name
+        partial_path = self.upload_dir / f"{uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(partial_path, 'wb') as f:
+                while True:
+                    block = fileobj.read(self.chunk_size)
+                    if not block:
+                        break
+                    size += len(block)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLargeError(f"Upload exceeds the maximum size of {max_size} bytes")
+                    digest.update(block)
+                    f.write(block)
+            # Content-addressed name: identical uploads land on the same file
+            file_path = self.upload_dir / f"{digest.hexdigest()[:16]}_{name}"
+            created = not file_path.exists()
+            os.replace(partial_path, file_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return StoredFile(path=str(file_path.absolute()), size=size, sha256=digest.hexdigest(), created=created)
+
     async def read_file(self, file_path: str) -> str:
         async with aiofiles.open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             return await f.read()
+
+    async def delete_file(self, file_path: str) -> None:
+        await asyncio.to_thread(Path(file_path).unlink, missing_ok=True)
@@ -1,13 +1,70 @@
-import chromadb
-from typing import List
+import asyncio
+import numpy as np
+from numpy.typing import ArrayLike
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
 from app.domain.ports.vector_store import VectorStore
 from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from chromadb.api import ClientAPI
+
+# Conservative fallback when the client cannot report its limit (SQLite's default)
+DEFAULT_MAX_BATCH_SIZE = 5461
+
+COLLECTION_NAME = "rag_chunks"
+
+def create_client() -> "ClientAPI":
+    # Imported here so the store can be built around another client without chromadb installed
+    import chromadb
+    return chromadb.PersistentClient(path=settings.VECTOR_DB_PATH)
+
+def create_executor() -> ThreadPoolExecutor:
+    # The Chroma client is synchronous; run every call on a dedicated pool
+    return ThreadPoolExecutor(max_workers=settings.VECTOR_STORE_WORKERS, thread_name_prefix="chroma")
+
+def list_collections(client: "ClientAPI", prefix: str) -> List[str]:
+    """Names of existing collections starting with `prefix`."""
+    # Newer clients return names, older ones collection objects
+    names = [c if isinstance(c, str) else c.name for c in client.list_collections()]
+    return [name for name in names if name.startswith(prefix)]
+
 class ChromaVectorStore(VectorStore):
-    def __init__(self):
-        self.client = chromadb.PersistentClient(path=settings.VECTOR_DB_PATH)
-        self.collection = self.client.get_or_create_collection(name="rag_chunks")
+    def __init__(
+        self,
+        collection_name: str = COLLECTION_NAME,
+        client: Optional["ClientAPI"] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        # Shards share one client and pool; a standalone store creates its own
+        self.client = client or create_client()
+        self.collection = self.client.get_or_create_collection(name=collection_name)
+        self.executor = executor or create_executor()
+        self.batch_size = min(self._backend_max_batch_size(), settings.VECTOR_UPSERT_BATCH_SIZE)
+        self.write_concurrency = settings.VECTOR_UPSERT_CONCURRENCY
+
+    def _backend_max_batch_size(self) -> int:
+        if hasattr(self.client, "get_max_batch_size"):
+            return self.client.get_max_batch_size()
+        return getattr(self.client, "max_batch_size", DEFAULT_MAX_BATCH_SIZE)
+
+    async def _run(self, fn: Callable[..., Any], **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, **kwargs))
+
+    async def _run_batched(self, fn: Callable[..., Any], columns: Dict[str, Sequence[Any]]) -> None:
+        """Call `fn` over column slices capped at the backend batch size, with bounded concurrency."""
+        total = len(next(iter(columns.values())))
+        slots = asyncio.Semaphore(self.write_concurrency)
+
+        async def run_slice(start: int):
+            async with slots:
+                await self._run(fn, **{name: values[start:start + self.batch_size] for name, values in columns.items()})
+
+        await asyncio.gather(*(run_slice(start) for start in range(0, total, self.batch_size)))
 
     async def add_chunks(self, chunks: List[Chunk]) -> bool:
         if not chunks:
@@ -16,48 +73,162 @@ class ChromaVectorStore(VectorStore):
         ids = [chunk.id for chunk in chunks]
         documents = [chunk.content for chunk in chunks]
         metadatas = [chunk.metadata for chunk in chunks]
-        embeddings = [chunk.embedding for chunk in chunks]
 
         # Chroma requires embeddings to be provided if we want to skip its default embedding function
         # We assume embeddings are computed before calling add_chunks for now, 
         # or we could use an embedding function here if we prefer Chroma to do it.
         # Ideally, we want full control, so we should pass embeddings.
-        # If embeddings are empty lists, Chroma might error if we don't provide an embedding function.
-        # ensuring we have embeddings:
-        if any(not e for e in embeddings):
-             # For this implementation, we assume embeddings are present.
-             # In a real scenario, we might want to call an embedding service here if missing.
-             pass
-
-        self.collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas,
-            embeddings=embeddings if embeddings[0] else None # helper to use default if none provided (testing)
-        )
+        # If embeddings are empty, Chroma might error if we don't provide an embedding function.
+        columns = {"ids": ids, "documents": documents, "metadatas": metadatas}
+        if len(chunks[0].embedding): # helper to use default if none provided (testing)
+            # Chroma's API takes nested lists; convert the stacked float32 block in one pass
+            columns["embeddings"] = np.stack([chunk.embedding for chunk in chunks]).tolist()
+        await self._run_batched(self.collection.upsert, columns)
         return True
 
-    async def search(self, query_embedding: List[float], k: int = 5) -> List[Chunk]:
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=k
+    @staticmethod
+    def _where(filters: Optional[SearchFilter]) -> Optional[Dict[str, Any]]:
+        """Translate a filter into a Chroma `where` clause evaluated inside the index."""
+        if filters is None:
+            return None
+        clauses = []
+        for field, values in (
+            ("owner", filters.owners),
+            ("document_id", filters.document_ids),
+            ("filename", filters.filenames),
+        ):
+            if values is not None:
+                clauses.append({field: {"$in": list(values)}})
+        if filters.indexed_after is not None:
+            clauses.append({"indexed_at": {"$gte": filters.indexed_after.timestamp()}})
+        if filters.indexed_before is not None:
+            clauses.append({"indexed_at": {"$lte": filters.indexed_before.timestamp()}})
+
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    async def search(self, query_embedding: ArrayLike, k: int = 5, filters: Optional[SearchFilter] = None) -> List[Chunk]:
+        return (await self.search_many([query_embedding], k=k, filters=filters))[0]
+
+    async def search_many(
+        self,
+        query_embeddings: ArrayLike,
+        k: int = 5,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Chunk]]:
+        if not len(query_embeddings):
+            return []
+        where = self._where(filters)
+        if filters is not None and filters.matches_nothing():
+            return [[] for _ in query_embeddings]
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32).tolist()
+        # One query round trip per backend-sized slice of embeddings
+        slices = [
+            query_embeddings[start:start + self.batch_size]
+            for start in range(0, len(query_embeddings), self.batch_size)
+        ]
+        results = await asyncio.gather(*(
+            self._run(
+                self.collection.query,
+                query_embeddings=embeddings,
+                n_results=k,
+                where=where,
+                include=["documents", "metadatas", "distances"]
+            )
+            for embeddings in slices
+        ))
+
+        per_query = []
+        for result in results:
+            for i in range(len(result["ids"])):
+                per_query.append(self._to_chunks(result, i))
+        return per_query
+
+    @staticmethod
+    def _to_chunks(results: Dict[str, Any], query_index: int) -> List[Chunk]:
+        chunks = ChromaVectorStore._build_chunks(
+            results["ids"][query_index],
+            results["documents"][query_index],
+            results["metadatas"][query_index]
         )
-        
+        # Distances are ascending; negate so a higher score is closer like other backends
+        distances = results.get("distances")
+        if distances:
+            for chunk, distance in zip(chunks, distances[query_index]):
+                chunk.score = -distance
+        return chunks
+
+    @staticmethod
+    def _build_chunks(ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> List[Chunk]:
         chunks = []
-        if results["ids"]:
-            for i in range(len(results["ids"][0])):
-                chunk = Chunk(
-                    id=results["ids"][0][i],
-                    document_id=results["metadatas"][0][i].get("document_id", "unknown"),
-                    content=results["documents"][0][i],
-                    metadata=results["metadatas"][0][i],
-                    embedding=[] # Optimization: don't return embedding unless needed
-                )
-                chunks.append(chunk)
+        for chunk_id, content, metadata in zip(ids, documents, metadatas):
+            # Optimization: embeddings are not fetched, the chunk keeps an empty one
+            chunk = Chunk(
+                id=chunk_id,
+                document_id=metadata.get("document_id", "unknown"),
+                content=content,
+                metadata=metadata,
+                page_number=metadata.get("page", 0),
+                chunk_index=metadata.get("chunk_index", 0)
+            )
+            chunks.append(chunk)
         return chunks
 
+    async def get_chunks(self, chunk_ids: List[str]) -> List[Chunk]:
+        if not chunk_ids:
+            return []
+        results = await self._run(self.collection.get, ids=chunk_ids, include=["documents", "metadatas"])
+        by_id = {
+            chunk.id: chunk
+            for chunk in self._build_chunks(results["ids"], results["documents"], results["metadatas"])
+        }
+        return [by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in by_id]
+
     async def delete_document_chunks(self, document_id: str) -> bool:
-        self.collection.delete(
+        await self._run(
+            self.collection.delete,
             where={"document_id": document_id}
         )
         return True
+
+    async def get_source_chunks(self, source_id: str) -> Dict[str, str]:
+        results = await self._run(self.collection.get, where={"source_id": source_id}, include=["metadatas"])
+        return {
+            chunk_id: metadata.get("document_id", "unknown")
+            for chunk_id, metadata in zip(results["ids"], results["metadatas"])
+        }
+
+    async def update_chunk_metadata(self, chunks: List[Chunk]) -> bool:
+        if not chunks:
+            return True
+        await self._run_batched(self.collection.update, {
+            "ids": [chunk.id for chunk in chunks],
+            "metadatas": [chunk.metadata for chunk in chunks]
+        })
+        return True
+
+    async def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        if not chunk_ids:
+            return True
+        await self._run_batched(self.collection.delete, {"ids": chunk_ids})
+        return True
+
+    async def backfill_metadata(self, defaults: Dict[str, Any]) -> int:
+        updated = 0
+        offset = 0
+        while True:
+            # Updates do not add or remove chunks, so offset paging stays stable
+            page = await self._run(self.collection.get, include=["metadatas"], limit=self.batch_size, offset=offset)
+            if not page["ids"]:
+                return updated
+            ids, metadatas = [], []
+            for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+                missing = {key: value for key, value in defaults.items() if key not in (metadata or {})}
+                if missing:
+                    ids.append(chunk_id)
+                    metadatas.append({**(metadata or {}), **missing})
+            if ids:
+                await self._run(self.collection.update, ids=ids, metadatas=metadatas)
+                updated += len(ids)
+            offset += len(page["ids"])
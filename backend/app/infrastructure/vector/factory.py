@@ -0,0 +1,65 @@
+from pathlib import Path
+from app.core.config import settings
+from app.domain.ports.vector_store import VectorStore
+from app.infrastructure.vector.chroma_store import (
+    COLLECTION_NAME, ChromaVectorStore, create_client, create_executor, list_collections
+)
+from app.infrastructure.vector.numpy_store import NumpyVectorStore
+from app.infrastructure.vector.ivf_store import IVFVectorStore
+from app.infrastructure.vector.sharded_store import ShardedVectorStore
+
+def _create_local_store(path: str) -> VectorStore:
+    if settings.VECTOR_BACKEND == "numpy":
+        return NumpyVectorStore(
+            path=path,
+            quantization=settings.VECTOR_QUANTIZATION,
+            rerank_factor=settings.VECTOR_RERANK_FACTOR
+        )
+    return IVFVectorStore(
+        path=path,
+        nlist=settings.VECTOR_IVF_NLIST,
+        nprobe=settings.VECTOR_IVF_NPROBE,
+        quantization=settings.VECTOR_QUANTIZATION,
+        rerank_factor=settings.VECTOR_RERANK_FACTOR
+    )
+
+def _create_sharded_store() -> VectorStore:
+    if settings.VECTOR_BACKEND == "chroma":
+        # One collection per shard, all on a shared client and thread pool
+        client = create_client()
+        executor = create_executor()
+        prefix = f"{COLLECTION_NAME}_"
+
+        def open_shard(name: str) -> VectorStore:
+            return ChromaVectorStore(f"{prefix}{name}", client=client, executor=executor)
+
+        def list_shards():
+            return [name[len(prefix):] for name in list_collections(client, prefix)]
+    else:
+        # One index directory per shard
+        root = Path(settings.VECTOR_INDEX_PATH)
+
+        def open_shard(name: str) -> VectorStore:
+            return _create_local_store(str(root / name))
+
+        def list_shards():
+            return [path.name for path in root.iterdir() if path.is_dir()] if root.exists() else []
+
+    return ShardedVectorStore(
+        open_shard,
+        list_shards,
+        strategy=settings.VECTOR_SHARDING,
+        num_shards=settings.VECTOR_SHARD_COUNT,
+        max_open_shards=settings.VECTOR_MAX_OPEN_SHARDS
+    )
+
+def create_vector_store() -> VectorStore:
+    backend = settings.VECTOR_BACKEND
+    if backend not in ("chroma", "numpy", "ivf"):
+        raise ValueError(f"Unknown vector backend: {backend}")
+
+    if settings.VECTOR_SHARDING != "none":
+        return _create_sharded_store()
+    if backend == "chroma":
+        return ChromaVectorStore()
+    return _create_local_store(settings.VECTOR_INDEX_PATH)
@@ -0,0 +1,87 @@
+from typing import Any, Dict, Optional
+import numpy as np
+from app.domain.models.search_filter import SearchFilter
+
+# Metadata key -> SearchFilter field holding its allowed values
+POSTING_FIELDS = {"owner": "owners", "document_id": "document_ids", "filename": "filenames"}
+
+# Row code of rows without an indexed value
+UNSET = -1
+
+class MetadataFilterIndex:
+    """
+    Row prefilter for the local vector indexes.
+
+    Each of the owner, document_id and filename metadata fields is kept as
+    a dense int32 array of per-row value codes, next to a dense array of
+    index timestamps. A SearchFilter is turned into a boolean row mask by
+    matching each field's column against the codes of its allowed values
+    (OR) and AND-ing across fields, all in vectorized array operations, so
+    only matching rows are ever scored.
+    """
+
+    def __init__(self):
+        self._value_codes: Dict[str, Dict[Any, int]] = {field: {} for field in POSTING_FIELDS}
+        self._columns: Dict[str, np.ndarray] = {field: np.full(0, UNSET, dtype=np.int32) for field in POSTING_FIELDS}
+        self._indexed_at = np.full(0, np.nan)
+
+    def _grow(self, row: int) -> None:
+        if row < len(self._indexed_at):
+            return
+        capacity = max(row + 1, 2 * len(self._indexed_at))
+        for field, column in self._columns.items():
+            grown = np.full(capacity, UNSET, dtype=np.int32)
+            grown[:len(column)] = column
+            self._columns[field] = grown
+        grown = np.full(capacity, np.nan)
+        grown[:len(self._indexed_at)] = self._indexed_at
+        self._indexed_at = grown
+
+    def set(self, row: int, metadata: Dict[str, Any]) -> None:
+        """Index (or re-index) the filterable metadata of a row."""
+        self._grow(row)
+        for field, column in self._columns.items():
+            codes = self._value_codes[field]
+            column[row] = codes.setdefault(metadata.get(field), len(codes))
+        indexed_at = metadata.get("indexed_at")
+        self._indexed_at[row] = np.nan if indexed_at is None else indexed_at
+
+    def remove(self, row: int) -> None:
+        if row >= len(self._indexed_at):
+            return
+        for column in self._columns.values():
+            column[row] = UNSET
+        self._indexed_at[row] = np.nan
+
+    def _column(self, values: np.ndarray, size: int, fill) -> np.ndarray:
+        # Rows past the indexed ones have no values yet
+        if len(values) >= size:
+            return values[:size]
+        column = np.full(size, fill, dtype=values.dtype)
+        column[:len(values)] = values
+        return column
+
+    def mask(self, filters: Optional[SearchFilter], alive: np.ndarray) -> Optional[np.ndarray]:
+        """Boolean mask over `alive` of rows matching `filters`; None when nothing is filtered."""
+        if filters is None or filters.is_empty():
+            return None
+        size = len(alive)
+        mask = alive.copy()
+        for field, filter_field in POSTING_FIELDS.items():
+            allowed = getattr(filters, filter_field)
+            if allowed is None:
+                continue
+            codes = self._value_codes[field]
+            allowed_codes = [codes[value] for value in allowed if value in codes]
+            if not allowed_codes:
+                return np.zeros(size, dtype=bool)
+            mask &= np.isin(self._column(self._columns[field], size, UNSET), allowed_codes)
+
+        if filters.indexed_after is not None or filters.indexed_before is not None:
+            indexed_at = self._column(self._indexed_at, size, np.nan)
+            with np.errstate(invalid="ignore"):
+                if filters.indexed_after is not None:
+                    mask &= indexed_at >= filters.indexed_after.timestamp()
+                if filters.indexed_before is not None:
+                    mask &= indexed_at <= filters.indexed_before.timestamp()
+        return mask
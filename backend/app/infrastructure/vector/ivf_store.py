@@ -0,0 +1,266 @@
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+from numpy.typing import ArrayLike
+from app.infrastructure.vector.numpy_store import NumpyVectorStore
+from app.infrastructure.vector.quantization import open_memmap
+
+logger = logging.getLogger(__name__)
+
+# Below this many vectors per list k-means centroids are not meaningful yet
+MIN_POINTS_PER_LIST = 39
+# Training sample cap per list; more points barely move the centroids
+MAX_POINTS_PER_LIST = 256
+ASSIGN_BLOCK_SIZE = 65536
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns unit-norm centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_clusters)
+
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Restart empty clusters on random points so every list gets used
+            sums[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+class IVFVectorStore(NumpyVectorStore):
+    """
+    Inverted-file approximate index on top of the NumPy store.
+
+    Vectors are partitioned into `nlist` clusters by spherical k-means; a
+    query scores the centroids, then only the rows of the `nprobe` closest
+    lists. Raising `nprobe` trades speed for recall (`nprobe == nlist` is
+    exact). Until enough vectors exist to train, and for queries issued
+    before training, search falls back to the exact scan.
+
+    New rows are assigned to their nearest centroid on insert. The index is
+    retrained from scratch whenever the collection grows `rebuild_factor`
+    times past the size it was trained on. Centroids (`ivf_centroids.npy`)
+    and row assignments (`ivf_lists.i32`) persist next to the vectors. Rows
+    another process changed are moved to the lists it assigned them to;
+    retraining makes other processes reload everything.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        rebuild_factor: float = 4.0,
+        initial_capacity: int = 1024,
+        quantization: str = "none",
+        rerank_factor: int = 4
+    ):
+        super().__init__(path, initial_capacity=initial_capacity, quantization=quantization, rerank_factor=rerank_factor)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.rebuild_factor = rebuild_factor
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.memmap] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        # Row -> list it sits in, as this instance last saw the shared assignments
+        self._row_lists: Dict[int, int] = {}
+        self._trained_count = 0
+        self._load_ivf()
+
+    @property
+    def _centroids_path(self):
+        return self.path / "ivf_centroids.npy"
+
+    @property
+    def _assignments_path(self):
+        return self.path / "ivf_lists.i32"
+
+    def _load_ivf(self) -> None:
+        if not self._centroids_path.exists() or self._matrix is None:
+            return
+        with self._lock:
+            self._centroids = np.load(self._centroids_path)
+            row = self._conn.execute("SELECT value FROM info WHERE key = 'ivf_trained_count'").fetchone()
+            self._trained_count = int(row[0]) if row else 0
+            self._ensure_assignment_capacity()
+            self._lists = [[] for _ in range(len(self._centroids))]
+
+            live = np.flatnonzero(self._alive[:len(self._ids)])
+            unassigned = [int(r) for r in live if self._assignments[r] < 0]
+            self._attach([int(r) for r in live if self._assignments[r] >= 0])
+            if unassigned:
+                self._assign(unassigned)
+        logger.info(f"Loaded IVF index with {len(self._centroids)} lists")
+
+    def _reload(self) -> None:
+        super()._reload()
+        self._centroids = None
+        self._assignments = None
+        self._lists = []
+        self._list_arrays = {}
+        self._row_lists = {}
+        self._trained_count = 0
+        self._load_ivf()
+
+    def _remap(self, capacity: int) -> None:
+        super()._remap(capacity)
+        if self._centroids is not None:
+            self._ensure_assignment_capacity()
+
+    def _ensure_assignment_capacity(self) -> None:
+        """Keep the assignment file as long as the vector matrix, new slots unassigned (-1)."""
+        capacity = self._matrix.shape[0]
+        if self._assignments is not None and len(self._assignments) >= capacity:
+            return
+        existing = self._assignments_path.stat().st_size // 4 if self._assignments_path.exists() else 0
+        if self._assignments is not None:
+            self._assignments.flush()
+        self._assignments = open_memmap(self._assignments_path, np.int32, (max(existing, capacity),))
+        if existing < capacity:
+            self._assignments[existing:] = -1
+
+    def _live_count(self) -> int:
+        return int(self._alive[:len(self._ids)].sum())
+
+    def _attach(self, rows: List[int]) -> None:
+        """Add rows to the in-memory lists their shared assignments name."""
+        for row in rows:
+            list_id = int(self._assignments[row])
+            self._lists[list_id].append(row)
+            self._list_arrays.pop(list_id, None)
+            self._row_lists[row] = list_id
+
+    def _detach(self, rows: List[int]) -> None:
+        """Remove rows from the in-memory lists they were last seen in."""
+        for row in rows:
+            list_id = self._row_lists.pop(row, None)
+            if list_id is not None:
+                self._lists[list_id].remove(row)
+                self._list_arrays.pop(list_id, None)
+
+    def _unlink(self, rows: List[int]) -> None:
+        self._detach(rows)
+        for row in rows:
+            self._assignments[row] = -1
+
+    def _assign(self, rows: List[int]) -> None:
+        """Attach rows to their nearest centroid."""
+        for start in range(0, len(rows), ASSIGN_BLOCK_SIZE):
+            block = rows[start:start + ASSIGN_BLOCK_SIZE]
+            labels = np.argmax(self._matrix[block] @ self._centroids.T, axis=1)
+            self._assignments[block] = labels
+            self._attach(block)
+        self._assignments.flush()
+
+    def train(self) -> None:
+        """(Re)build the coarse quantizer from the current vectors and reassign every row."""
+        with self._writing():
+            live = np.flatnonzero(self._alive[:len(self._ids)])
+            n_clusters = min(self.nlist, len(live))
+            if n_clusters == 0:
+                return
+            rng = np.random.default_rng(0)
+            sample_size = min(len(live), n_clusters * MAX_POINTS_PER_LIST)
+            sample = np.sort(rng.choice(live, size=sample_size, replace=False))
+
+            self._centroids = spherical_kmeans(np.asarray(self._matrix[sample]), n_clusters)
+            np.save(self._centroids_path, self._centroids)
+            self._trained_count = len(live)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO info (key, value) VALUES ('ivf_trained_count', ?)", (str(self._trained_count),)
+            )
+
+            self._ensure_assignment_capacity()
+            self._assignments[:] = -1
+            self._lists = [[] for _ in range(n_clusters)]
+            self._list_arrays = {}
+            self._row_lists = {}
+            self._assign(live.tolist())
+            self._mark_all_changed()
+        logger.info(f"Trained IVF index with {n_clusters} lists on {len(live)} vectors")
+
+    def _on_rows_written(self, rows: List[int]) -> None:
+        live = self._live_count()
+        if self._centroids is None:
+            if live >= self.nlist * MIN_POINTS_PER_LIST:
+                self.train()
+            return
+        if live >= self._trained_count * self.rebuild_factor:
+            self.train()
+            return
+
+        self._ensure_assignment_capacity()
+        rows = list(dict.fromkeys(rows))
+        # Upserts may move an existing row to a different list
+        self._unlink(rows)
+        self._assign(rows)
+
+    def _on_rows_removed(self, rows: List[int]) -> None:
+        if self._centroids is not None:
+            self._unlink(rows)
+            self._assignments.flush()
+
+    def _on_rows_reloaded(self, rows: List[int]) -> None:
+        if self._centroids is None:
+            return
+        self._detach(rows)
+        # The writing process already assigned its rows; rows it left unassigned stay out of the lists
+        self._attach([row for row in rows if self._alive[row] and self._assignments[row] >= 0])
+
+    def _list_array(self, list_id: int) -> np.ndarray:
+        array = self._list_arrays.get(list_id)
+        if array is None:
+            array = np.asarray(self._lists[list_id], dtype=np.int64)
+            self._list_arrays[list_id] = array
+        return array
+
+    def _top_rows(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> List[List[int]]:
+        if self._centroids is None or self.nprobe >= len(self._centroids):
+            return super()._top_rows(queries, k, allowed)
+        if allowed is not None and allowed.sum() <= self._live_count() * self.nprobe / len(self._centroids):
+            # A selective filter admits fewer rows than the probed lists hold; scanning them is exact and cheaper
+            return super()._top_rows(queries, k, allowed)
+
+        probes = np.argpartition(-(queries @ self._centroids.T), self.nprobe - 1, axis=1)[:, :self.nprobe]
+        results = []
+        for query, probe in zip(queries, probes):
+            candidates = np.concatenate([self._list_array(list_id) for list_id in probe.tolist()])
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            results.append(self._rank_rows(query, candidates, k))
+        return results
+
+    def recall_at_k(self, query_embeddings: ArrayLike, k: int = 10) -> float:
+        """Mean fraction of the exact top-k that the approximate search returns."""
+        queries = self._normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        with self._lock:
+            self._refresh()
+            if self._matrix is None or not self._live_count():
+                return 1.0
+            exact = self._exact_top_rows(queries, k)
+            approximate = self._top_rows(queries, k)
+        hits = [len(set(a) & set(e)) / len(e) for a, e in zip(approximate, exact) if e]
+        return float(np.mean(hits)) if hits else 1.0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats.update({
+                "trained": self._centroids is not None,
+                "lists": 0 if self._centroids is None else len(self._centroids),
+                "nprobe": self.nprobe,
+                "trained_count": self._trained_count,
+            })
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._assignments is not None:
+                self._assignments.flush()
+        super().close()
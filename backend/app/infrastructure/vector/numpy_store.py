@@ -0,0 +1,556 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+import numpy as np
+from numpy.typing import ArrayLike
+from app.domain.ports.vector_store import VectorStore
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
+from app.infrastructure.vector.filter_index import MetadataFilterIndex
+from app.infrastructure.vector.quantization import QuantizedCodes, open_memmap
+
+logger = logging.getLogger(__name__)
+
+# Generations of changed rows kept for other processes to catch up on incrementally
+CHANGE_LOG_GENERATIONS = 1024
+# Rows per SQLite query when loading changed rows
+LOAD_BLOCK_SIZE = 500
+# Filters admitting at most this fraction of the rows gather just those rows instead of scoring all
+GATHER_MAX_FRACTION = 0.05
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process exact vector index.
+
+    Embeddings are L2-normalized and kept in a float32 memory-mapped matrix
+    (`vectors.f32`) that doubles its capacity when full; ids, content and
+    metadata live in a SQLite sidecar (`chunks.db`) keyed by matrix row.
+    Search is a single matrix product followed by `argpartition`, so cosine
+    top-k is exact. Deleted rows are masked out and reused by later inserts.
+
+    With `quantization` set to "int8" or "binary", candidates are first
+    shortlisted on compact codes and only the best `k * rerank_factor` are
+    re-scored against the float vectors.
+
+    Filtered searches mask out rows rejected by a MetadataFilterIndex
+    prefilter built from the chunk metadata; very selective filters score
+    only the rows they admit.
+
+    Several processes (the API and the ingestion worker) may open the same
+    directory. Writers serialize on a SQLite write transaction, bump a
+    `generation` counter in `info` and log the rows they touched in
+    `changes`; every read or write first compares the generation with the
+    one this instance loaded and reloads just the logged rows when another
+    process has changed the index. The memmap is only remapped when the
+    matrix grew. Instances further behind than the retained log, or behind
+    a change to every row (retraining, backfills), reload everything.
+    """
+
+    def __init__(self, path: str, initial_capacity: int = 1024, quantization: str = "none", rerank_factor: int = 4):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.initial_capacity = initial_capacity
+        self.rerank_factor = rerank_factor
+        self._codes = QuantizedCodes(self.path, quantization) if quantization != "none" else None
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(self.path / "chunks.db", check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, document_id TEXT, "
+            "source_id TEXT, content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chunks_document ON chunks (document_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chunks_source ON chunks (source_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS changes (generation INTEGER NOT NULL, row INTEGER NOT NULL, "
+            "PRIMARY KEY (generation, row)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+        self._matrix: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._free: List[int] = []
+        self._filter_index = MetadataFilterIndex()
+        self._write_depth = 0
+        # Rows touched by the current write transaction; None when every row changed
+        self._changed: Optional[Set[int]] = set()
+        self._load()
+        self._generation: Optional[int] = self._read_generation()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    def _load(self) -> None:
+        row = self._conn.execute("SELECT value FROM info WHERE key = 'dim'").fetchone()
+        if row is None:
+            return
+        self.dim = int(row[0])
+        capacity = self._vectors_path.stat().st_size // (self.dim * 4)
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._load_codes(capacity)
+
+        rows = self._conn.execute("SELECT row, id, document_id, metadata FROM chunks").fetchall()
+        size = max((r for r, *_ in rows), default=-1) + 1
+        self._ids = [None] * size
+        self._alive = np.zeros(capacity, dtype=bool)
+        for r, chunk_id, document_id, metadata in rows:
+            self._ids[r] = chunk_id
+            self._rows[chunk_id] = r
+            self._alive[r] = True
+            self._filter_index.set(r, {**json.loads(metadata), "document_id": document_id})
+        self._free = [r for r in range(size) if self._ids[r] is None]
+        logger.info(f"Loaded vector index from {self.path} ({len(rows)} chunks, dim={self.dim})")
+
+    def _read_generation(self) -> int:
+        return self._read_int("generation")
+
+    def _read_int(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _reload(self) -> None:
+        """Drop the in-memory state and rebuild it from disk."""
+        self._matrix = None
+        self.dim = None
+        self._ids = []
+        self._rows = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._free = []
+        self._filter_index = MetadataFilterIndex()
+        self._load()
+
+    def _refresh(self) -> None:
+        """Catch up if another process changed the index since this instance last looked."""
+        with self._lock:
+            generation = self._read_generation()
+            if generation == self._generation:
+                return
+            # Generations up to `log_start` are not (or no longer) covered by the change log
+            if self._generation is None or self._matrix is None or self._generation < self._read_int("log_start"):
+                self._reload()
+            else:
+                self._apply_changes(self._generation)
+            self._generation = generation
+
+    def _apply_changes(self, since: int) -> None:
+        """Reload the rows other processes changed after generation `since`."""
+        rows = sorted(r for (r,) in self._conn.execute(
+            "SELECT DISTINCT row FROM changes WHERE generation > ?", (since,)
+        ))
+        capacity = self._vectors_path.stat().st_size // (self.dim * 4)
+        if capacity > self._matrix.shape[0]:
+            self._remap(capacity)
+        if not rows:
+            return
+
+        for row in rows:
+            chunk_id = self._ids[row] if row < len(self._ids) else None
+            if chunk_id is not None:
+                self._ids[row] = None
+                del self._rows[chunk_id]
+                self._alive[row] = False
+                self._filter_index.remove(row)
+        if rows[-1] >= len(self._ids):
+            self._ids.extend([None] * (rows[-1] + 1 - len(self._ids)))
+
+        for start in range(0, len(rows), LOAD_BLOCK_SIZE):
+            block = rows[start:start + LOAD_BLOCK_SIZE]
+            placeholders = ",".join("?" * len(block))
+            for r, chunk_id, document_id, metadata in self._conn.execute(
+                f"SELECT row, id, document_id, metadata FROM chunks WHERE row IN ({placeholders})", block
+            ):
+                self._ids[r] = chunk_id
+                self._rows[chunk_id] = r
+                self._alive[r] = True
+                self._filter_index.set(r, {**json.loads(metadata), "document_id": document_id})
+
+        changed = set(rows)
+        self._free = [r for r in self._free if r not in changed] + [r for r in rows if self._ids[r] is None]
+        self._on_rows_reloaded(rows)
+
+    def _remap(self, capacity: int) -> None:
+        """Map the matrix after another process grew it to `capacity` rows."""
+        self._matrix.flush()
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        if self._codes is not None:
+            self._codes.open(capacity, self.dim)
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+
+    def _mark_changed(self, rows: Iterable[int]) -> None:
+        """Log rows written by the current transaction for other processes."""
+        if self._changed is not None:
+            self._changed.update(rows)
+
+    def _mark_all_changed(self) -> None:
+        """Make other processes reload everything after the current transaction."""
+        self._changed = None
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Write transaction shared with other processes opening this directory.
+
+        BEGIN IMMEDIATE takes SQLite's write lock, so changes made elsewhere
+        are loaded before ours are applied and no two writers interleave.
+        Reentrant; the outermost block bumps the generation and commits.
+        """
+        with self._lock:
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._write_depth = 1
+            self._changed = set()
+            try:
+                self._refresh()
+                yield
+                generation = self._read_generation() + 1
+                if self._changed is None:
+                    log_start = generation
+                else:
+                    log_start = max(self._read_int("log_start"), generation - CHANGE_LOG_GENERATIONS)
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO changes (generation, row) VALUES (?, ?)",
+                        [(generation, row) for row in self._changed]
+                    )
+                self._conn.execute("DELETE FROM changes WHERE generation <= ?", (log_start,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)",
+                    [("generation", str(generation)), ("log_start", str(log_start))]
+                )
+                self._conn.commit()
+                self._generation = generation
+            except BaseException:
+                self._conn.rollback()
+                # The in-memory state may be ahead of the rolled back rows; reload on next use
+                self._generation = None
+                raise
+            finally:
+                self._write_depth = 0
+
+    def _load_codes(self, capacity: int) -> None:
+        """Map the code files, re-encoding every row if they were built for another mode."""
+        if self._codes is None:
+            return
+        self._codes.open(capacity, self.dim)
+        row = self._conn.execute("SELECT value FROM info WHERE key = 'quantization'").fetchone()
+        if row is not None and row[0] == self._codes.mode:
+            return
+        logger.info(f"Encoding vector index as {self._codes.mode} codes")
+        for start in range(0, capacity, 65536):
+            rows = np.arange(start, min(start + 65536, capacity))
+            self._codes.write(rows, np.asarray(self._matrix[rows]))
+        self._codes.flush()
+        self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('quantization', ?)", (self._codes.mode,))
+        if not self._write_depth:
+            self._conn.commit()
+
+    def _ensure_capacity(self, dim: int, needed: int) -> None:
+        """Create the matrix on first insert and double it until `needed` rows fit."""
+        if self._matrix is None:
+            self.dim = dim
+            self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('dim', ?)", (str(dim),))
+            if self._codes is not None:
+                self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('quantization', ?)", (self._codes.mode,))
+            capacity = max(self.initial_capacity, needed)
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="w+", shape=(capacity, dim))
+            self._alive = np.zeros(capacity, dtype=bool)
+            if self._codes is not None:
+                self._codes.open(capacity, dim)
+            return
+        if dim != self.dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self.dim}")
+
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._matrix.flush()
+        # Growing the backing file in place keeps existing rows where they are
+        self._matrix = open_memmap(self._vectors_path, np.float32, (capacity, dim))
+        if self._codes is not None:
+            self._codes.open(capacity, dim)
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _allocate_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self._ids.append(None)
+        return len(self._ids) - 1
+
+    def _add(self, chunks: List[Chunk]) -> None:
+        vectors = self._normalize(np.stack([chunk.embedding for chunk in chunks]))
+        with self._writing():
+            new_count = len({chunk.id for chunk in chunks if chunk.id not in self._rows})
+            self._ensure_capacity(vectors.shape[1], len(self._ids) + max(new_count - len(self._free), 0))
+
+            records = []
+            rows = []
+            for chunk, vector in zip(chunks, vectors):
+                row = self._rows.get(chunk.id)
+                if row is None:
+                    row = self._allocate_row()
+                    self._ids[row] = chunk.id
+                    self._rows[chunk.id] = row
+                self._matrix[row] = vector
+                self._alive[row] = True
+                self._filter_index.set(row, {**chunk.metadata, "document_id": chunk.document_id})
+                rows.append(row)
+                records.append((
+                    row, chunk.id, chunk.document_id, chunk.metadata.get("source_id"),
+                    chunk.content, json.dumps(chunk.metadata)
+                ))
+            self._matrix.flush()
+            if self._codes is not None:
+                self._codes.write(rows, vectors)
+                self._codes.flush()
+            self._mark_changed(rows)
+            self._on_rows_written(rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (row, id, document_id, source_id, content, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+
+    def _search(self, queries: np.ndarray, k: int, filters: Optional[SearchFilter] = None) -> List[List[Chunk]]:
+        queries = self._normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        with self._lock:
+            self._refresh()
+            size = len(self._ids)
+            allowed = self._filter_index.mask(filters, self._alive[:size])
+            live = int(self._alive[:size].sum() if allowed is None else allowed.sum())
+            if self._matrix is None or live == 0 or k <= 0:
+                return [[] for _ in range(len(queries))]
+
+            results = []
+            for query, rows in zip(queries, self._top_rows(queries, k, allowed)):
+                chunks = self._load_chunks(rows)
+                # Exact float similarity, so results of different indexes can be merged
+                scores = self._matrix[[self._rows[chunk.id] for chunk in chunks]] @ query
+                for chunk, score in zip(chunks, scores.tolist()):
+                    chunk.score = score
+                results.append(chunks)
+            return results
+
+    def _top_rows(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> List[List[int]]:
+        """
+        Rows of the k best live matches per normalized query, limited to the
+        `allowed` row mask when given. Subclasses may approximate.
+        """
+        size = len(self._ids)
+        if self._codes is None and (allowed is None or allowed.sum() > GATHER_MAX_FRACTION * size):
+            return self._exact_top_rows(queries, k, allowed)
+        # Copying out a few admitted rows is cheaper than scoring them all; codes shortlist per query anyway
+        rows = np.flatnonzero(self._alive[:size] if allowed is None else allowed)
+        return [self._rank_rows(query, rows, k) for query in queries]
+
+    def _rank_rows(self, query: np.ndarray, rows: np.ndarray, k: int) -> List[int]:
+        """Best k of the candidate `rows` by float score, shortlisted on codes when quantized."""
+        if not len(rows):
+            return []
+        if self._codes is not None:
+            shortlist = min(len(rows), k * self.rerank_factor)
+            if shortlist < len(rows):
+                rows = rows[np.argpartition(-self._codes.scores(query, rows), shortlist - 1)[:shortlist]]
+        scores = self._matrix[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return rows[top[np.argsort(-scores[top])]].tolist()
+
+    def _exact_top_rows(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> List[List[int]]:
+        size = len(self._ids)
+        admitted = self._alive[:size] if allowed is None else allowed
+        scores = queries @ self._matrix[:size].T
+        scores[:, ~admitted] = -np.inf
+        k = min(k, int(admitted.sum()))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ordered = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        return ordered.tolist()
+
+    def _load_chunks(self, rows: List[int]) -> List[Chunk]:
+        """Materialize chunks for matrix rows, preserving the given order."""
+        if not rows:
+            return []
+        placeholders = ",".join("?" * len(rows))
+        records = {
+            record[0]: record
+            for record in self._conn.execute(
+                f"SELECT row, id, document_id, content, metadata FROM chunks WHERE row IN ({placeholders})", rows
+            )
+        }
+        chunks = []
+        for row in rows:
+            if row not in records:
+                continue
+            _, chunk_id, document_id, content, metadata = records[row]
+            metadata = json.loads(metadata)
+            chunks.append(Chunk(
+                id=chunk_id,
+                document_id=document_id or "unknown",
+                content=content,
+                metadata=metadata,
+                page_number=metadata.get("page") or 0,
+                chunk_index=metadata.get("chunk_index", 0)
+            ))
+        return chunks
+
+    def _on_rows_written(self, rows: List[int]) -> None:
+        """Hook for secondary structures after vectors were written to `rows`."""
+
+    def _on_rows_removed(self, rows: List[int]) -> None:
+        """Hook for secondary structures before `rows` are freed."""
+
+    def _on_rows_reloaded(self, rows: List[int]) -> None:
+        """Hook for secondary structures after `rows` changed by another process were reloaded."""
+
+    def _get_chunks(self, chunk_ids: List[str]) -> List[Chunk]:
+        with self._lock:
+            self._refresh()
+            return self._load_chunks([self._rows[chunk_id] for chunk_id in chunk_ids if chunk_id in self._rows])
+
+    def _remove_rows(self, rows: List[int]) -> None:
+        with self._writing():
+            self._on_rows_removed([row for row in rows if self._ids[row] is not None])
+            for row in rows:
+                chunk_id = self._ids[row]
+                if chunk_id is None:
+                    continue
+                self._ids[row] = None
+                del self._rows[chunk_id]
+                self._filter_index.remove(row)
+                self._alive[row] = False
+                self._free.append(row)
+            self._mark_changed(rows)
+            self._conn.executemany("DELETE FROM chunks WHERE row = ?", [(row,) for row in rows])
+
+    def _delete_document(self, document_id: str) -> None:
+        with self._writing():
+            rows = [r for (r,) in self._conn.execute("SELECT row FROM chunks WHERE document_id = ?", (document_id,))]
+            self._remove_rows(rows)
+
+    def _delete_ids(self, chunk_ids: List[str]) -> None:
+        with self._writing():
+            self._remove_rows([self._rows[chunk_id] for chunk_id in chunk_ids if chunk_id in self._rows])
+
+    def _source_chunks(self, source_id: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id, document_id FROM chunks WHERE source_id = ?", (source_id,))
+            return {chunk_id: document_id or "unknown" for chunk_id, document_id in rows}
+
+    def _update_metadata(self, chunks: List[Chunk]) -> None:
+        with self._writing():
+            for chunk in chunks:
+                if chunk.id in self._rows:
+                    self._filter_index.set(self._rows[chunk.id], {**chunk.metadata, "document_id": chunk.document_id})
+                    self._mark_changed([self._rows[chunk.id]])
+            self._conn.executemany(
+                "UPDATE chunks SET document_id = ?, source_id = ?, metadata = ? WHERE id = ?",
+                [
+                    (chunk.document_id, chunk.metadata.get("source_id"), json.dumps(chunk.metadata), chunk.id)
+                    for chunk in chunks
+                ]
+            )
+
+    def _backfill(self, defaults: Dict[str, Any]) -> int:
+        with self._writing():
+            updates = []
+            for row, document_id, metadata in self._conn.execute("SELECT row, document_id, metadata FROM chunks").fetchall():
+                metadata = json.loads(metadata)
+                missing = {key: value for key, value in defaults.items() if key not in metadata}
+                if not missing:
+                    continue
+                metadata.update(missing)
+                self._filter_index.set(row, {**metadata, "document_id": document_id})
+                updates.append((json.dumps(metadata), row))
+            self._conn.executemany("UPDATE chunks SET metadata = ? WHERE row = ?", updates)
+            if updates:
+                self._mark_all_changed()
+            return len(updates)
+
+    async def add_chunks(self, chunks: List[Chunk]) -> bool:
+        if not chunks:
+            return True
+        await asyncio.to_thread(self._add, chunks)
+        return True
+
+    async def search(self, query_embedding: ArrayLike, k: int = 5, filters: Optional[SearchFilter] = None) -> List[Chunk]:
+        return (await self.search_many([query_embedding], k=k, filters=filters))[0]
+
+    async def search_many(
+        self,
+        query_embeddings: ArrayLike,
+        k: int = 5,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Chunk]]:
+        if not len(query_embeddings):
+            return []
+        return await asyncio.to_thread(self._search, query_embeddings, k, filters)
+
+    async def get_chunks(self, chunk_ids: List[str]) -> List[Chunk]:
+        if not chunk_ids:
+            return []
+        return await asyncio.to_thread(self._get_chunks, chunk_ids)
+
+    async def delete_document_chunks(self, document_id: str) -> bool:
+        await asyncio.to_thread(self._delete_document, document_id)
+        return True
+
+    async def get_source_chunks(self, source_id: str) -> Dict[str, str]:
+        return await asyncio.to_thread(self._source_chunks, source_id)
+
+    async def update_chunk_metadata(self, chunks: List[Chunk]) -> bool:
+        if not chunks:
+            return True
+        await asyncio.to_thread(self._update_metadata, chunks)
+        return True
+
+    async def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        if not chunk_ids:
+            return True
+        await asyncio.to_thread(self._delete_ids, chunk_ids)
+        return True
+
+    async def backfill_metadata(self, defaults: Dict[str, Any]) -> int:
+        return await asyncio.to_thread(self._backfill, defaults)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "chunks": len(self._rows),
+                "capacity": 0 if self._matrix is None else self._matrix.shape[0],
+                "dim": self.dim,
+                "quantization": "none" if self._codes is None else self._codes.mode,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            if self._codes is not None:
+                self._codes.flush()
+            self._conn.close()
@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+SCORE_BLOCK_SIZE = 65536
+
+# Number of set bits for every byte value, for Hamming distances on packed codes
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector scalar quantization; returns (codes, scales) with vector ~= codes * scale."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """One sign bit per dimension, packed 8 per byte."""
+    return np.packbits(vectors > 0, axis=1)
+
+def open_memmap(path: Path, dtype, shape: Tuple[int, ...]) -> np.memmap:
+    """Open `path` as a memmap of `shape`, creating or extending the file; new bytes are zero."""
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    with open(path, "ab") as f:
+        if path.stat().st_size < size:
+            f.truncate(size)
+    return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+class QuantizedCodes:
+    """
+    Compact copies of the index vectors used to shortlist candidates.
+
+    `int8` keeps one byte per dimension plus a float scale per row (4x
+    smaller than float32) and scores by integer dot product. `binary` keeps
+    one bit per dimension (32x smaller) and scores by negative Hamming
+    distance. Codes live in their own memmap next to the float matrix, so
+    the float rows are only paged in for the final re-scoring.
+    """
+
+    def __init__(self, path: Path, mode: str):
+        if mode not in QUANTIZATION_MODES or mode == "none":
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.mode = mode
+        self._codes_path = path / f"codes.{mode}"
+        self._scales_path = path / "codes.scales"
+        self._codes: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+
+    def open(self, capacity: int, dim: int) -> None:
+        """Map (or grow) the code files to hold `capacity` rows."""
+        self.flush()
+        if self.mode == "int8":
+            self._codes = open_memmap(self._codes_path, np.int8, (capacity, dim))
+            self._scales = open_memmap(self._scales_path, np.float32, (capacity,))
+        else:
+            self._codes = open_memmap(self._codes_path, np.uint8, (capacity, (dim + 7) // 8))
+
+    def write(self, rows, vectors: np.ndarray) -> None:
+        if self.mode == "int8":
+            self._codes[rows], self._scales[rows] = quantize_int8(vectors)
+        else:
+            self._codes[rows] = quantize_binary(vectors)
+
+    def scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Approximate similarity of `query` to each row; higher is closer."""
+        out = np.empty(len(rows), dtype=np.float32)
+        if self.mode == "int8":
+            # Integer products stay exact in float32 for realistic dimensions
+            query_codes = quantize_int8(query[None, :])[0][0].astype(np.float32)
+        else:
+            query_bits = quantize_binary(query[None, :])[0]
+
+        for start in range(0, len(rows), SCORE_BLOCK_SIZE):
+            block = rows[start:start + SCORE_BLOCK_SIZE]
+            if self.mode == "int8":
+                out[start:start + len(block)] = (self._codes[block].astype(np.float32) @ query_codes) * self._scales[block]
+            else:
+                distances = POPCOUNT[np.bitwise_xor(self._codes[block], query_bits)].sum(axis=1, dtype=np.int32)
+                out[start:start + len(block)] = -distances
+        return out
+
+    def flush(self) -> None:
+        for array in (self._codes, self._scales):
+            if array is not None:
+                array.flush()
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import heapq
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Literal, Optional, Sequence
+from numpy.typing import ArrayLike
+from app.domain.ports.vector_store import VectorStore
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
+
+logger = logging.getLogger(__name__)
+
+TENANT_PREFIX = "tenant-"
+HASH_PREFIX = "shard-"
+
+def tenant_shard(owner: Optional[str]) -> str:
+    """Shard name holding an owner's chunks; anonymous uploads share one shard."""
+    if not owner:
+        return f"{TENANT_PREFIX}shared"
+    # Usernames are not necessarily valid directory or collection names
+    return TENANT_PREFIX + hashlib.sha256(owner.encode("utf-8")).hexdigest()[:16]
+
+def hash_shard(source_id: str, num_shards: int) -> str:
+    """Shard name for a source; all versions of a source land in the same shard."""
+    digest = hashlib.sha256(source_id.encode("utf-8")).digest()
+    return f"{HASH_PREFIX}{int.from_bytes(digest[:8], 'big') % num_shards:03d}"
+
+def merge_top_k(rankings: Sequence[List[Chunk]], k: int) -> List[Chunk]:
+    """k best chunks of several score-descending lists, by k-way heap merge."""
+    def key(chunk: Chunk) -> float:
+        return -chunk.score if chunk.score is not None else float("inf")
+    return list(islice(heapq.merge(*rankings, key=key), k))
+
+class ShardedVectorStore(VectorStore):
+    """
+    Routes chunks to per-tenant or hash-partitioned shards behind the VectorStore port.
+
+    With the "tenant" strategy each owner's chunks live in their own shard,
+    so owner-filtered queries only touch those owners' shards; with "hash"
+    chunks are spread over `num_shards` shards by source ID. Queries fan out
+    to the target shards concurrently and the per-shard top-k lists are
+    merged by score with a heap.
+
+    Shards are opened through `open_shard(name)` on first use and kept in an
+    LRU of up to `max_open_shards`; when it overflows, the least recently
+    used idle shards are closed. `list_shards()` reports the shards that
+    exist on the backend, including ones never opened by this process.
+    """
+
+    def __init__(
+        self,
+        open_shard: Callable[[str], VectorStore],
+        list_shards: Callable[[], List[str]],
+        strategy: Literal["tenant", "hash"] = "tenant",
+        num_shards: int = 8,
+        max_open_shards: int = 16
+    ):
+        if strategy not in ("tenant", "hash"):
+            raise ValueError(f"Unknown sharding strategy: {strategy}")
+        self.open_shard = open_shard
+        self.list_shards = list_shards
+        self.strategy = strategy
+        self.num_shards = num_shards
+        self.max_open_shards = max_open_shards
+        self.prefix = TENANT_PREFIX if strategy == "tenant" else HASH_PREFIX
+        self._open: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    def _shard_for(self, chunk: Chunk) -> str:
+        if self.strategy == "tenant":
+            return tenant_shard(chunk.metadata.get("owner"))
+        return hash_shard(chunk.metadata.get("source_id") or chunk.document_id, self.num_shards)
+
+    async def _existing_shards(self) -> List[str]:
+        names = set(await asyncio.to_thread(self.list_shards)) | set(self._open)
+        return sorted(name for name in names if name.startswith(self.prefix))
+
+    async def _target_shards(self, filters: Optional[SearchFilter]) -> List[str]:
+        existing = await self._existing_shards()
+        if self.strategy == "tenant" and filters is not None and filters.owners is not None:
+            wanted = {tenant_shard(owner) for owner in filters.owners}
+            return [name for name in existing if name in wanted]
+        return existing
+
+    async def _evict_idle(self) -> None:
+        for name in list(self._open):
+            if len(self._open) <= self.max_open_shards:
+                return
+            if self._pins.get(name):
+                continue
+            shard = self._open.pop(name)
+            close = getattr(shard, "close", None)
+            if close is not None:
+                await asyncio.to_thread(close)
+            logger.info(f"Closed idle vector shard {name}")
+
+    @asynccontextmanager
+    async def _using(self, names: Iterable[str]) -> AsyncIterator[Dict[str, VectorStore]]:
+        """Open (or reuse) shards and keep them from being evicted while in use."""
+        names = list(dict.fromkeys(names))
+        shards = {}
+        async with self._lock:
+            for name in names:
+                if name not in self._open:
+                    self._open[name] = await asyncio.to_thread(self.open_shard, name)
+                    logger.info(f"Opened vector shard {name}")
+                self._open.move_to_end(name)
+                self._pins[name] = self._pins.get(name, 0) + 1
+                shards[name] = self._open[name]
+            await self._evict_idle()
+        try:
+            yield shards
+        finally:
+            async with self._lock:
+                for name in names:
+                    self._pins[name] -= 1
+                    if not self._pins[name]:
+                        del self._pins[name]
+                await self._evict_idle()
+
+    def _group(self, chunks: List[Chunk]) -> Dict[str, List[Chunk]]:
+        groups: Dict[str, List[Chunk]] = {}
+        for chunk in chunks:
+            groups.setdefault(self._shard_for(chunk), []).append(chunk)
+        return groups
+
+    async def add_chunks(self, chunks: List[Chunk]) -> bool:
+        groups = self._group(chunks)
+        async with self._using(groups) as shards:
+            results = await asyncio.gather(*(shards[name].add_chunks(group) for name, group in groups.items()))
+        return all(results)
+
+    async def search(self, query_embedding: ArrayLike, k: int = 5, filters: Optional[SearchFilter] = None) -> List[Chunk]:
+        return (await self.search_many([query_embedding], k=k, filters=filters))[0]
+
+    async def search_many(
+        self,
+        query_embeddings: ArrayLike,
+        k: int = 5,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Chunk]]:
+        if not len(query_embeddings):
+            return []
+        names = await self._target_shards(filters)
+        if not names:
+            return [[] for _ in query_embeddings]
+        async with self._using(names) as shards:
+            per_shard = await asyncio.gather(*(
+                shards[name].search_many(query_embeddings, k=k, filters=filters) for name in names
+            ))
+        return [
+            merge_top_k([results[i] for results in per_shard], k)
+            for i in range(len(query_embeddings))
+        ]
+
+    async def get_chunks(self, chunk_ids: List[str]) -> List[Chunk]:
+        if not chunk_ids:
+            return []
+        # IDs do not identify their shard; warm shards (e.g. those just searched) are tried first
+        found: Dict[str, Chunk] = {}
+        warm = [name for name in self._open if name.startswith(self.prefix)]
+        cold = [name for name in await self._existing_shards() if name not in warm]
+        for names in (warm, cold):
+            missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in found]
+            if not missing or not names:
+                continue
+            async with self._using(names) as shards:
+                results = await asyncio.gather(*(shards[name].get_chunks(missing) for name in names))
+            found.update((chunk.id, chunk) for chunks in results for chunk in chunks)
+        return [found[chunk_id] for chunk_id in chunk_ids if chunk_id in found]
+
+    async def _broadcast(self, call: Callable[[VectorStore], Awaitable[Any]]) -> List[Any]:
+        """Run `call` on every existing shard concurrently."""
+        names = await self._existing_shards()
+        if not names:
+            return []
+        async with self._using(names) as shards:
+            return await asyncio.gather(*(call(shards[name]) for name in names))
+
+    async def delete_document_chunks(self, document_id: str) -> bool:
+        return all(await self._broadcast(lambda shard: shard.delete_document_chunks(document_id)))
+
+    async def get_source_chunks(self, source_id: str) -> Dict[str, str]:
+        if self.strategy == "hash":
+            name = hash_shard(source_id, self.num_shards)
+            if name not in await self._existing_shards():
+                return {}
+            async with self._using([name]) as shards:
+                return await shards[name].get_source_chunks(source_id)
+        merged: Dict[str, str] = {}
+        for chunks in await self._broadcast(lambda shard: shard.get_source_chunks(source_id)):
+            merged.update(chunks)
+        return merged
+
+    async def update_chunk_metadata(self, chunks: List[Chunk]) -> bool:
+        groups = self._group(chunks)
+        async with self._using(groups) as shards:
+            results = await asyncio.gather(*(
+                shards[name].update_chunk_metadata(group) for name, group in groups.items()
+            ))
+        return all(results)
+
+    async def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        if not chunk_ids:
+            return True
+        return all(await self._broadcast(lambda shard: shard.delete_chunks(chunk_ids)))
+
+    async def backfill_metadata(self, defaults: Dict[str, Any]) -> int:
+        # Tenant shards are chosen by owner; chunks without one already live in the shared shard
+        return sum(await self._broadcast(lambda shard: shard.backfill_metadata(defaults)))
+
+    def close(self) -> None:
+        for shard in self._open.values():
+            close = getattr(shard, "close", None)
+            if close is not None:
+                close()
+        self._open.clear()
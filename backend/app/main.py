@@ -1,9 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.routes import health, ingest, auth
+from app.api.routes import health, ingest, auth, documents
 from app.api import websocket
+from app.api.middleware import RequestSizeLimitMiddleware, MULTIPART_OVERHEAD
 from app.infrastructure.database.models import init_db
+from app.core.dependencies import get_answer_cache, get_queue_service
+import asyncio
 
 app = FastAPI(title=settings.APP_NAME)
 
@@ -12,6 +15,27 @@ app = FastAPI(title=settings.APP_NAME)
 async def startup_event():
     init_db()
 
+    # Keep the semantic answer cache coherent with re-ingested/deleted documents
+    answer_cache = get_answer_cache()
+    if answer_cache:
+        async def on_document_event(event: dict):
+            if event.get("document_id"):
+                answer_cache.invalidate_document(event["document_id"])
+
+        app.state.event_listener = asyncio.create_task(
+            get_queue_service().listen_events(on_document_event)
+        )
+
+# Refuse oversized uploads before the multipart body is spooled. Registered
+# before CORS so CORS wraps it and its 413 responses carry CORS headers.
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={
+        settings.API_V1_STR + "/ingest": settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+        settings.API_V1_STR + "/ingest/bulk": settings.MAX_BULK_UPLOAD_SIZE,
+    },
+)
+
 # CORS Config
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +49,7 @@ app.add_middleware(
 app.include_router(auth.router, prefix=settings.API_V1_STR + "/auth", tags=["Auth"])
 app.include_router(health.router, prefix=settings.API_V1_STR, tags=["Health"])
 app.include_router(ingest.router, prefix=settings.API_V1_STR, tags=["Ingestion"])
+app.include_router(documents.router, prefix=settings.API_V1_STR, tags=["Documents"])
 app.include_router(websocket.router, prefix="/ws", tags=["Chat"])
 
 @app.get("/")
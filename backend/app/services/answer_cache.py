@@ -0,0 +1,122 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from uuid import uuid4
+import numpy as np
+from numpy.typing import ArrayLike
+
+@dataclass
+class _CachedAnswer:
+    embedding: np.ndarray
+    events: List[dict]
+    document_ids: Set[str]
+    scope: str = ""
+    created_at: float = field(default_factory=time.monotonic)
+
+class SemanticAnswerCache:
+    """
+    Cache of streamed RAG answers looked up by query-embedding similarity.
+
+    A hit returns the recorded citation/token event sequence so it can be
+    replayed without a vector search or LLM call. Entries expire after
+    `ttl_seconds`, the least recently used entry is evicted beyond
+    `max_entries`, and entries citing a document are dropped when that
+    document changes. Answers only match lookups made with the same
+    `scope` (the searchable subset, e.g. one user's documents).
+    """
+
+    def __init__(self, similarity_threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 1000):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CachedAnswer]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._matrix_scopes: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def lookup(self, query_embedding: ArrayLike, scope: str = "") -> Optional[List[dict]]:
+        """Return the cached events of the most similar past query in `scope`, if above threshold."""
+        query = self._normalize(query_embedding)
+        with self._lock:
+            self._purge_expired()
+            if not self._entries:
+                self._misses += 1
+                return None
+
+            matrix = self._get_matrix()
+            scores = matrix @ query
+            scores[self._matrix_scopes != scope] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self._misses += 1
+                return None
+
+            key = self._matrix_keys[best]
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return copy.deepcopy(self._entries[key].events)
+
+    def store(self, query_embedding: ArrayLike, events: List[dict], document_ids: Set[str], scope: str = "") -> None:
+        """Record the events streamed for a query in `scope` and the documents they cite."""
+        with self._lock:
+            self._entries[str(uuid4())] = _CachedAnswer(
+                embedding=self._normalize(query_embedding),
+                events=copy.deepcopy(events),
+                document_ids=set(document_ids),
+                scope=scope
+            )
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def invalidate_document(self, document_id: str) -> int:
+        """Drop every entry that cited `document_id`. Returns the number removed."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if document_id in entry.document_ids]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._matrix = None
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+            }
+
+    def _purge_expired(self) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.created_at < deadline]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _get_matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[key].embedding for key in self._matrix_keys])
+            self._matrix_scopes = np.array([self._entries[key].scope for key in self._matrix_keys], dtype=object)
+        return self._matrix
+
+    @staticmethod
+    def _normalize(embedding: ArrayLike) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
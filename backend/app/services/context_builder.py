@@ -1,10 +1,149 @@
-from typing import List
+import logging
+import re
+import tiktoken
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
 from app.domain.models.chunk import Chunk
 
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+@dataclass
+class _Passage:
+    """One or more merged chunks of the same document, ranked by their best chunk."""
+    rank: int
+    document_id: str
+    filename: str
+    text: str
+    start: Optional[int]
+    end: Optional[int]
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken, or approximates ~4 characters per token when
+    the encoding is unavailable (e.g. offline containers without the BPE file).
+    """
+
+    def __init__(self, encoding_name: Optional[str] = "cl100k_base"):
+        self._encoding = None
+        if encoding_name:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding {encoding_name} unavailable, approximating token counts: {e}")
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self._encoding is not None:
+            return self._encoding.decode(self._encoding.encode(text, disallowed_special=())[:max_tokens])
+        return text[:max_tokens * 4]
+
 class ContextBuilder:
+    """
+    Packs retrieved chunks into a prompt context under a token budget.
+
+    Chunks are expected in relevance order. Overlapping or touching chunks of
+    the same document are merged using their offsets (so splitter overlap is
+    paid for once), passages mostly contained in a better-ranked one are
+    dropped, and the rest are added best-first until `token_budget` is used;
+    a passage that does not fit is truncated if enough room is left.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        encoding_name: Optional[str] = "cl100k_base",
+        near_duplicate_threshold: float = 0.9,
+        min_truncated_tokens: int = 64
+    ):
+        self.token_budget = token_budget
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.min_truncated_tokens = min_truncated_tokens
+        self.tokens = TokenCounter(encoding_name)
+
     def build_context(self, chunks: List[Chunk]) -> str:
         context_parts = []
-        for i, chunk in enumerate(chunks):
-            context_parts.append(f"Source {i+1} ({chunk.metadata.get('filename', 'unknown')}): {chunk.content}")
-        
+        remaining = self.token_budget
+        for passage in self._deduplicate(self._merge(chunks)):
+            header = f"Source {len(context_parts)+1} ({passage.filename}): "
+            cost = self.tokens.count(header) + self.tokens.count(passage.text) + 1
+            text = passage.text
+            if cost > remaining:
+                room = remaining - self.tokens.count(header) - 1
+                if room < self.min_truncated_tokens:
+                    continue
+                text = self.tokens.truncate(text, room)
+                cost = remaining
+            context_parts.append(f"{header}{text}")
+            remaining -= cost
+
         return "\n\n".join(context_parts)
+
+    @staticmethod
+    def _merge(chunks: List[Chunk]) -> List[_Passage]:
+        passages = [
+            _Passage(
+                rank=rank,
+                document_id=chunk.document_id,
+                filename=chunk.metadata.get("filename", "unknown"),
+                text=chunk.content,
+                start=chunk.metadata.get("start_offset"),
+                end=chunk.metadata.get("end_offset")
+            )
+            for rank, chunk in enumerate(chunks)
+        ]
+
+        by_document: Dict[str, List[_Passage]] = {}
+        merged = []
+        for passage in passages:
+            if passage.start is None or passage.end is None:
+                merged.append(passage)
+            else:
+                by_document.setdefault(passage.document_id, []).append(passage)
+
+        for group in by_document.values():
+            group.sort(key=lambda p: p.start)
+            current = group[0]
+            for passage in group[1:]:
+                if passage.start > current.end:
+                    merged.append(current)
+                    current = passage
+                    continue
+                # Overlapping or touching: append only the part not already covered
+                if passage.end > current.end:
+                    current.text += passage.text[current.end - passage.start:]
+                    current.end = passage.end
+                current.rank = min(current.rank, passage.rank)
+            merged.append(current)
+
+        return sorted(merged, key=lambda p: p.rank)
+
+    def _deduplicate(self, passages: List[_Passage]) -> List[_Passage]:
+        kept: List[_Passage] = []
+        kept_shingles: List[Set[tuple]] = []
+        for passage in passages:
+            shingles = self._shingles(passage.text)
+            if any(self._coverage(shingles, other) >= self.near_duplicate_threshold for other in kept_shingles):
+                continue
+            kept.append(passage)
+            kept_shingles.append(shingles)
+        return kept
+
+    @staticmethod
+    def _shingles(text: str, size: int = 3) -> Set[tuple]:
+        words = WORD_PATTERN.findall(text.lower())
+        if len(words) < size:
+            return {tuple(words)}
+        return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    @staticmethod
+    def _coverage(candidate: Set[tuple], kept: Set[tuple]) -> float:
+        """Fraction of the candidate's shingles already present in a kept passage."""
+        if not candidate or not kept:
+            return 0.0
+        return len(candidate & kept) / len(candidate)
@@ -1,8 +1,13 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from app.domain.models.search_filter import SearchFilter
 from app.domain.ports.llm_provider import LLMProvider
 from app.domain.ports.vector_store import VectorStore
 from app.services.context_builder import ContextBuilder
 from app.infrastructure.embedding.embedding_service import EmbeddingService
+from app.infrastructure.embedding.micro_batcher import MicroBatchEmbedder
+from app.services.answer_cache import SemanticAnswerCache
+from app.infrastructure.embedding.reranker import CrossEncoderReranker
+from app.services.retriever import HybridRetriever, rerank_within_budget
 from app.core.logging import logger
 
 class RAGService:
@@ -11,31 +16,75 @@ class RAGService:
         llm_provider: LLMProvider,
         vector_store: VectorStore,
         context_builder: ContextBuilder,
-        embedding_service: EmbeddingService
+        embedding_service: EmbeddingService,
+        query_embedder: Optional[MicroBatchEmbedder] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        retriever: Optional[HybridRetriever] = None,
+        top_k: int = 3,
+        reranker: Optional[CrossEncoderReranker] = None,
+        rerank_candidates: int = 20,
+        rerank_timeout: float = 0.3
     ):
         self.llm_provider = llm_provider
         self.vector_store = vector_store
         self.context_builder = context_builder
         self.embedding_service = embedding_service
+        self.query_embedder = query_embedder
+        self.answer_cache = answer_cache
+        self.retriever = retriever
+        self.top_k = top_k
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.rerank_timeout = rerank_timeout
 
-    async def query_stream(self, query: str) -> AsyncGenerator[dict, None]:
+    async def query_stream(self, query: str, filters: Optional[SearchFilter] = None) -> AsyncGenerator[dict, None]:
         # 1. Embed query using real embedding service
         logger.info(f"Embedding query: {query[:50]}...")
-        query_embedding = self.embedding_service.embed_text(query)
+        if self.query_embedder:
+            query_embedding = await self.query_embedder.embed(query)
+        else:
+            query_embedding = await self.embedding_service.aembed_text(query)
+
+        # Replay a cached answer to a near-identical question over the same documents
+        scope = filters.cache_scope() if filters else ""
+        if self.answer_cache:
+            cached_events = self.answer_cache.lookup(query_embedding, scope=scope)
+            if cached_events is not None:
+                logger.info("Serving query from semantic answer cache")
+                for event in cached_events:
+                    yield event
+                yield {"type": "done", "payload": True}
+                return
 
         # 2. Retrieve relevant chunks
-        chunks = await self.vector_store.search(query_embedding, k=3)
+        # Over-fetch when a re-ranker will pick the final top_k
+        k = max(self.top_k, self.rerank_candidates) if self.reranker else self.top_k
+        if self.retriever:
+            chunks = await self.retriever.retrieve(query, query_embedding, k=k, filters=filters)
+        else:
+            chunks = await self.vector_store.search(query_embedding, k=k, filters=filters)
+        if self.reranker:
+            chunks = await rerank_within_budget(
+                self.reranker.ascore, query, chunks, self.top_k, self.rerank_timeout,
+                busy=self.reranker.executor.is_busy
+            )
+        events = []
+        failed = False
         
         # 3. Stream citations first (or parallel, but frontend expects them)
         for chunk in chunks:
-            yield {
+            event = {
                 "type": "citation",
                 "payload": {
                     "source": chunk.metadata.get("filename", "unknown"),
-                    "page": chunk.metadata.get("page", 1),
-                    "text": chunk.content[:50] + "..."
+                    "page": chunk.page_number or 1,
+                    "text": chunk.content[:50] + "...",
+                    "start_offset": chunk.metadata.get("start_offset"),
+                    "end_offset": chunk.metadata.get("end_offset")
                 }
             }
+            events.append(event)
+            yield event
 
         # 4. Build context
         context = self.context_builder.build_context(chunks)
@@ -44,9 +93,17 @@ class RAGService:
         # 5. Stream LLM tokens
         try:
             async for token in self.llm_provider.generate_stream(query, system_prompt):
-                yield {"type": "token", "payload": token}
+                event = {"type": "token", "payload": token}
+                events.append(event)
+                yield event
         except Exception as e:
             logger.error(f"Error during LLM generation: {e}")
+            failed = True
             yield {"type": "error", "payload": str(e)}
 
+        if self.answer_cache and not failed:
+            self.answer_cache.store(
+                query_embedding, events, {chunk.document_id for chunk in chunks}, scope=scope
+            )
+
         yield {"type": "done", "payload": True}
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+from numpy.typing import ArrayLike
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
+from app.domain.ports.lexical_index import LexicalIndex
+from app.domain.ports.vector_store import VectorStore
+from app.core.logging import logger
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Merge ranked ID lists; each list contributes 1 / (k + rank) per ID."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+async def rerank_within_budget(
+    score: Callable[[str, List[str]], Awaitable[List[float]]],
+    query: str,
+    chunks: List[Chunk],
+    top_n: int,
+    timeout: float,
+    busy: Optional[Callable[[], bool]] = None
+) -> List[Chunk]:
+    """
+    Keep the top_n chunks by `score(query, passages)`.
+
+    If scoring fails or takes longer than `timeout` seconds the chunks keep
+    their retrieval order, so re-ranking can only add bounded latency. A
+    timeout only abandons the await; the scorer keeps its thread until it
+    finishes, so when `busy()` reports the scorer is still occupied the
+    stage is skipped instead of queueing behind that work.
+    """
+    if len(chunks) <= 1:
+        return chunks[:top_n]
+    if busy is not None and busy():
+        logger.warning("Re-ranker is busy, keeping retrieval order")
+        return chunks[:top_n]
+    try:
+        scores = await asyncio.wait_for(score(query, [chunk.content for chunk in chunks]), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Re-ranking exceeded {timeout * 1000:.0f}ms budget, keeping retrieval order")
+        return chunks[:top_n]
+    except Exception as e:
+        logger.error(f"Re-ranking failed, keeping retrieval order: {e}")
+        return chunks[:top_n]
+
+    order = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+    return [chunks[i] for i in order[:top_n]]
+
+class HybridRetriever:
+    """
+    Dense + BM25 retrieval fused with reciprocal rank fusion.
+
+    Both retrievers run concurrently and return `candidates` results each;
+    the fused top-k keeps exact-term matches (part numbers, error codes,
+    names) that embeddings tend to blur. Chunks found only lexically are
+    fetched from the vector store by ID.
+    """
+
+    def __init__(self, vector_store: VectorStore, lexical_index: LexicalIndex, candidates: int = 20, rrf_k: int = 60):
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    async def retrieve(
+        self,
+        query: str,
+        query_embedding: ArrayLike,
+        k: int = 3,
+        filters: Optional[SearchFilter] = None
+    ) -> List[Chunk]:
+        dense, lexical = await asyncio.gather(
+            self.vector_store.search(query_embedding, k=max(k, self.candidates), filters=filters),
+            self.lexical_index.search(query, k=max(k, self.candidates), filters=filters),
+            return_exceptions=True
+        )
+        if isinstance(dense, BaseException):
+            raise dense
+        if isinstance(lexical, BaseException):
+            # Keyword search is an enhancement; dense results alone still answer the query
+            logger.error(f"Lexical search failed, using dense results only: {lexical}")
+            return dense[:k]
+
+        fused = reciprocal_rank_fusion(
+            [[chunk.id for chunk in dense], [chunk_id for chunk_id, _ in lexical]], k=self.rrf_k
+        )[:k]
+        found = {chunk.id: chunk for chunk in dense}
+        missing = [chunk_id for chunk_id in fused if chunk_id not in found]
+        if missing:
+            found.update((chunk.id, chunk) for chunk in await self.vector_store.get_chunks(missing))
+        return [found[chunk_id] for chunk_id in fused if chunk_id in found]
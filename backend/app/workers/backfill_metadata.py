@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+import logging
+import time
+from app.core.dependencies import get_vector_store, get_lexical_index
+from app.domain.models.search_filter import SHARED_OWNER
+
+logger = logging.getLogger(__name__)
+
+async def backfill(indexed_at: float) -> None:
+    """
+    Give chunks indexed before owner scoping the shared owner and an index time.
+
+    Chat searches are always restricted to the caller's and shared owners,
+    so chunks without an `owner` field never match them. Chunks that already
+    have the fields are left untouched, so running this again is harmless.
+    """
+    defaults = {"owner": SHARED_OWNER, "indexed_at": indexed_at}
+    updated = await get_vector_store().backfill_metadata(defaults)
+    logger.info(f"Backfilled owner and index time on {updated} vector store chunks")
+
+    lexical_index = get_lexical_index()
+    if lexical_index:
+        updated = await lexical_index.backfill_metadata(defaults)
+        logger.info(f"Backfilled owner and index time on {updated} lexical index chunks")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill owner and index time on chunks indexed before owner scoping")
+    parser.add_argument(
+        "--indexed-at",
+        type=float,
+        default=None,
+        help="Unix timestamp recorded as the index time of backfilled chunks (defaults to now)"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(backfill(args.indexed_at if args.indexed_at is not None else time.time()))
@@ -0,0 +1,138 @@
+import asyncio
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+import aiofiles
+import pypdf
+from langchain_text_splitters import TextSplitter
+
+def count_pdf_pages(file_path: str) -> int:
+    return len(pypdf.PdfReader(file_path).pages)
+
+def extract_pdf_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Extract text for pages [start, end). Runs inside a worker process."""
+    reader = pypdf.PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+async def iter_pdf_pages(
+    file_path: str,
+    executor: Executor,
+    pages_per_task: int = 8,
+    max_inflight_tasks: int = 4
+) -> AsyncIterator[str]:
+    """
+    Yield page texts in order while extraction fans out across `executor`.
+
+    At most `max_inflight_tasks` page ranges are extracted ahead of the
+    consumer, so memory stays bounded regardless of page count.
+    """
+    loop = asyncio.get_running_loop()
+    total_pages = await loop.run_in_executor(executor, count_pdf_pages, file_path)
+    ranges = deque(
+        (start, min(start + pages_per_task, total_pages))
+        for start in range(0, total_pages, pages_per_task)
+    )
+
+    inflight = deque()
+    try:
+        while ranges or inflight:
+            while ranges and len(inflight) < max_inflight_tasks:
+                start, end = ranges.popleft()
+                inflight.append(loop.run_in_executor(executor, extract_pdf_page_range, file_path, start, end))
+            for page_text in await inflight.popleft():
+                yield page_text
+    finally:
+        for future in inflight:
+            future.cancel()
+
+async def iter_text_blocks(file_path: str, block_size: int = 64 * 1024) -> AsyncIterator[str]:
+    """Yield a text file in fixed-size blocks."""
+    async with aiofiles.open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        while True:
+            block = await f.read(block_size)
+            if not block:
+                break
+            yield block
+
+@dataclass
+class ChunkSpan:
+    """A chunk of text with its position in the extracted document stream."""
+    text: str
+    start_offset: int
+    end_offset: int
+    page_number: int
+
+class StreamingChunker:
+    """
+    Incrementally applies a text splitter to streamed text.
+
+    Every fed segment is split together with the carried-over tail; all but
+    the last piece are final and returned, the raw text of the last piece is
+    carried forward because it may continue in the next segment.
+
+    Offsets are character positions in the concatenation of all fed
+    segments (including separators), and each chunk is attributed to the
+    page its first character falls on.
+    """
+
+    def __init__(self, splitter: TextSplitter):
+        self.splitter = splitter
+        self._buffer = ""
+        self._buffer_offset = 0
+        self._page_offsets: List[int] = []
+        self._page_numbers: List[int] = []
+
+    def feed(self, text: str, separator: str = "", page_number: Optional[int] = None) -> List[ChunkSpan]:
+        if not text:
+            return []
+        if not self._buffer:
+            separator = ""
+        if page_number is not None:
+            self._page_offsets.append(self._buffer_offset + len(self._buffer) + len(separator))
+            self._page_numbers.append(page_number)
+        self._buffer = f"{self._buffer}{separator}{text}"
+
+        spans = self._split()
+        if len(spans) <= 1:
+            return []
+
+        tail = spans[-1]
+        self._buffer = self._buffer[tail.start_offset - self._buffer_offset:]
+        self._buffer_offset = tail.start_offset
+        self._forget_pages_before(self._buffer_offset)
+        return spans[:-1]
+
+    def flush(self) -> List[ChunkSpan]:
+        spans = self._split() if self._buffer else []
+        self._buffer_offset += len(self._buffer)
+        self._buffer = ""
+        return spans
+
+    def _split(self) -> List[ChunkSpan]:
+        spans = []
+        search_from = 0
+        previous = None
+        for piece in self.splitter.split_text(self._buffer):
+            # A piece may start where the previous one did (e.g. "ccc" then "ccc a"),
+            # but an identical repeated piece must be a later occurrence
+            index = self._buffer.find(piece, search_from + (piece == previous))
+            if index < 0:
+                index = search_from
+            start = self._buffer_offset + index
+            spans.append(ChunkSpan(piece, start, start + len(piece), self._page_at(start)))
+            search_from = index
+            previous = piece
+        return spans
+
+    def _page_at(self, offset: int) -> int:
+        position = bisect_right(self._page_offsets, offset) - 1
+        if position < 0:
+            return self._page_numbers[0] if self._page_numbers else 1
+        return self._page_numbers[position]
+
+    def _forget_pages_before(self, offset: int) -> None:
+        keep_from = max(bisect_right(self._page_offsets, offset) - 1, 0)
+        del self._page_offsets[:keep_from]
+        del self._page_numbers[:keep_from]
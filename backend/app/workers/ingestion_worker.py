@@ -1,48 +1,144 @@
+import argparse
 import asyncio
+import hashlib
 import json
 import logging
 import os
-from app.core.dependencies import get_queue_service, get_vector_store, get_file_store, get_embedding_service
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.dependencies import get_queue_service, get_vector_store, get_file_store, get_embedding_service, get_lexical_index
 from app.domain.models.chunk import Chunk
-from app.domain.models.document import Document
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.models.search_filter import SHARED_OWNER
+from app.infrastructure.database.models import AsyncSessionLocal, init_db
+from app.infrastructure.database.document_repository import DocumentRepository
+from app.workers.document_reader import ChunkSpan, StreamingChunker, iter_pdf_pages, iter_text_blocks
 # Simple text splitter placeholder
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-import pypdf
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class _IndexingJob:
+    """Bookkeeping for one document while its chunks stream through the worker."""
+    document_id: str
+    source_id: str
+    filename: str
+    owner: str = SHARED_OWNER
+    indexed_at: float = field(default_factory=time.time)
+    existing: Dict[str, str] = field(default_factory=dict)
+    seen: Set[str] = field(default_factory=set)
+    # Keyed by a digest of the chunk text so the counter does not hold the whole document
+    occurrences: Counter = field(default_factory=Counter)
+    chunk_count: int = 0
+    embedded: int = 0
+
 class IngestionWorker:
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
         self.queue = get_queue_service()
         self.vector_store = get_vector_store()
         self.file_store = get_file_store()
         self.embedding_service = get_embedding_service()
+        self.lexical_index = get_lexical_index()
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP
         )
+        # PDF pages are parsed in separate processes shared by all in-flight jobs;
+        # pypdf is pure Python and holds the GIL. Embedding runs on the bounded
+        # inference executor so every job shares a single model copy.
+        self.parse_pool = ProcessPoolExecutor(max_workers=settings.INGEST_PDF_WORKERS)
 
-    def _extract_text_from_pdf(self, file_path: str) -> str:
-        try:
-            reader = pypdf.PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() or ""
-            return text
-        except Exception as e:
-            logger.error(f"Failed to extract PDF text from {file_path}: {e}")
-            raise e
+    def _iter_segments(self, filename: str, file_path: str) -> AsyncIterator[Tuple[str, str, Optional[int]]]:
+        """Yield (separator, text, page_number) segments of the document as they are extracted."""
+        async def pdf_segments():
+            page_number = 0
+            async for page_text in iter_pdf_pages(
+                file_path,
+                self.parse_pool,
+                pages_per_task=settings.INGEST_PAGES_PER_TASK,
+                max_inflight_tasks=settings.INGEST_MAX_INFLIGHT_TASKS
+            ):
+                page_number += 1
+                yield "\n", page_text, page_number
 
-    def _read_text_file(self, file_path: str) -> str:
-        # Synchronous read for simplicity in this worker implementation, 
-        # but since we are in a worker, blocking a thread is acceptable or we could use aiofiles
-        # However, pypdf is blocking anyway.
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"Failed to read text file {file_path}: {e}")
-            raise e
+        async def text_segments():
+            async for block in iter_text_blocks(file_path):
+                yield "", block, None
+
+        if filename.lower().endswith(".pdf"):
+            return pdf_segments()
+        return text_segments()
+
+    @staticmethod
+    def _chunk_id(source_id: str, content: str, occurrence: int) -> str:
+        """
+        Deterministic chunk ID from the document's source and the chunk text.
+
+        Keyed by the stable source rather than the version's content hash so
+        unchanged chunks keep their ID (and embedding) across edits.
+        """
+        key = f"{source_id}\x00{occurrence}\x00{content}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    async def _index_batch(self, job: "_IndexingJob", spans: List[ChunkSpan]) -> None:
+        """Embed and upsert the new chunks of one rolling batch; refresh metadata of unchanged ones."""
+        new_chunks = []
+        kept_chunks = []
+        for span in spans:
+            text_digest = hashlib.sha256(span.text.encode("utf-8")).digest()
+            occurrence = job.occurrences[text_digest]
+            job.occurrences[text_digest] += 1
+            chunk_id = self._chunk_id(job.source_id, span.text, occurrence)
+            job.seen.add(chunk_id)
+
+            chunk = Chunk(
+                id=chunk_id,
+                document_id=job.document_id,
+                content=span.text,
+                page_number=span.page_number,
+                chunk_index=job.chunk_count,
+                metadata={
+                    "document_id": job.document_id,
+                    "source_id": job.source_id,
+                    "filename": job.filename,
+                    "owner": job.owner,
+                    "indexed_at": job.indexed_at,
+                    "chunk_index": job.chunk_count,
+                    "page": span.page_number,
+                    "start_offset": span.start_offset,
+                    "end_offset": span.end_offset
+                }
+            )
+            job.chunk_count += 1
+            if chunk_id in job.existing:
+                kept_chunks.append(chunk)
+            else:
+                new_chunks.append(chunk)
+
+        if new_chunks:
+            embeddings = await self.embedding_service.aembed_batch([chunk.content for chunk in new_chunks])
+            # Each chunk references its row of the float32 batch array; nothing is copied
+            for chunk, embedding in zip(new_chunks, embeddings):
+                chunk.embedding = embedding
+            await self.vector_store.add_chunks(new_chunks)
+            if self.lexical_index:
+                await self.lexical_index.add_chunks(new_chunks)
+            job.embedded += len(new_chunks)
+
+        # Positions may have shifted even when the text did not
+        await self.vector_store.update_chunk_metadata(kept_chunks)
+        if self.lexical_index:
+            await self.lexical_index.update_chunk_metadata(kept_chunks)
+
+    async def _set_status(self, document_id: str, status: DocumentStatus, **fields) -> None:
+        async with AsyncSessionLocal() as session:
+            await DocumentRepository(session).set_status(document_id, status, **fields)
 
     async def process_message(self, message: dict):
         logger.info(f"Processing message: {message}")
@@ -55,48 +151,104 @@ class IngestionWorker:
                 logger.error("Invalid message format")
                 return
 
-            # 1. Extract content based on file type
-            content = ""
-            if filename.lower().endswith(".pdf"):
-                content = self._extract_text_from_pdf(file_path)
-            else:
-                content = self._read_text_file(file_path)
-            
-            if not content:
-                logger.warning(f"No content extracted from {filename}")
-                return
-
-            # 2. Chunk text
-            texts = self.text_splitter.split_text(content)
-            
-            # 3. Generate embeddings for all chunks (batch processing for efficiency)
-            logger.info(f"Generating embeddings for {len(texts)} chunks")
-            embeddings = self.embedding_service.embed_batch(texts)
-            
-            # 4. Create Chunks with real embeddings
-            chunks = []
-            for i, (text, embedding) in enumerate(zip(texts, embeddings)):
-                chunk = Chunk(
-                    document_id=document_id,
-                    content=text,
-                    embedding=embedding,
-                    metadata={
-                        "filename": filename,
-                        "chunk_index": i
-                    }
-                )
-                chunks.append(chunk)
-
-            # 5. Store in Vector DB
-            await self.vector_store.add_chunks(chunks)
-            logger.info(f"Successfully processed document {filename} with {len(chunks)} chunks")
+            job = _IndexingJob(
+                document_id=document_id,
+                source_id=message.get("source_id") or document_id,
+                filename=filename,
+                owner=message.get("owner") or SHARED_OWNER
+            )
+            # Versions of one source share chunk IDs; indexing two at once would delete each other's chunks
+            async with self.queue.lock(f"source:{job.source_id}"):
+                await self._index_document(job, file_path)
 
         except Exception as e:
             logger.error(f"Error processing document: {e}")
+            try:
+                await self._set_status(message.get("document_id"), DocumentStatus.FAILED, error=str(e))
+            except Exception as status_error:
+                logger.error(f"Failed to record document failure: {status_error}")
+            # Let the queue retry or dead-letter the message
+            raise
+
+    async def _index_document(self, job: "_IndexingJob", file_path: str) -> None:
+        document_id = job.document_id
+        filename = job.filename
+        async with AsyncSessionLocal() as session:
+            record = await DocumentRepository(session).get(document_id)
+        if record is None:
+            # Deleted while queued, or superseded by a newer version already indexed
+            logger.info(f"Skipping document {document_id}: it is no longer in the registry")
+            return
+        await self._set_status(document_id, DocumentStatus.PROCESSING)
+
+        # 1. Look up what is already indexed for this source
+        job.existing = await self.vector_store.get_source_chunks(job.source_id)
+
+        # 2. Stream content and chunk it as it arrives
+        chunker = StreamingChunker(self.text_splitter)
+        batch: List[ChunkSpan] = []
+
+        async for separator, segment, page_number in self._iter_segments(filename, file_path):
+            batch.extend(chunker.feed(segment, separator, page_number))
+
+            # 3. Embed and store in rolling batches so memory stays bounded
+            if len(batch) >= settings.INGEST_BATCH_SIZE:
+                await self._index_batch(job, batch)
+                batch = []
+
+        batch.extend(chunker.flush())
+        if batch:
+            await self._index_batch(job, batch)
+
+        # 4. Drop chunks that no longer exist in this version
+        stale = [chunk_id for chunk_id in job.existing if chunk_id not in job.seen]
+        await self.vector_store.delete_chunks(stale)
+        if self.lexical_index:
+            await self.lexical_index.delete_chunks(stale)
+
+        # Older versions of this source are now fully replaced
+        async with AsyncSessionLocal() as session:
+            repository = DocumentRepository(session)
+            superseded = await repository.delete_superseded(job.source_id, document_id)
+            # Stored files are content-addressed, so other documents may share a superseded file
+            in_use = await repository.files_in_use(record.file_path for record in superseded if record.file_path)
+        for record in superseded:
+            if record.file_path and record.file_path not in in_use:
+                await self.file_store.delete_file(record.file_path)
+        await self._set_status(document_id, DocumentStatus.INDEXED, chunk_count=job.chunk_count)
+
+        # Cached answers citing this or a superseded version are now outdated
+        superseded_ids = {record.id for record in superseded}
+        for changed_id in set(job.existing.values()) | superseded_ids | {document_id}:
+            await self.queue.publish_event({"type": "indexed", "document_id": changed_id})
+
+        if not job.chunk_count:
+            logger.warning(f"No content extracted from {filename}")
+            return
+
+        logger.info(
+            f"Successfully processed document {filename} with {job.chunk_count} chunks "
+            f"({job.embedded} embedded, {job.chunk_count - job.embedded} unchanged, {len(stale)} removed)"
+        )
 
     async def run(self):
-        await self.queue.consume(self.process_message)
+        logger.info(f"Starting ingestion worker with {self.concurrency} concurrent jobs")
+        try:
+            await self.queue.consume(self.process_message, concurrency=self.concurrency)
+        finally:
+            self.parse_pool.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
-    worker = IngestionWorker()
+    init_db()
+
+    parser = argparse.ArgumentParser(description="RAG document ingestion worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Number of documents processed concurrently (defaults to WORKER_CONCURRENCY)"
+    )
+    args = parser.parse_args()
+
+    worker = IngestionWorker(concurrency=args.concurrency)
     asyncio.run(worker.run())
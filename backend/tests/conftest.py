@@ -4,11 +4,46 @@ Pytest configuration file for the RAG application tests.
 import pytest
 import sys
 from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Add the app directory to the Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SHARED_OWNER
+from app.infrastructure.database.models import Base
+
+
+def make_chunk(chunk_id, embedding=(1.0, 0.0), content=None, document_id="doc1", source_id="a.txt", owner=SHARED_OWNER, **metadata):
+    """Indexable chunk carrying the metadata the stores filter on; extra keyword arguments become metadata."""
+    return Chunk(
+        id=chunk_id,
+        document_id=document_id,
+        content=f"content {chunk_id}" if content is None else content,
+        embedding=embedding,
+        metadata={
+            "document_id": document_id, "source_id": source_id, "owner": owner, "chunk_index": 0, "page": 1, **metadata
+        }
+    )
+
+
+def make_chunks(vectors, offset=0, **kwargs):
+    """One chunk per vector, with ids counting up from `offset`."""
+    return [make_chunk(str(offset + i), vector, **kwargs) for i, vector in enumerate(vectors)]
+
+
+async def make_sessionmaker():
+    """Session factory for a fresh in-memory registry database."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
 @pytest.fixture
 def mock_env(monkeypatch):
     """Set up mock environment variables for testing."""
@@ -0,0 +1,89 @@
+"""
+Unit tests for the semantic answer cache.
+"""
+import pytest
+import time
+
+from app.services.answer_cache import SemanticAnswerCache
+
+
+EVENTS = [
+    {"type": "citation", "payload": {"source": "doc.pdf", "page": 1, "text": "..."}},
+    {"type": "token", "payload": "Hello"},
+]
+
+
+class TestSemanticLookup:
+    """Test similarity-based lookups."""
+
+    def test_similar_query_hits(self):
+        """Test that a near-identical embedding replays cached events."""
+        cache = SemanticAnswerCache(similarity_threshold=0.9)
+        cache.store([1.0, 0.0, 0.0], EVENTS, {"doc1"})
+
+        assert cache.lookup([0.99, 0.05, 0.0]) == EVENTS
+
+    def test_dissimilar_query_misses(self):
+        """Test that unrelated embeddings do not hit."""
+        cache = SemanticAnswerCache(similarity_threshold=0.9)
+        cache.store([1.0, 0.0, 0.0], EVENTS, {"doc1"})
+
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_replayed_events_are_copies(self):
+        """Test that callers cannot mutate cached entries."""
+        cache = SemanticAnswerCache()
+        cache.store([1.0, 0.0], EVENTS, {"doc1"})
+
+        cache.lookup([1.0, 0.0])[1]["payload"] = "changed"
+
+        assert cache.lookup([1.0, 0.0])[1]["payload"] == "Hello"
+
+
+class TestEviction:
+    """Test TTL, LRU and document invalidation."""
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not served."""
+        cache = SemanticAnswerCache(ttl_seconds=0.01)
+        cache.store([1.0, 0.0], EVENTS, {"doc1"})
+        time.sleep(0.02)
+
+        assert cache.lookup([1.0, 0.0]) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = SemanticAnswerCache(max_entries=2)
+        cache.store([1.0, 0.0, 0.0], EVENTS, {"a"})
+        cache.store([0.0, 1.0, 0.0], EVENTS, {"b"})
+        cache.lookup([1.0, 0.0, 0.0])
+        cache.store([0.0, 0.0, 1.0], EVENTS, {"c"})
+
+        assert cache.lookup([1.0, 0.0, 0.0]) is not None
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+
+    def test_invalidate_document(self):
+        """Test that entries citing a changed document are dropped."""
+        cache = SemanticAnswerCache()
+        cache.store([1.0, 0.0], EVENTS, {"doc1", "doc2"})
+        cache.store([0.0, 1.0], EVENTS, {"doc3"})
+
+        removed = cache.invalidate_document("doc2")
+
+        assert removed == 1
+        assert cache.lookup([1.0, 0.0]) is None
+        assert cache.lookup([0.0, 1.0]) is not None
+
+
+class TestScopes:
+    """Test that answers do not leak across search scopes."""
+
+    def test_other_scope_misses(self):
+        """Test that an answer stored for one user is not served to another."""
+        cache = SemanticAnswerCache()
+        cache.store([1.0, 0.0], EVENTS, {"doc1"}, scope="alice")
+
+        assert cache.lookup([1.0, 0.0], scope="bob") is None
+        assert cache.lookup([1.0, 0.0], scope="alice") == EVENTS
@@ -110,3 +110,26 @@ class TestQueryEndpoints:
         assert "answer" in response
         assert "citations" in response
         assert isinstance(response["citations"], list)
+
+
+class TestChatMessageParsing:
+    """Test parsing of chat messages into a query and search filter."""
+    
+    def test_owner_scope_is_enforced(self):
+        """Test that client-supplied owners are replaced by the caller's scope."""
+        websocket = pytest.importorskip("app.api.websocket")
+        
+        query, search_filter = websocket.parse_message(
+            '{"query": "pump", "filters": {"owners": ["bob"], "filenames": ["a.txt"]}}', "alice"
+        )
+        
+        assert query == "pump"
+        assert search_filter.owners == ["alice", ""]
+        assert search_filter.filenames == ["a.txt"]
+    
+    def test_non_object_filters_are_rejected(self):
+        """Test that malformed filters raise a ValueError instead of a TypeError."""
+        websocket = pytest.importorskip("app.api.websocket")
+        
+        with pytest.raises(ValueError):
+            websocket.parse_message('{"query": "pump", "filters": ["a.txt"]}', "alice")
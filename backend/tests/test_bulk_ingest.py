@@ -0,0 +1,180 @@
+"""
+Route tests for bulk ingestion of files and zip/tar archives, and upload deduplication.
+"""
+import pytest
+import io
+import tarfile
+import zipfile
+
+from tests.conftest import make_sessionmaker
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            if content is None:
+                archive.writestr(zipfile.ZipInfo(name), b"")  # Directory entry when the name ends with /
+            else:
+                archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def tar_bytes(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if content is None:
+                info.type = tarfile.DIRTYPE
+                archive.addfile(info)
+            else:
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.batches = []
+
+    async def publish(self, message):
+        self.batches.append([message])
+        return True
+
+    async def publish_many(self, messages):
+        self.batches.append(list(messages))
+        return True
+
+
+@pytest.mark.asyncio
+class TestBulkIngest:
+    """Test staging, archive expansion, deduplication and batched publishing."""
+
+    async def make_client(self, tmp_path):
+        # The routes pull in the full dependency graph (LLM and vector store clients)
+        ingest = pytest.importorskip("app.api.routes.ingest")
+        from fastapi import FastAPI
+        from httpx import ASGITransport, AsyncClient
+        from app.core.dependencies import get_file_store, get_queue_service
+        from app.core.security import get_optional_user
+        from app.infrastructure.database.models import get_db
+        from app.infrastructure.storage.file_store import FileStore
+
+        Session = await make_sessionmaker()
+
+        async def session_override():
+            async with Session() as session:
+                yield session
+
+        queue = RecordingQueue()
+        app = FastAPI()
+        app.include_router(ingest.router)
+        app.dependency_overrides[get_db] = session_override
+        app.dependency_overrides[get_file_store] = lambda: FileStore(upload_dir=str(tmp_path / "uploads"))
+        app.dependency_overrides[get_queue_service] = lambda: queue
+        app.dependency_overrides[get_optional_user] = lambda: None
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test"), queue
+
+    async def test_files_are_published_in_one_call(self, tmp_path):
+        """Test that several plain files become one publish_many batch."""
+        client, queue = await self.make_client(tmp_path)
+
+        async with client:
+            response = await client.post("/ingest/bulk", files=[
+                ("files", ("a.txt", b"alpha", "text/plain")),
+                ("files", ("b.txt", b"beta", "text/plain")),
+            ])
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+        assert len(queue.batches) == 1
+        assert sorted(message["filename"] for message in queue.batches[0]) == ["a.txt", "b.txt"]
+
+    async def test_zip_skips_hidden_and_directory_members(self, tmp_path):
+        """Test that zip members are staged and hidden files and directories are ignored."""
+        client, queue = await self.make_client(tmp_path)
+        archive = zip_bytes({
+            "docs/": None,
+            "docs/a.txt": b"alpha",
+            "docs/.hidden.txt": b"secret",
+            "__MACOSX/docs/._a.txt": b"resource fork",
+            "b.txt": b"beta",
+        })
+
+        async with client:
+            response = await client.post("/ingest/bulk", files=[("files", ("docs.zip", archive, "application/zip"))])
+
+        assert response.status_code == 200
+        assert sorted(message["filename"] for message in queue.batches[0]) == ["a.txt", "b.txt"]
+
+    async def test_tar_members_are_staged(self, tmp_path):
+        """Test that gzipped tar archives are expanded like zips."""
+        client, queue = await self.make_client(tmp_path)
+        archive = tar_bytes({"docs": None, "docs/a.txt": b"alpha", "docs/.git/config": b"x"})
+
+        async with client:
+            response = await client.post("/ingest/bulk", files=[("files", ("docs.tar.gz", archive, "application/gzip"))])
+
+        assert response.status_code == 200
+        assert [message["filename"] for message in queue.batches[0]] == ["a.txt"]
+
+    async def test_duplicates_are_queued_once(self, tmp_path):
+        """Test that identical contents are queued once per request and not again later."""
+        client, queue = await self.make_client(tmp_path)
+
+        async with client:
+            first = await client.post("/ingest/bulk", files=[
+                ("files", ("a.txt", b"same", "text/plain")),
+                ("files", ("copy.txt", b"same", "text/plain")),
+            ])
+            second = await client.post("/ingest/bulk", files=[("files", ("a.txt", b"same", "text/plain"))])
+
+        assert first.json()["count"] == 1
+        assert len(first.json()["documents"]) == 2
+        assert second.json()["count"] == 0
+        assert second.json()["documents"][0]["status"] == "queued"
+        assert [len(batch) for batch in queue.batches] == [1, 0]
+
+    async def test_invalid_archive_is_rejected(self, tmp_path):
+        """Test that a corrupt archive is a client error."""
+        client, queue = await self.make_client(tmp_path)
+
+        async with client:
+            response = await client.post("/ingest/bulk", files=[("files", ("bad.zip", b"not a zip", "application/zip"))])
+
+        assert response.status_code == 400
+        assert queue.batches == []
+
+    async def test_archives_use_the_request_budget(self, tmp_path, monkeypatch):
+        """Test that only plain files are held to the per-file cap, archives to the bulk budget."""
+        client, queue = await self.make_client(tmp_path)
+        from app.api.routes import ingest
+        monkeypatch.setattr(ingest.settings, "MAX_UPLOAD_SIZE", 64)
+        archive = zip_bytes({"a.txt": b"alpha", "b.txt": b"beta"})
+        assert len(archive) > 64
+
+        async with client:
+            accepted = await client.post("/ingest/bulk", files=[("files", ("docs.zip", archive, "application/zip"))])
+            rejected = await client.post("/ingest/bulk", files=[("files", ("big.txt", b"x" * 100, "text/plain"))])
+
+        assert accepted.status_code == 200
+        assert accepted.json()["count"] == 2
+        assert rejected.status_code == 413
+
+    async def test_duplicates_under_new_names_leave_no_files(self, tmp_path):
+        """Test that known contents uploaded under another name do not leave orphaned files."""
+        client, queue = await self.make_client(tmp_path)
+
+        async with client:
+            await client.post("/ingest", files={"file": ("a.txt", b"same", "text/plain")})
+            single = await client.post("/ingest", files={"file": ("renamed.txt", b"same", "text/plain")})
+            bulk = await client.post("/ingest/bulk", files=[
+                ("files", ("other.txt", b"same", "text/plain")),
+                ("files", ("new.txt", b"new", "text/plain")),
+            ])
+
+        assert single.json()["duplicate"] is True
+        assert bulk.json()["count"] == 1
+        stored = sorted(path.name.split("_", 1)[1] for path in (tmp_path / "uploads").iterdir())
+        assert stored == ["a.txt", "new.txt"]
@@ -0,0 +1,144 @@
+"""
+Unit tests for the Chroma vector store against a stub client and collection.
+"""
+import pytest
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from app.domain.models.search_filter import SearchFilter
+from app.infrastructure.vector.chroma_store import ChromaVectorStore
+from tests.conftest import make_chunks
+
+
+class StubCollection:
+    """Records calls and how many of them overlap."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.upserts = []
+        self.queries = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def upsert(self, **columns):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.upserts.append(columns)
+
+
+    def query(self, query_embeddings, n_results, where, include):
+        self.queries.append({"query_embeddings": query_embeddings, "where": where})
+        # One hit per query, named after its first component so order can be checked
+        ids = [[f"hit{int(embedding[0])}"] for embedding in query_embeddings]
+        return {
+            "ids": ids,
+            "documents": [["content"] for _ in ids],
+            "metadatas": [[{"document_id": "doc1"}] for _ in ids],
+            "distances": [[embedding[0] / 10] for embedding in query_embeddings],
+        }
+
+
+class StubClient:
+    def __init__(self, collection, max_batch_size):
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+
+    def get_or_create_collection(self, name):
+        return self.collection
+
+    def get_max_batch_size(self):
+        return self.max_batch_size
+
+
+def numbered_vectors(count):
+    # Every component of vector i is i, so slices can be matched back to their chunks
+    return np.arange(count, dtype=np.float32)[:, None] * np.ones((1, 4), dtype=np.float32)
+
+
+def make_store(collection, max_batch_size=3, write_concurrency=2):
+    store = ChromaVectorStore(
+        client=StubClient(collection, max_batch_size),
+        executor=ThreadPoolExecutor(max_workers=8)
+    )
+    store.write_concurrency = write_concurrency
+    return store
+
+
+
+
+@pytest.mark.asyncio
+class TestChromaWrites:
+    """Test that writes are split at the backend batch size with bounded concurrency."""
+
+    async def test_upserts_are_split_at_batch_size(self):
+        """Test that every upsert call stays within the backend batch size and all chunks arrive."""
+        collection = StubCollection()
+        store = make_store(collection, max_batch_size=3)
+
+        assert await store.add_chunks(make_chunks(numbered_vectors(8)))
+
+        assert sorted(len(call["ids"]) for call in collection.upserts) == [2, 3, 3]
+        ids = sorted(chunk_id for call in collection.upserts for chunk_id in call["ids"])
+        assert ids == sorted(str(i) for i in range(8))
+        for call in collection.upserts:
+            assert [embedding[0] for embedding in call["embeddings"]] == [int(i) for i in call["ids"]]
+
+    async def test_upsert_concurrency_is_bounded(self):
+        """Test that no more than `write_concurrency` slices are written at once."""
+        collection = StubCollection(delay=0.05)
+        store = make_store(collection, max_batch_size=2, write_concurrency=2)
+
+        await store.add_chunks(make_chunks(numbered_vectors(12)))
+
+        assert len(collection.upserts) == 6
+        assert collection.peak == 2
+
+    async def test_batch_size_is_capped_by_settings(self):
+        """Test that the configured upsert size caps a larger backend limit."""
+        from app.core.config import settings
+        store = make_store(StubCollection(), max_batch_size=10 ** 9)
+
+        assert store.batch_size == settings.VECTOR_UPSERT_BATCH_SIZE
+
+
+@pytest.mark.asyncio
+class TestChromaSearchMany:
+    """Test that batched searches are sliced, ordered and short-circuited."""
+
+    async def test_queries_are_sliced_and_kept_in_order(self):
+        """Test that queries go out in backend-sized slices and come back in query order."""
+        collection = StubCollection()
+        store = make_store(collection, max_batch_size=2)
+        queries = numbered_vectors(5)
+
+        results = await store.search_many(queries, k=1)
+
+        assert [len(call["query_embeddings"]) for call in collection.queries] == [2, 2, 1]
+        assert [[chunk.id for chunk in hits] for hits in results] == [[f"hit{i}"] for i in range(5)]
+        assert results[3][0].score == pytest.approx(-0.3)
+
+    async def test_filters_are_passed_as_where_clause(self):
+        """Test that a filter is evaluated by the backend."""
+        collection = StubCollection()
+        store = make_store(collection)
+
+        await store.search_many(np.ones((1, 4), dtype=np.float32), filters=SearchFilter(owners=["alice"]))
+
+        assert collection.queries[0]["where"] == {"owner": {"$in": ["alice"]}}
+
+    async def test_filter_matching_nothing_skips_the_query(self):
+        """Test that an empty owner list returns empty results without a backend call."""
+        collection = StubCollection()
+        store = make_store(collection)
+
+        results = await store.search_many(np.ones((3, 4), dtype=np.float32), filters=SearchFilter(owners=[]))
+
+        assert results == [[], [], []]
+        assert collection.queries == []
@@ -0,0 +1,77 @@
+"""
+Unit tests for token-budgeted context packing.
+"""
+import pytest
+
+from app.domain.models.chunk import Chunk
+from app.services.context_builder import ContextBuilder
+
+
+def make_chunk(content, start=None, document_id="doc1", filename="a.txt"):
+    metadata = {"filename": filename}
+    if start is not None:
+        metadata.update({"start_offset": start, "end_offset": start + len(content)})
+    return Chunk(document_id=document_id, content=content, metadata=metadata)
+
+
+def builder(**kwargs):
+    # Character-based token estimate keeps the tests independent of the BPE download
+    return ContextBuilder(encoding_name=None, **kwargs)
+
+
+class TestMerging:
+    """Test merging of overlapping chunks."""
+
+    def test_overlapping_chunks_are_merged_once(self):
+        """Test that the overlap between neighbouring chunks appears only once."""
+        text = "alpha beta gamma delta epsilon"
+        chunks = [make_chunk(text[12:], start=12), make_chunk(text[:17], start=0)]
+
+        context = builder().build_context(chunks)
+
+        assert context == f"Source 1 (a.txt): {text}"
+
+    def test_other_documents_are_not_merged(self):
+        """Test that offsets are only compared within a document."""
+        chunks = [
+            make_chunk("first passage text", start=0, document_id="doc1"),
+            make_chunk("second passage text", start=5, document_id="doc2", filename="b.txt"),
+        ]
+
+        context = builder().build_context(chunks)
+
+        assert "Source 1 (a.txt): first passage text" in context
+        assert "Source 2 (b.txt): second passage text" in context
+
+
+class TestBudget:
+    """Test deduplication and token budgeting."""
+
+    def test_near_duplicates_are_dropped(self):
+        """Test that a passage contained in a better one is skipped."""
+        chunks = [
+            make_chunk("the pump must be primed before the first start"),
+            make_chunk("The pump must be primed before the first start."),
+        ]
+
+        context = builder().build_context(chunks)
+
+        assert context.count("Source") == 1
+
+    def test_budget_keeps_relevance_order(self):
+        """Test that passages are packed best-first and the overflow is dropped."""
+        chunks = [make_chunk(f"passage {i} " + "word " * 40) for i in range(5)]
+
+        context = builder(token_budget=120, min_truncated_tokens=1000).build_context(chunks)
+
+        assert "passage 0" in context and "passage 1" in context
+        assert "passage 4" not in context
+
+    def test_last_passage_is_truncated_when_room_remains(self):
+        """Test that leftover budget is filled with a truncated passage."""
+        chunks = [make_chunk("x" * 400), make_chunk("y" * 400)]
+
+        context = builder(token_budget=160, min_truncated_tokens=10).build_context(chunks)
+
+        assert "y" in context
+        assert len(context) < 800
@@ -0,0 +1,283 @@
+"""
+Unit tests for the document registry and the document management endpoints.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.database.document_repository import DocumentRepository
+from tests.conftest import make_sessionmaker
+
+
+def make_document(document_id: str, filename: str = "doc.txt") -> Document:
+    return Document(id=document_id, filename=filename, content="", content_type="text/plain", size=10)
+
+
+@pytest.mark.asyncio
+class TestDocumentRepository:
+    """Test registry rows through queueing, status changes and replacement."""
+
+    async def test_save_queued_and_status_changes(self):
+        """Test that a queued document moves through processing to indexed."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued([make_document("doc1")], ["doc1"], ["/uploads/doc1.txt"], owner="alice")
+
+            record = await repository.get("doc1")
+            assert record.status == DocumentStatus.QUEUED.value
+            assert record.owner == "alice"
+
+            await repository.set_status("doc1", DocumentStatus.PROCESSING)
+            await repository.set_status("doc1", DocumentStatus.INDEXED, chunk_count=7)
+
+        async with Session() as session:
+            record = await DocumentRepository(session).get("doc1")
+            assert record.status == DocumentStatus.INDEXED.value
+            assert record.chunk_count == 7
+
+    async def test_set_status_of_missing_document_is_a_no_op(self):
+        """Test that status updates for deleted documents do nothing."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.set_status("gone", DocumentStatus.FAILED, error="boom")
+
+            assert await repository.get("gone") is None
+
+    async def test_list_filters_by_status(self):
+        """Test that listing can be restricted to one status."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued(
+                [make_document("doc1"), make_document("doc2")], ["doc1", "doc2"], ["/a", "/b"]
+            )
+            await repository.set_status("doc2", DocumentStatus.INDEXED)
+
+            indexed = await repository.list(status=DocumentStatus.INDEXED.value)
+
+        assert [record.id for record in indexed] == ["doc2"]
+
+    async def test_list_is_scoped_to_owner(self):
+        """Test that users see their own and shared documents, anonymous callers only shared ones."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued([make_document("shared")], ["shared"], ["/s"])
+            await repository.save_queued([make_document("mine")], ["mine"], ["/m"], owner="alice")
+            await repository.save_queued([make_document("theirs")], ["theirs"], ["/t"], owner="bob")
+
+            visible = {record.id for record in await repository.list(owner="alice")}
+            anonymous = {record.id for record in await repository.list()}
+
+        assert visible == {"shared", "mine"}
+        assert anonymous == {"shared"}
+
+    async def test_delete_removes_row(self):
+        """Test that a deleted document is gone from the registry."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued([make_document("doc1")], ["doc1"], ["/a"])
+
+            await repository.delete("doc1")
+
+            assert await repository.get("doc1") is None
+
+    async def test_files_in_use(self):
+        """Test that only paths still referenced by a row are reported as in use."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued([make_document("doc1")], ["doc1"], ["/shared"], owner="alice")
+            await repository.save_queued([make_document("doc2")], ["doc2"], ["/shared"], owner="bob")
+
+            await repository.delete("doc1")
+
+            assert await repository.files_in_use(["/shared", "/gone"]) == {"/shared"}
+            assert await repository.files_in_use([]) == set()
+
+    async def test_delete_superseded_only_removes_older_versions(self):
+        """Test that an older version finishing late keeps the newer replacement."""
+        Session = await make_sessionmaker()
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued(
+                [make_document("v1"), make_document("v2"), make_document("other")],
+                ["source", "source", "other"],
+                ["/v1", "/v2", "/other"]
+            )
+            (await repository.get("v1")).created_at = datetime.utcnow() - timedelta(minutes=1)
+            await session.commit()
+
+            assert await repository.delete_superseded("source", "v1") == []
+            superseded = await repository.delete_superseded("source", "v2")
+
+            assert [record.id for record in superseded] == ["v1"]
+            assert await repository.get("v2") is not None
+            assert await repository.get("other") is not None
+
+
+@pytest.mark.asyncio
+class TestDocumentEndpoints:
+    """Test listing, fetching and deleting documents through the API."""
+
+    async def make_client(self, tmp_path, monkeypatch, user=None, admins=()):
+        # The routes pull in the full dependency graph (LLM and vector store clients)
+        documents = pytest.importorskip("app.api.routes.documents")
+        from fastapi import FastAPI
+        from httpx import ASGITransport, AsyncClient
+        from app.core.dependencies import get_vector_store, get_file_store, get_queue_service
+        from app.core.security import get_optional_user
+        from app.infrastructure.database.models import get_db
+        from app.infrastructure.storage.file_store import FileStore
+
+        Session = await make_sessionmaker()
+
+        class RecordingStore:
+            def __init__(self):
+                self.deleted = []
+
+            async def delete_document_chunks(self, document_id):
+                self.deleted.append(document_id)
+                return True
+
+        class RecordingQueue:
+            def __init__(self):
+                self.events = []
+
+            async def publish_event(self, event):
+                self.events.append(event)
+                return True
+
+        async def session_override():
+            async with Session() as session:
+                yield session
+
+        vector_store, queue = RecordingStore(), RecordingQueue()
+        app = FastAPI()
+        app.include_router(documents.router)
+        app.dependency_overrides[get_db] = session_override
+        app.dependency_overrides[get_vector_store] = lambda: vector_store
+        app.dependency_overrides[get_file_store] = lambda: FileStore(upload_dir=str(tmp_path))
+        app.dependency_overrides[get_queue_service] = lambda: queue
+        app.dependency_overrides[get_optional_user] = lambda: user
+        monkeypatch.setattr(documents, "get_lexical_index", lambda: None)
+        monkeypatch.setattr(documents, "get_answer_cache", lambda: None)
+        monkeypatch.setattr(documents.settings, "ADMIN_USERS", list(admins))
+
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+        return client, Session, vector_store, queue
+
+    async def test_list_and_get(self, tmp_path, monkeypatch):
+        """Test that queued documents are listed and fetched with their status."""
+        client, Session, _, _ = await self.make_client(tmp_path, monkeypatch)
+        async with Session() as session:
+            await DocumentRepository(session).save_queued([make_document("doc1")], ["doc1"], ["/a"])
+
+        async with client:
+            listed = await client.get("/documents")
+            fetched = await client.get("/documents/doc1")
+            missing = await client.get("/documents/nope")
+
+        assert [doc["document_id"] for doc in listed.json()["documents"]] == ["doc1"]
+        assert fetched.json()["status"] == DocumentStatus.QUEUED.value
+        assert missing.status_code == 404
+
+    async def test_private_documents_are_hidden_from_others(self, tmp_path, monkeypatch):
+        """Test that another user's document is neither listed nor fetched."""
+        client, Session, _, _ = await self.make_client(tmp_path, monkeypatch, user=None)
+        async with Session() as session:
+            await DocumentRepository(session).save_queued([make_document("doc1")], ["doc1"], ["/a"], owner="alice")
+
+        async with client:
+            listed = await client.get("/documents")
+            fetched = await client.get("/documents/doc1")
+
+        assert listed.json()["documents"] == []
+        assert fetched.status_code == 404
+
+    async def test_delete_removes_chunks_file_and_row(self, tmp_path, monkeypatch):
+        """Test that deleting a document cleans up every store and announces it."""
+        client, Session, vector_store, queue = await self.make_client(tmp_path, monkeypatch, user="admin", admins=["admin"])
+        stored_file = tmp_path / "doc1.txt"
+        stored_file.write_text("hello")
+        async with Session() as session:
+            await DocumentRepository(session).save_queued([make_document("doc1")], ["doc1"], [str(stored_file)])
+
+        async with client:
+            response = await client.delete("/documents/doc1")
+
+        assert response.status_code == 200
+        assert vector_store.deleted == ["doc1"]
+        assert not stored_file.exists()
+        assert queue.events == [{"type": "deleted", "document_id": "doc1"}]
+        async with Session() as session:
+            assert await DocumentRepository(session).get("doc1") is None
+
+    async def test_delete_keeps_a_file_shared_with_another_owner(self, tmp_path, monkeypatch):
+        """Test that identical uploads by two owners keep their shared file until both are deleted."""
+        client, Session, _, _ = await self.make_client(tmp_path, monkeypatch, user="alice")
+        stored_file = tmp_path / "doc.txt"
+        stored_file.write_text("hello")
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued([make_document("alice-doc")], ["alice-doc"], [str(stored_file)], owner="alice")
+            await repository.save_queued([make_document("bob-doc")], ["bob-doc"], [str(stored_file)], owner="bob")
+
+        async with client:
+            response = await client.delete("/documents/alice-doc")
+
+        assert response.status_code == 200
+        assert stored_file.exists()
+
+    async def test_delete_while_processing_conflicts(self, tmp_path, monkeypatch):
+        """Test that a document being indexed cannot be deleted."""
+        client, Session, vector_store, _ = await self.make_client(tmp_path, monkeypatch, user="admin", admins=["admin"])
+        async with Session() as session:
+            repository = DocumentRepository(session)
+            await repository.save_queued([make_document("doc1")], ["doc1"], ["/a"])
+            await repository.set_status("doc1", DocumentStatus.PROCESSING)
+
+        async with client:
+            response = await client.delete("/documents/doc1")
+
+        assert response.status_code == 409
+        assert vector_store.deleted == []
+
+    async def test_delete_of_another_users_document_is_not_found(self, tmp_path, monkeypatch):
+        """Test that deleting a document the caller cannot see answers like a missing one."""
+        client, Session, vector_store, _ = await self.make_client(tmp_path, monkeypatch, user="bob")
+        async with Session() as session:
+            await DocumentRepository(session).save_queued([make_document("doc1")], ["doc1"], ["/a"], owner="alice")
+
+        async with client:
+            response = await client.delete("/documents/doc1")
+
+        assert response.status_code == 404
+        assert vector_store.deleted == []
+
+    async def test_only_admins_delete_shared_documents(self, tmp_path, monkeypatch):
+        """Test that anonymous callers and ordinary users cannot delete shared documents."""
+        for user, expected in ((None, 403), ("bob", 403), ("admin", 200)):
+            client, Session, _, _ = await self.make_client(tmp_path, monkeypatch, user=user, admins=["admin"])
+            async with Session() as session:
+                await DocumentRepository(session).save_queued([make_document("doc1")], ["doc1"], ["/a"])
+
+            async with client:
+                response = await client.delete("/documents/doc1")
+
+            assert response.status_code == expected
+
+    async def test_admins_delete_other_users_documents(self, tmp_path, monkeypatch):
+        """Test that administrators can remove any user's document."""
+        client, Session, vector_store, _ = await self.make_client(tmp_path, monkeypatch, user="admin", admins=["admin"])
+        async with Session() as session:
+            await DocumentRepository(session).save_queued([make_document("doc1")], ["doc1"], ["/a"], owner="alice")
+
+        async with client:
+            response = await client.delete("/documents/doc1")
+
+        assert response.status_code == 200
+        assert vector_store.deleted == ["doc1"]
@@ -0,0 +1,77 @@
+"""
+Unit tests for the content-addressed embedding cache.
+"""
+import pytest
+import numpy as np
+
+from app.infrastructure.embedding.embedding_cache import EmbeddingCache
+
+
+class TestCacheKeys:
+    """Test cache key derivation."""
+
+    def test_whitespace_is_normalized(self):
+        """Test that whitespace differences map to the same key."""
+        key1 = EmbeddingCache.make_key("model", "hello   world\n")
+        key2 = EmbeddingCache.make_key("model", "hello world")
+
+        assert key1 == key2
+
+    def test_model_name_is_part_of_key(self):
+        """Test that different models never share entries."""
+        key1 = EmbeddingCache.make_key("model-a", "hello world")
+        key2 = EmbeddingCache.make_key("model-b", "hello world")
+
+        assert key1 != key2
+
+
+class TestCacheTiers:
+    """Test memory and disk tiers."""
+
+    def test_memory_roundtrip(self):
+        """Test storing and reading vectors from memory."""
+        cache = EmbeddingCache(memory_items=10)
+        vector = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+        cache.put_many({"k1": vector})
+        found = cache.get_many(["k1", "k2"])
+
+        assert list(found) == ["k1"]
+        np.testing.assert_allclose(found["k1"], vector)
+
+    def test_lru_eviction(self):
+        """Test that least recently used entries are evicted first."""
+        cache = EmbeddingCache(memory_items=2)
+        cache.put_many({"a": np.zeros(2), "b": np.ones(2)})
+        cache.get_many(["a"])
+        cache.put_many({"c": np.ones(2)})
+
+        found = cache.get_many(["a", "b", "c"])
+
+        assert set(found) == {"a", "c"}
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that vectors persist in SQLite across instances."""
+        path = str(tmp_path / "cache.db")
+        cache = EmbeddingCache(path=path)
+        cache.put_many({"k1": np.array([1.0, 2.0], dtype=np.float32)})
+        cache.close()
+
+        reopened = EmbeddingCache(path=path)
+        found = reopened.get_many(["k1"])
+
+        np.testing.assert_allclose(found["k1"], [1.0, 2.0])
+        assert reopened.stats()["hits_disk"] == 1
+        reopened.close()
+
+    def test_hit_ratio(self):
+        """Test hit ratio accounting."""
+        cache = EmbeddingCache()
+        cache.put_many({"k1": np.zeros(2)})
+
+        cache.get_many(["k1", "k2"])
+        stats = cache.stats()
+
+        assert stats["hits_memory"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(0.5)
@@ -4,6 +4,10 @@ Unit tests for embedding and vector operations.
 import pytest
 import numpy as np
 
+from app.domain.models.chunk import Chunk
+from app.infrastructure.embedding.batching import length_bucketed_batches
+from app.infrastructure.embedding.parity import cosine_drift
+
 
 class TestEmbeddingOperations:
     """Test embedding generation and operations."""
@@ -93,3 +97,80 @@ class TestChunkMetadata:
         
         assert chunk_id == "doc123_chunk_5"
         assert doc_id in chunk_id
+
+
+class TestBackendParity:
+    """Test the drift report used to validate optimized embedding backends."""
+
+    def test_identical_embeddings_have_no_drift(self):
+        """Test that matching vectors report cosine 1 regardless of scale."""
+        reference = np.random.default_rng(0).normal(size=(4, 16))
+
+        drift = cosine_drift(reference, reference * 3.0)
+
+        assert drift["min_cosine"] == pytest.approx(1.0, abs=1e-6)
+        assert drift["max_drift"] == pytest.approx(0.0, abs=1e-6)
+
+    def test_reports_worst_row(self):
+        """Test that one diverging embedding shows up as the minimum cosine."""
+        reference = np.array([[1.0, 0.0], [1.0, 0.0]])
+        candidate = np.array([[1.0, 0.0], [0.0, 1.0]])
+
+        drift = cosine_drift(reference, candidate)
+
+        assert drift["min_cosine"] == pytest.approx(0.0)
+        assert drift["mean_cosine"] == pytest.approx(0.5)
+
+    def test_shape_mismatch_raises(self):
+        """Test that embeddings of different models are rejected."""
+        with pytest.raises(ValueError):
+            cosine_drift(np.ones((2, 384)), np.ones((2, 768)))
+
+
+class TestLengthBucketing:
+    """Test length-sorted batching of embedding inputs."""
+
+    def test_batches_group_similar_lengths(self):
+        """Test that inputs are sorted longest first and every index appears once."""
+        lengths = [5, 200, 7, 180, 6, 190]
+
+        batches = length_bucketed_batches(lengths, batch_size=3)
+
+        assert batches == [[1, 5, 3], [2, 4, 0]]
+
+    def test_token_cap_splits_long_batches(self):
+        """Test that the padded-token cap limits batches of long inputs but not short ones."""
+        lengths = [100, 100, 100, 10, 10, 10, 10]
+
+        batches = length_bucketed_batches(lengths, batch_size=8, max_tokens=200)
+
+        assert [len(batch) for batch in batches] == [2, 2, 3]
+
+    def test_oversized_input_gets_own_batch(self):
+        """Test that an input longer than the cap is still embedded."""
+        assert length_bucketed_batches([500, 10], batch_size=8, max_tokens=100) == [[0], [1]]
+
+
+class TestChunkEmbedding:
+    """Test the compact float32 embedding field of chunks."""
+
+    def test_array_is_not_copied(self):
+        """Test that a row of a batch array is stored as-is."""
+        batch = np.ones((4, 384), dtype=np.float32)
+
+        chunk = Chunk(document_id="doc1", content="text", embedding=batch[2])
+
+        assert np.shares_memory(chunk.embedding, batch)
+
+    def test_lists_become_float32(self):
+        """Test that list input is converted once to a float32 array."""
+        chunk = Chunk(document_id="doc1", content="text", embedding=[1, 2, 3])
+
+        assert chunk.embedding.dtype == np.float32
+        assert Chunk(document_id="doc1", content="text").embedding.shape == (0,)
+
+    def test_json_serializes_as_list(self):
+        """Test that chunks still serialize to plain JSON."""
+        chunk = Chunk(id="c1", document_id="doc1", content="text", embedding=[0.5, 1.0])
+
+        assert '"embedding":[0.5,1.0]' in chunk.model_dump_json()
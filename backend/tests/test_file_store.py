@@ -0,0 +1,72 @@
+"""
+Unit tests for streamed file storage.
+"""
+import pytest
+import hashlib
+import io
+
+from app.infrastructure.storage.file_store import FileStore, FileTooLargeError
+
+
+@pytest.mark.asyncio
+class TestStreamedUploads:
+    """Test chunked copying, hashing and size limits."""
+    
+    async def test_save_stream_hashes_and_sizes(self, tmp_path):
+        """Test that size and SHA-256 are computed while copying."""
+        store = FileStore(upload_dir=str(tmp_path), chunk_size=4)
+        content = b"hello streamed world"
+        
+        stored = await store.save_stream("doc.txt", io.BytesIO(content))
+        
+        assert stored.size == len(content)
+        assert stored.sha256 == hashlib.sha256(content).hexdigest()
+        assert stored.path.endswith(f"{stored.sha256[:16]}_doc.txt")
+        assert open(stored.path, "rb").read() == content
+    
+    async def test_identical_content_is_stored_once(self, tmp_path):
+        """Test that uploads are content-addressed on disk."""
+        store = FileStore(upload_dir=str(tmp_path))
+        
+        first = await store.save_stream("doc.txt", io.BytesIO(b"same bytes"))
+        second = await store.save_stream("doc.txt", io.BytesIO(b"same bytes"))
+        
+        assert first.path == second.path
+        assert len(list(tmp_path.iterdir())) == 1
+    
+    async def test_oversized_upload_is_rejected(self, tmp_path):
+        """Test that oversized uploads fail and leave no partial file."""
+        store = FileStore(upload_dir=str(tmp_path), chunk_size=4, max_size=8)
+        
+        with pytest.raises(FileTooLargeError):
+            await store.save_stream("big.txt", io.BytesIO(b"x" * 20))
+        
+        assert list(tmp_path.iterdir()) == []
+    
+    async def test_nested_names_are_flattened(self, tmp_path):
+        """Test that archive member paths cannot escape the upload dir."""
+        store = FileStore(upload_dir=str(tmp_path))
+        
+        stored = await store.save_stream("../../etc/evil.txt", io.BytesIO(b"data"))
+        
+        assert stored.path == str((tmp_path / f"{stored.sha256[:16]}_evil.txt").absolute())
+    
+    async def test_per_call_limit_tightens_store_limit(self, tmp_path):
+        """Test that a per-call budget applies on top of the store's own limit."""
+        store = FileStore(upload_dir=str(tmp_path), chunk_size=4, max_size=100)
+        
+        with pytest.raises(FileTooLargeError):
+            await store.save_stream("doc.txt", io.BytesIO(b"x" * 20), max_size=10)
+        stored = await store.save_stream("doc.txt", io.BytesIO(b"x" * 20), max_size=1000)
+        
+        assert stored.size == 20
+    
+    async def test_created_flag_marks_new_files_only(self, tmp_path):
+        """Test that re-storing identical bytes is not reported as a new file."""
+        store = FileStore(upload_dir=str(tmp_path))
+        
+        first = await store.save_stream("doc.txt", io.BytesIO(b"same bytes"))
+        second = await store.save_stream("doc.txt", io.BytesIO(b"same bytes"))
+        
+        assert first.created is True
+        assert second.created is False
@@ -0,0 +1,231 @@
+"""
+Unit tests for BM25 lexical search, hybrid retrieval and re-ranking.
+"""
+import pytest
+import asyncio
+import sqlite3
+
+from app.domain.models.search_filter import SearchFilter
+from app.infrastructure.lexical.bm25_index import SqliteBM25Index, tokenize
+from app.infrastructure.vector.numpy_store import NumpyVectorStore
+from app.services.retriever import HybridRetriever, reciprocal_rank_fusion, rerank_within_budget
+from tests.conftest import make_chunk
+
+
+
+
+class TestTokenizer:
+    """Test term extraction."""
+
+    def test_identifiers_are_kept_whole_and_split(self):
+        """Test that part numbers match both as a whole and by their parts."""
+        tokens = tokenize("Replace part AB-1234 now")
+
+        assert "ab-1234" in tokens
+        assert "ab" in tokens and "1234" in tokens
+        assert "replace" in tokens
+
+
+class TestReciprocalRankFusion:
+    """Test rank fusion."""
+
+    def test_items_ranked_by_both_lists_win(self):
+        """Test that agreement between rankings beats a single first place."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]])
+
+        assert fused[:2] == ["b", "a"]
+        assert set(fused) == {"a", "b", "c", "d"}
+
+
+@pytest.mark.asyncio
+class TestBM25Index:
+    """Test the SQLite inverted index."""
+
+    async def test_exact_term_ranks_first(self):
+        """Test that rare terms dominate the score."""
+        index = SqliteBM25Index()
+        await index.add_chunks([
+            make_chunk("1", content="the pump failed with error E4012 during startup"),
+            make_chunk("2", content="the pump is started from the control panel"),
+            make_chunk("3", content="routine maintenance of the pump"),
+        ])
+
+        results = await index.search("what does E4012 mean", k=2)
+
+        assert results[0][0] == "1"
+        assert len(results) == 1
+
+    async def test_reindex_and_delete(self):
+        """Test that re-adding replaces postings and deletes remove them."""
+        index = SqliteBM25Index()
+        await index.add_chunks([make_chunk("1", content="alpha"), make_chunk("2", content="beta", document_id="doc2")])
+        await index.add_chunks([make_chunk("1", content="gamma")])
+
+        assert await index.search("alpha") == []
+        assert (await index.search("gamma"))[0][0] == "1"
+
+        await index.delete_document_chunks("doc2")
+        await index.delete_chunks(["1"])
+        assert await index.search("beta gamma") == []
+
+    async def test_persists_to_disk(self, tmp_path):
+        """Test that the index reopens with its statistics."""
+        path = str(tmp_path / "bm25.db")
+        index = SqliteBM25Index(path)
+        await index.add_chunks([make_chunk("1", content="alpha beta"), make_chunk("2", content="beta")])
+        index.close()
+
+        reopened = SqliteBM25Index(path)
+
+        assert (await reopened.search("alpha"))[0][0] == "1"
+
+    async def test_second_instance_sees_other_writes(self, tmp_path):
+        """Test that an index opened by the API scores chunks the worker wrote afterwards."""
+        path = str(tmp_path / "bm25.db")
+        api = SqliteBM25Index(path)
+        worker = SqliteBM25Index(path)
+
+        await worker.add_chunks([make_chunk("1", content="alpha beta"), make_chunk("2", content="beta"), make_chunk("3", content="gamma")])
+
+        assert await api.search("alpha beta") == await worker.search("alpha beta")
+        assert (await api.search("alpha"))[0][0] == "1"
+
+        await worker.delete_chunks(["3"])
+
+        assert await api.search("alpha beta") == await worker.search("alpha beta")
+
+    async def test_legacy_index_is_migrated_and_backfilled(self, tmp_path):
+        """Test that an index without filter columns gains them and legacy chunks get the shared owner."""
+        path = tmp_path / "bm25.db"
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE chunks (id INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, document_id TEXT, length INTEGER NOT NULL);
+            CREATE TABLE terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL);
+            CREATE TABLE postings (term_id INTEGER NOT NULL, chunk INTEGER NOT NULL, tf INTEGER NOT NULL, PRIMARY KEY (term_id, chunk)) WITHOUT ROWID;
+            INSERT INTO chunks (id, chunk_id, document_id, length) VALUES (1, 'legacy', 'doc1', 1);
+            INSERT INTO terms (id, term) VALUES (1, 'pump');
+            INSERT INTO postings (term_id, chunk, tf) VALUES (1, 1, 1);
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        index = SqliteBM25Index(str(path))
+        scoped = SearchFilter(owners=["alice", ""])
+        assert await index.search("pump", filters=scoped) == []
+
+        assert await index.backfill_metadata({"owner": "", "indexed_at": 1.0}) == 1
+        assert [chunk_id for chunk_id, _ in await index.search("pump", filters=scoped)] == ["legacy"]
+        assert index._conn.execute("SELECT df FROM terms WHERE term = 'pump'").fetchone() == (1,)
+
+    async def test_document_frequencies_follow_writes(self):
+        """Test that stored document frequencies match the postings through upserts and deletes."""
+        index = SqliteBM25Index()
+        await index.add_chunks([make_chunk("1", content="alpha beta"), make_chunk("2", content="beta beta", document_id="doc2")])
+        await index.add_chunks([make_chunk("1", content="beta gamma")])
+        await index.delete_document_chunks("doc2")
+
+        stored = dict(index._conn.execute("SELECT term, df FROM terms"))
+        counted = dict(index._conn.execute(
+            "SELECT t.term, COUNT(p.chunk) FROM terms t LEFT JOIN postings p ON p.term_id = t.id GROUP BY t.id"
+        ))
+        assert stored == counted == {"alpha": 0, "beta": 1, "gamma": 1}
+
+    async def test_common_terms_only_score_matched_chunks(self, monkeypatch):
+        """Test that terms in most chunks do not select chunks on their own but still add to scores."""
+        from app.infrastructure.lexical import bm25_index
+        monkeypatch.setattr(bm25_index, "MIN_COMMON_TERM_DF", 0)
+        index = SqliteBM25Index(common_term_ratio=0.5)
+        await index.add_chunks(
+            [make_chunk(str(i), content=f"the manual page {i}") for i in range(6)] + [
+                make_chunk("error", content="an error code"),
+                make_chunk("the-error", content="the error code"),
+            ]
+        )
+
+        results = await index.search("what is the error code", k=10)
+        only_common = await index.search("the", k=3)
+
+        assert [chunk_id for chunk_id, _ in results] == ["the-error", "error"]
+        assert len(only_common) == 3
+
+    async def test_filtered_search(self):
+        """Test that filters restrict matches without changing collection-wide scoring."""
+        index = SqliteBM25Index()
+        await index.add_chunks([
+            make_chunk("1", content="pump pressure", owner="alice"),
+            make_chunk("2", content="pump pressure", owner="bob"),
+            make_chunk("3", content="pump manual", document_id="doc2"),
+        ])
+
+        results = await index.search("pump pressure", filters=SearchFilter(owners=["alice", ""]))
+        unfiltered = dict(await index.search("pump pressure"))
+
+        assert [chunk_id for chunk_id, _ in results] == ["1", "3"]
+        assert results[0][1] == pytest.approx(unfiltered["1"])
+        assert await index.search("pump", filters=SearchFilter(document_ids=["doc2"], owners=["bob"])) == []
+
+
+@pytest.mark.asyncio
+class TestHybridRetriever:
+    """Test dense + lexical fusion."""
+
+    async def test_lexical_only_match_is_fetched(self, tmp_path):
+        """Test that a keyword hit the embeddings missed still reaches the results."""
+        store = NumpyVectorStore(str(tmp_path))
+        index = SqliteBM25Index()
+        chunks = [
+            make_chunk("near", [1.0, 0.0], "general pump overview"),
+            make_chunk("far", [0.0, 1.0], "error code E4012 means low pressure"),
+        ]
+        await store.add_chunks(chunks)
+        await index.add_chunks(chunks)
+        retriever = HybridRetriever(store, index, candidates=1)
+
+        results = await retriever.retrieve("E4012", [1.0, 0.0], k=2)
+
+        assert {chunk.id for chunk in results} == {"near", "far"}
+        assert next(c for c in results if c.id == "far").content.startswith("error code")
+
+
+@pytest.mark.asyncio
+class TestRerankBudget:
+    """Test the bounded re-ranking stage."""
+
+    async def test_reorders_by_score(self):
+        """Test that the highest scored chunks are kept."""
+        chunks = [make_chunk(str(i), content=f"passage {i}") for i in range(4)]
+
+        async def score(query, passages):
+            return [0.1, 0.9, 0.5, 0.2]
+
+        results = await rerank_within_budget(score, "q", chunks, top_n=2, timeout=1.0)
+
+        assert [chunk.id for chunk in results] == ["1", "2"]
+
+    async def test_timeout_keeps_retrieval_order(self):
+        """Test that a slow scorer falls back to the incoming order."""
+        chunks = [make_chunk(str(i), content=f"passage {i}") for i in range(4)]
+
+        async def slow_score(query, passages):
+            await asyncio.sleep(1)
+            return [0.0] * len(passages)
+
+        results = await rerank_within_budget(slow_score, "q", chunks, top_n=2, timeout=0.01)
+
+        assert [chunk.id for chunk in results] == ["0", "1"]
+
+    async def test_busy_scorer_is_skipped(self):
+        """Test that re-ranking is skipped while abandoned scoring still occupies the scorer."""
+        chunks = [make_chunk(str(i), content=f"passage {i}") for i in range(4)]
+        calls = []
+
+        async def score(query, passages):
+            calls.append(query)
+            return [0.1, 0.9, 0.5, 0.2]
+
+        results = await rerank_within_budget(score, "q", chunks, top_n=2, timeout=1.0, busy=lambda: True)
+
+        assert [chunk.id for chunk in results] == ["0", "1"]
+        assert calls == []
@@ -0,0 +1,104 @@
+"""
+Unit tests for the bounded inference executor.
+"""
+import pytest
+import asyncio
+import time
+
+from app.infrastructure.embedding.inference_executor import InferenceExecutor
+
+
+@pytest.mark.asyncio
+class TestInferenceExecutor:
+    """Test off-loop execution, backpressure and metrics."""
+
+    async def test_run_returns_result(self):
+        """Test that blocking work returns its result to the caller."""
+        executor = InferenceExecutor(max_workers=1, max_pending=1)
+
+        result = await executor.run(lambda x: x * 2, 21)
+
+        assert result == 42
+        assert executor.stats()["completed"] == 1
+        executor.shutdown()
+
+    async def test_event_loop_not_blocked(self):
+        """Test that the event loop keeps ticking during inference."""
+        executor = InferenceExecutor(max_workers=1, max_pending=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        await asyncio.gather(executor.run(time.sleep, 0.1), ticker())
+
+        assert ticks == 5
+        executor.shutdown()
+
+    async def test_backpressure_limits_in_flight(self):
+        """Test that callers wait once workers and queue slots are full."""
+        executor = InferenceExecutor(max_workers=1, max_pending=1)
+        peak = 0
+
+        async def observe():
+            nonlocal peak
+            for _ in range(20):
+                stats = executor.stats()
+                peak = max(peak, stats["running"] + stats["queued"])
+                await asyncio.sleep(0.005)
+
+        jobs = [executor.run(time.sleep, 0.02) for _ in range(4)]
+        await asyncio.gather(observe(), *jobs)
+
+        assert peak <= 2
+        assert executor.stats()["completed"] == 4
+        executor.shutdown()
+
+    async def test_failures_are_counted(self):
+        """Test that exceptions propagate and are tracked."""
+        executor = InferenceExecutor(max_workers=1, max_pending=1)
+
+        def boom():
+            raise ValueError("model error")
+
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+
+        assert executor.stats()["failed"] == 1
+        executor.shutdown()
+
+    async def test_cancelled_callers_do_not_leak_queue_depth(self):
+        """Test that jobs cancelled before starting are counted and free their slots."""
+        executor = InferenceExecutor(max_workers=1, max_pending=8)
+        blocker = asyncio.ensure_future(executor.run(time.sleep, 0.1))
+        await asyncio.sleep(0.01)
+
+        for _ in range(5):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(executor.run(time.sleep, 0.1), timeout=0.01)
+        await blocker
+        await asyncio.sleep(0.01)
+
+        stats = executor.stats()
+        assert stats["cancelled"] == 5
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        assert await executor.run(lambda: "free") == "free"
+        executor.shutdown()
+
+
+    async def test_abandoned_work_keeps_executor_busy(self):
+        """Test that a timed-out caller's work still counts as busy until it finishes."""
+        executor = InferenceExecutor(max_workers=1, max_pending=1)
+        assert not executor.is_busy()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(executor.run(time.sleep, 0.2), timeout=0.01)
+
+        assert executor.is_busy()
+        await asyncio.sleep(0.3)
+        assert not executor.is_busy()
+        executor.shutdown()
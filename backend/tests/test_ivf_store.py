@@ -0,0 +1,128 @@
+"""
+Unit tests for the IVF approximate vector index.
+"""
+import pytest
+import numpy as np
+
+from app.domain.models.search_filter import SearchFilter
+from app.infrastructure.vector.ivf_store import IVFVectorStore, spherical_kmeans
+from tests.conftest import make_chunks
+
+
+
+
+def clustered(n, dim=16, centers=8, seed=0):
+    rng = np.random.default_rng(seed)
+    means = rng.normal(size=(centers, dim))
+    return means[rng.integers(0, centers, size=n)] + 0.1 * rng.normal(size=(n, dim))
+
+
+class TestKMeans:
+    """Test the coarse quantizer."""
+
+    def test_centroids_are_unit_norm(self):
+        """Test that spherical k-means returns normalized centroids."""
+        vectors = clustered(200)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        centroids = spherical_kmeans(vectors.astype(np.float32), 8)
+
+        assert centroids.shape == (8, 16)
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+
+
+@pytest.mark.asyncio
+class TestIVFSearch:
+    """Test training, recall and persistence."""
+
+    async def test_untrained_index_is_exact(self, tmp_path):
+        """Test that small collections use the exact scan."""
+        store = IVFVectorStore(str(tmp_path), nlist=8, nprobe=1)
+        await store.add_chunks(make_chunks(clustered(50)))
+
+        assert not store.stats()["trained"]
+        assert store.recall_at_k(clustered(10, seed=1).tolist(), k=5) == 1.0
+
+    async def test_trains_and_keeps_high_recall(self, tmp_path):
+        """Test that the index trains once large enough and probing more lists raises recall."""
+        store = IVFVectorStore(str(tmp_path), nlist=8, nprobe=1)
+        await store.add_chunks(make_chunks(clustered(400)))
+        queries = clustered(20, seed=1).tolist()
+
+        assert store.stats()["trained"]
+        low = store.recall_at_k(queries, k=10)
+        store.nprobe = 4
+        high = store.recall_at_k(queries, k=10)
+
+        assert high >= low
+        assert high >= 0.9
+
+    async def test_incremental_inserts_and_deletes(self, tmp_path):
+        """Test that rows added after training are searchable and deleted rows vanish."""
+        store = IVFVectorStore(str(tmp_path), nlist=8, nprobe=8, rebuild_factor=100)
+        await store.add_chunks(make_chunks(clustered(400)))
+        extra = clustered(5, seed=2)
+        await store.add_chunks(make_chunks(extra, offset=1000))
+
+        assert (await store.search(extra[0].tolist(), k=1))[0].id == "1000"
+
+        await store.delete_chunks(["1000"])
+        assert (await store.search(extra[0].tolist(), k=1))[0].id != "1000"
+
+    async def test_reopen_restores_lists(self, tmp_path):
+        """Test that centroids and assignments survive a restart."""
+        store = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2)
+        vectors = clustered(400)
+        await store.add_chunks(make_chunks(vectors))
+        expected = [c.id for c in await store.search(vectors[3].tolist(), k=5)]
+        store.close()
+
+        reopened = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2)
+
+        assert reopened.stats()["trained"]
+        assert [c.id for c in await reopened.search(vectors[3].tolist(), k=5)] == expected
+
+    async def test_second_instance_sees_training(self, tmp_path):
+        """Test that lists trained by one process are picked up by another."""
+        api = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2)
+        worker = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2)
+        vectors = clustered(400)
+
+        await worker.add_chunks(make_chunks(vectors))
+
+        assert api.stats()["trained"]
+        assert [c.id for c in await api.search(vectors[3].tolist(), k=5)] == \
+            [c.id for c in await worker.search(vectors[3].tolist(), k=5)]
+
+    async def test_second_instance_follows_incremental_changes(self, tmp_path, monkeypatch):
+        """Test that rows another process assigns or removes after training move lists without a reload."""
+        api = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2, rebuild_factor=100)
+        worker = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2, rebuild_factor=100)
+        vectors = clustered(600)
+        await worker.add_chunks(make_chunks(vectors[:400]))
+        api.stats()
+        reloads = []
+        monkeypatch.setattr(api, "_reload", lambda: reloads.append(True))
+
+        await worker.add_chunks(make_chunks(vectors[400:], offset=400))
+        await worker.delete_chunks([str(i) for i in range(0, 600, 3)])
+
+        assert [c.id for c in await api.search(vectors[4].tolist(), k=5)] == \
+            [c.id for c in await worker.search(vectors[4].tolist(), k=5)]
+        assert [sorted(rows) for rows in api._lists] == [sorted(rows) for rows in worker._lists]
+        assert reloads == []
+
+    async def test_filtered_search(self, tmp_path):
+        """Test that filtered probes only return matching rows, selective or not."""
+        store = IVFVectorStore(str(tmp_path), nlist=8, nprobe=2)
+        vectors = clustered(400)
+        await store.add_chunks(make_chunks(vectors[:390], owner="alice"))
+        await store.add_chunks(make_chunks(vectors[390:], offset=390, owner="bob"))
+
+        selective = await store.search(vectors[0].tolist(), k=5, filters=SearchFilter(owners=["bob"]))
+        broad = await store.search(vectors[0].tolist(), k=5, filters=SearchFilter(owners=["alice"]))
+
+        assert len(selective) == 5
+        assert all(int(c.id) >= 390 for c in selective)
+        assert broad[0].id == "0"
+        assert all(int(c.id) < 390 for c in broad)
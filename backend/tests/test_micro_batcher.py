@@ -0,0 +1,58 @@
+"""
+Unit tests for micro-batched query embedding.
+"""
+import pytest
+import asyncio
+import numpy as np
+
+from app.infrastructure.embedding.micro_batcher import MicroBatchEmbedder
+
+
+class StubEmbeddingService:
+    """Records each batch and embeds a text as [len(text)]."""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    async def aembed_batch(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+
+@pytest.mark.asyncio
+class TestMicroBatchEmbedder:
+    """Test coalescing, size-triggered flushes and error propagation."""
+
+    async def test_concurrent_queries_share_one_call(self):
+        """Test that queries inside the window are embedded together, each getting its own vector."""
+        service = StubEmbeddingService()
+        embedder = MicroBatchEmbedder(service, window_ms=20, max_batch_size=32)
+
+        results = await asyncio.gather(*(embedder.embed("x" * n) for n in (1, 2, 3)))
+
+        assert service.batches == [["x", "xx", "xxx"]]
+        assert [float(result[0]) for result in results] == [1.0, 2.0, 3.0]
+        assert embedder.get_stats()["avg_batch_size"] == 3
+
+    async def test_full_batch_flushes_without_waiting(self):
+        """Test that reaching max_batch_size flushes before the window and splits the rest."""
+        service = StubEmbeddingService()
+        embedder = MicroBatchEmbedder(service, window_ms=10_000, max_batch_size=2)
+
+        results = await asyncio.wait_for(asyncio.gather(*(embedder.embed(str(i)) for i in range(4))), timeout=1)
+
+        assert [len(batch) for batch in service.batches] == [2, 2]
+        assert len(results) == 4
+
+    async def test_errors_reach_every_waiter(self):
+        """Test that a failed model call fails all callers of the batch."""
+        embedder = MicroBatchEmbedder(StubEmbeddingService(error=RuntimeError("model down")), window_ms=5)
+
+        results = await asyncio.gather(embedder.embed("a"), embedder.embed("b"), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert not embedder._flush_tasks
@@ -0,0 +1,74 @@
+"""
+Unit tests for request body size limits.
+"""
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from app.api.middleware import RequestSizeLimitMiddleware
+
+
+def build_app(limit: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, limits={"/upload": limit})
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+
+    return app
+
+
+@pytest.mark.asyncio
+class TestRequestSizeLimit:
+    """Test that oversized bodies are refused before the endpoint reads them."""
+    
+    async def test_body_within_limit_passes(self):
+        """Test that small bodies reach the endpoint."""
+        async with AsyncClient(transport=ASGITransport(app=build_app(16)), base_url="http://test") as client:
+            response = await client.post("/upload", content=b"x" * 16)
+        
+        assert response.status_code == 200
+        assert response.json() == {"size": 16}
+    
+    async def test_declared_length_over_limit_is_rejected(self):
+        """Test that a Content-Length over the limit gets 413."""
+        async with AsyncClient(transport=ASGITransport(app=build_app(16)), base_url="http://test") as client:
+            response = await client.post("/upload", content=b"x" * 17)
+        
+        assert response.status_code == 413
+        assert "16 bytes" in response.json()["detail"]
+    
+    async def test_chunked_body_over_limit_is_cut_off(self):
+        """Test that bodies without Content-Length are counted as they stream in."""
+        async def body():
+            for _ in range(4):
+                yield b"x" * 8
+        
+        async with AsyncClient(transport=ASGITransport(app=build_app(16)), base_url="http://test") as client:
+            response = await client.post("/upload", content=body())
+        
+        assert response.status_code == 413
+    
+    async def test_unlisted_paths_are_not_limited(self):
+        """Test that only the configured paths are capped."""
+        async with AsyncClient(transport=ASGITransport(app=build_app(16)), base_url="http://test") as client:
+            response = await client.post("/other", content=b"x" * 64)
+        
+        assert response.status_code == 200
+    
+    async def test_rejection_carries_cors_headers(self):
+        """Test that CORS wraps the limit so browsers can read the 413."""
+        from fastapi.middleware.cors import CORSMiddleware
+        app = build_app(16)
+        app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+        
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/upload", content=b"x" * 17, headers={"Origin": "http://frontend"})
+        
+        assert response.status_code == 413
+        assert response.headers["access-control-allow-origin"] == "*"
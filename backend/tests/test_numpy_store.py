@@ -0,0 +1,251 @@
+"""
+Unit tests for the in-process NumPy vector index.
+"""
+import pytest
+import numpy as np
+
+from datetime import datetime, timezone
+
+from app.domain.models.search_filter import SearchFilter
+from app.infrastructure.vector.numpy_store import NumpyVectorStore
+from tests.conftest import make_chunk
+
+
+
+
+@pytest.mark.asyncio
+class TestNumpySearch:
+    """Test exact top-k search."""
+
+    async def test_returns_nearest_in_order(self, tmp_path):
+        """Test that results are ranked by cosine similarity."""
+        store = NumpyVectorStore(str(tmp_path))
+        await store.add_chunks([
+            make_chunk("x", [1.0, 0.0, 0.0]),
+            make_chunk("y", [0.0, 1.0, 0.0]),
+            make_chunk("xy", [1.0, 1.0, 0.0]),
+        ])
+
+        results = await store.search([2.0, 0.1, 0.0], k=2)
+
+        assert [chunk.id for chunk in results] == ["x", "xy"]
+        assert results[0].content == "content x"
+
+    async def test_search_many_matches_single_searches(self, tmp_path):
+        """Test that batched queries return one ranked list per query."""
+        store = NumpyVectorStore(str(tmp_path))
+        rng = np.random.default_rng(0)
+        await store.add_chunks([make_chunk(str(i), rng.normal(size=8).tolist()) for i in range(50)])
+        queries = rng.normal(size=(3, 8)).tolist()
+
+        batched = await store.search_many(queries, k=5)
+
+        for query, results in zip(queries, batched):
+            assert [c.id for c in results] == [c.id for c in await store.search(query, k=5)]
+
+    async def test_k_larger_than_index(self, tmp_path):
+        """Test that k is capped at the number of live chunks."""
+        store = NumpyVectorStore(str(tmp_path))
+        await store.add_chunks([make_chunk("x", [1.0, 0.0])])
+
+        assert len(await store.search([1.0, 0.0], k=10)) == 1
+
+
+@pytest.mark.asyncio
+class TestNumpyFilters:
+    """Test prefiltered search."""
+
+    async def _store(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        await store.add_chunks([
+            make_chunk("alice-old", [1.0, 0.0], document_id="d1", owner="alice", filename="a.txt", indexed_at=100.0),
+            make_chunk("alice-new", [0.9, 0.1], document_id="d2", owner="alice", filename="b.txt", indexed_at=200.0),
+            make_chunk("bob", [1.0, 0.01], document_id="d3", owner="bob", filename="a.txt", indexed_at=200.0),
+            make_chunk("shared", [0.5, 0.5], document_id="d4", owner="", filename="c.txt", indexed_at=200.0),
+        ])
+        return store
+
+    async def test_owner_filter(self, tmp_path):
+        """Test that other users' chunks are never returned."""
+        store = await self._store(tmp_path)
+
+        results = await store.search([1.0, 0.0], k=10, filters=SearchFilter(owners=["alice", ""]))
+
+        assert [c.id for c in results] == ["alice-old", "alice-new", "shared"]
+
+    async def test_fields_are_combined(self, tmp_path):
+        """Test that document, filename and date conditions must all match."""
+        store = await self._store(tmp_path)
+        after = datetime.fromtimestamp(150.0, tz=timezone.utc)
+
+        by_date = await store.search([1.0, 0.0], k=10, filters=SearchFilter(filenames=["a.txt"], indexed_after=after))
+        by_document = await store.search([1.0, 0.0], k=10, filters=SearchFilter(document_ids=["d2", "d4"]))
+
+        assert [c.id for c in by_date] == ["bob"]
+        assert [c.id for c in by_document] == ["alice-new", "shared"]
+
+    async def test_filters_follow_updates_and_deletes(self, tmp_path):
+        """Test that the prefilter tracks metadata changes."""
+        store = await self._store(tmp_path)
+        await store.update_chunk_metadata([make_chunk("bob", [1.0, 0.01], document_id="d3", owner="alice")])
+        await store.delete_chunks(["alice-old"])
+
+        results = await store.search([1.0, 0.0], k=10, filters=SearchFilter(owners=["alice"]))
+
+        assert [c.id for c in results] == ["bob", "alice-new"]
+        assert await store.search([1.0, 0.0], k=10, filters=SearchFilter(owners=[])) == []
+
+    async def test_broad_and_selective_filters_match_brute_force(self, tmp_path, monkeypatch):
+        """Test that masked full scans and gathered selective scans both return the exact filtered top-k."""
+        store = NumpyVectorStore(str(tmp_path))
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(400, 8))
+        await store.add_chunks([
+            make_chunk(str(i), vector, document_id=f"d{i // 10}", owner=["alice", "bob", ""][i % 3])
+            for i, vector in enumerate(vectors)
+        ])
+        queries = rng.normal(size=(3, 8))
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        gathered = []
+        rank_rows = store._rank_rows
+        monkeypatch.setattr(store, "_rank_rows", lambda *args: gathered.append(True) or rank_rows(*args))
+
+        for filters, admitted, selective in (
+            (SearchFilter(owners=["alice", ""]), [i for i in range(400) if i % 3 != 1], False),
+            (SearchFilter(document_ids=["d4"]), list(range(40, 50)), True),
+        ):
+            gathered.clear()
+            results = await store.search_many(queries, k=5, filters=filters)
+
+            for query, chunks in zip(queries, results):
+                scores = unit[admitted] @ query
+                expected = [str(admitted[i]) for i in np.argsort(-scores)[:5]]
+                assert [c.id for c in chunks] == expected
+            assert bool(gathered) == selective
+
+
+@pytest.mark.asyncio
+class TestNumpyMaintenance:
+    """Test growth, deletes, metadata updates and persistence."""
+
+    async def test_capacity_grows(self, tmp_path):
+        """Test that the matrix doubles without losing rows."""
+        store = NumpyVectorStore(str(tmp_path), initial_capacity=2)
+        await store.add_chunks([make_chunk(str(i), [float(i), 1.0]) for i in range(2)])
+        await store.add_chunks([make_chunk(str(i), [float(i), 1.0]) for i in range(2, 5)])
+
+        assert store.stats()["capacity"] == 8
+        assert store.stats()["chunks"] == 5
+        assert (await store.search([0.0, 1.0], k=1))[0].id == "0"
+
+    async def test_deleted_chunks_are_not_returned(self, tmp_path):
+        """Test deleting by id and by document."""
+        store = NumpyVectorStore(str(tmp_path))
+        await store.add_chunks([
+            make_chunk("x", [1.0, 0.0], document_id="doc1"),
+            make_chunk("y", [0.9, 0.1], document_id="doc2"),
+            make_chunk("z", [0.0, 1.0], document_id="doc2"),
+        ])
+
+        await store.delete_chunks(["x"])
+        await store.delete_document_chunks("doc2")
+
+        assert await store.search([1.0, 0.0], k=3) == []
+
+    async def test_source_chunks_and_metadata_update(self, tmp_path):
+        """Test source lookups and metadata rewrites."""
+        store = NumpyVectorStore(str(tmp_path))
+        chunk = make_chunk("x", [1.0, 0.0], source_id="a.txt")
+        await store.add_chunks([chunk, make_chunk("y", [0.0, 1.0], source_id="b.txt")])
+
+        chunk.metadata["chunk_index"] = 7
+        await store.update_chunk_metadata([chunk])
+
+        assert await store.get_source_chunks("a.txt") == {"x": "doc1"}
+        assert (await store.search([1.0, 0.0], k=1))[0].chunk_index == 7
+
+    async def test_reopen_restores_index(self, tmp_path):
+        """Test that vectors and metadata survive a restart."""
+        store = NumpyVectorStore(str(tmp_path))
+        await store.add_chunks([make_chunk("x", [1.0, 0.0]), make_chunk("y", [0.0, 1.0])])
+        await store.delete_chunks(["y"])
+        store.close()
+
+        reopened = NumpyVectorStore(str(tmp_path))
+        await reopened.add_chunks([make_chunk("z", [0.0, 1.0])])
+
+        assert reopened.stats()["chunks"] == 2
+        assert (await reopened.search([0.0, 1.0], k=1))[0].id == "z"
+
+    async def test_second_instance_sees_other_writes(self, tmp_path):
+        """Test that instances sharing a directory (API and worker) see each other's changes."""
+        api = NumpyVectorStore(str(tmp_path), initial_capacity=2)
+        worker = NumpyVectorStore(str(tmp_path), initial_capacity=2)
+
+        await worker.add_chunks([make_chunk(str(i), [1.0, float(i)], owner="alice") for i in range(5)])
+
+        assert api.stats()["chunks"] == 5
+        assert (await api.search([1.0, 0.0], k=1, filters=SearchFilter(owners=["alice"])))[0].id == "0"
+
+        await api.delete_chunks(["0"])
+        await worker.add_chunks([make_chunk("5", [1.0, 5.0])])
+
+        assert worker.stats()["chunks"] == 5
+        assert (await worker.search([1.0, 0.0], k=1))[0].id == "1"
+        assert {c.id for c in await api.get_chunks(["0", "5"])} == {"5"}
+
+    async def test_other_writes_are_applied_incrementally(self, tmp_path, monkeypatch):
+        """Test that only rows changed by another instance are reloaded, across growth, updates and deletes."""
+        api = NumpyVectorStore(str(tmp_path), initial_capacity=2)
+        worker = NumpyVectorStore(str(tmp_path), initial_capacity=2)
+        await worker.add_chunks([make_chunk("seed", [0.0, 1.0])])
+        api.stats()
+        reloads = []
+        monkeypatch.setattr(api, "_reload", lambda: reloads.append(True))
+
+        await worker.add_chunks([make_chunk(str(i), [1.0, float(i)], owner="alice") for i in range(5)])
+        await worker.delete_chunks(["seed", "1"])
+        chunk = make_chunk("2", [1.0, 2.0], owner="bob")
+        await worker.update_chunk_metadata([chunk])
+
+        assert api.stats() == worker.stats()
+        alice = await api.search([1.0, 0.0], k=5, filters=SearchFilter(owners=["alice"]))
+        assert [c.id for c in alice] == ["0", "3", "4"]
+        assert [c.id for c in await api.search([1.0, 2.0], k=1, filters=SearchFilter(owners=["bob"]))] == ["2"]
+        assert reloads == []
+
+        # Rows freed elsewhere are reused without overwriting live ones
+        await api.add_chunks([make_chunk("5", [1.0, 5.0]), make_chunk("6", [1.0, 6.0]), make_chunk("7", [1.0, 7.0])])
+        ids = ["0", "2", "3", "4", "5", "6", "7"]
+        assert [c.id for c in await worker.get_chunks(ids)] == ids
+
+    async def test_instance_behind_the_change_log_reloads(self, tmp_path, monkeypatch):
+        """Test that an instance older than the retained change log reloads everything."""
+        from app.infrastructure.vector import numpy_store
+        monkeypatch.setattr(numpy_store, "CHANGE_LOG_GENERATIONS", 1)
+        api = NumpyVectorStore(str(tmp_path))
+        worker = NumpyVectorStore(str(tmp_path))
+        await worker.add_chunks([make_chunk("x", [1.0, 0.0])])
+        api.stats()
+
+        await worker.add_chunks([make_chunk("y", [0.0, 1.0])])
+        await worker.delete_chunks(["x"])
+
+        assert [c.id for c in await api.search([1.0, 0.0], k=2)] == ["y"]
+
+    async def test_backfill_makes_legacy_chunks_visible(self, tmp_path):
+        """Test that chunks without an owner match owner-scoped searches after the backfill."""
+        store = NumpyVectorStore(str(tmp_path))
+        legacy = make_chunk("legacy", [1.0, 0.0])
+        del legacy.metadata["owner"]
+        await store.add_chunks([legacy, make_chunk("owned", [0.9, 0.1], owner="alice")])
+        scoped = SearchFilter(owners=["bob", ""])
+        assert await store.search([1.0, 0.0], k=2, filters=scoped) == []
+
+        assert await store.backfill_metadata({"owner": "", "indexed_at": 1.0}) == 2
+        assert await store.backfill_metadata({"owner": "", "indexed_at": 1.0}) == 0
+
+        results = await store.search([1.0, 0.0], k=2, filters=scoped)
+        assert [chunk.id for chunk in results] == ["legacy"]
+        assert results[0].metadata["indexed_at"] == 1.0
+        assert (await store.get_chunks(["owned"]))[0].metadata["owner"] == "alice"
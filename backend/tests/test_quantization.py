@@ -0,0 +1,71 @@
+"""
+Unit tests for quantized vector codes and re-ranked search.
+"""
+import pytest
+import numpy as np
+
+from app.infrastructure.vector.numpy_store import NumpyVectorStore
+from app.infrastructure.vector.quantization import POPCOUNT, quantize_binary, quantize_int8
+from tests.conftest import make_chunks
+
+
+def unit_vectors(n, dim=64, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+
+
+class TestCodes:
+    """Test the encoders."""
+
+    def test_int8_roundtrip_is_close(self):
+        """Test that int8 codes reconstruct vectors within one quantization step."""
+        vectors = unit_vectors(10)
+        codes, scales = quantize_int8(vectors)
+
+        assert codes.dtype == np.int8
+        np.testing.assert_allclose(codes * scales[:, None], vectors, atol=float(scales.max()))
+
+    def test_binary_codes_are_packed(self):
+        """Test that binary codes use one bit per dimension."""
+        codes = quantize_binary(unit_vectors(3, dim=64))
+
+        assert codes.shape == (3, 8)
+        assert POPCOUNT[np.bitwise_xor(codes[0], codes[0])].sum() == 0
+
+
+@pytest.mark.asyncio
+class TestQuantizedSearch:
+    """Test compact shortlisting with float re-ranking."""
+
+    @pytest.mark.parametrize("mode", ["int8", "binary"])
+    async def test_recall_against_exact(self, tmp_path, mode):
+        """Test that re-ranked results mostly match the exact top-k."""
+        vectors = unit_vectors(500, dim=384)
+        exact = NumpyVectorStore(str(tmp_path / "exact"))
+        quantized = NumpyVectorStore(str(tmp_path / mode), quantization=mode, rerank_factor=10)
+        await exact.add_chunks(make_chunks(vectors))
+        await quantized.add_chunks(make_chunks(vectors))
+
+        # Queries near indexed points, as real questions are near their answers
+        queries = (vectors[:20] + 0.05 * unit_vectors(20, dim=384, seed=1)).tolist()
+        expected = await exact.search_many(queries, k=5)
+        actual = await quantized.search_many(queries, k=5)
+
+        overlap = np.mean([
+            len({c.id for c in a} & {c.id for c in e}) / 5 for a, e in zip(actual, expected)
+        ])
+        assert overlap >= 0.8
+
+    async def test_existing_index_is_encoded_on_open(self, tmp_path):
+        """Test that enabling quantization on a float index builds the codes."""
+        vectors = unit_vectors(50)
+        store = NumpyVectorStore(str(tmp_path))
+        await store.add_chunks(make_chunks(vectors))
+        store.close()
+
+        reopened = NumpyVectorStore(str(tmp_path), quantization="int8")
+
+        assert reopened.stats()["quantization"] == "int8"
+        assert (await reopened.search(vectors[7].tolist(), k=1))[0].id == "7"
@@ -0,0 +1,146 @@
+"""
+Unit tests for the Redis job queue's retry, dead-letter and lease handling.
+"""
+import pytest
+import asyncio
+import json
+import time
+import fakeredis
+
+from app.infrastructure.queue.redis_queue import RedisQueue
+
+
+def make_queue(max_retries=2):
+    queue = RedisQueue(redis=fakeredis.aioredis.FakeRedis(decode_responses=True))
+    queue.max_retries = max_retries
+    queue.retry_backoff = 0
+    return queue
+
+
+async def take(queue, lease_seconds=300):
+    """Pop the next message into the processing list the way `consume` does."""
+    receipt = await queue.redis.lmove(queue.queue_name, queue.processing_name, "LEFT", "RIGHT")
+    await queue.redis.zadd(queue.leases_name, {receipt: time.time() + lease_seconds})
+    return receipt
+
+
+@pytest.mark.asyncio
+class TestRedisQueue:
+    """Test ack, retry with backoff, dead-lettering and lease reclaim."""
+
+    async def test_ack_removes_message(self):
+        """Test that an acked message leaves the processing list and its lease."""
+        queue = make_queue()
+        await queue.publish({"document_id": "doc1"})
+
+        await queue.ack(await take(queue))
+
+        assert await queue.redis.llen(queue.processing_name) == 0
+        assert await queue.redis.zcard(queue.leases_name) == 0
+
+    async def test_failed_message_is_retried(self):
+        """Test that a nacked message is delayed and then promoted back to the ready queue."""
+        queue = make_queue()
+        await queue.publish({"document_id": "doc1"})
+
+        await queue.nack(await take(queue), "boom")
+
+        assert await queue.redis.zcard(queue.delayed_name) == 1
+        assert await queue.redis.llen(queue.processing_name) == 0
+        await queue._maintain()
+        envelope = json.loads(await queue.redis.lindex(queue.queue_name, 0))
+        assert envelope["attempts"] == 1
+        assert envelope["last_error"] == "boom"
+        assert envelope["body"] == {"document_id": "doc1"}
+
+    async def test_dead_letter_after_max_retries(self):
+        """Test that the message is dead-lettered once it exceeds QUEUE_MAX_RETRIES."""
+        queue = make_queue(max_retries=2)
+        await queue.publish({"document_id": "doc1"})
+
+        for _ in range(3):
+            await queue.nack(await take(queue), "boom")
+            await queue._maintain()
+
+        assert await queue.redis.llen(queue.queue_name) == 0
+        assert await queue.redis.zcard(queue.delayed_name) == 0
+        dead = json.loads(await queue.redis.lindex(queue.dead_letter_name, 0))
+        assert dead["attempts"] == 3
+
+    async def test_expired_lease_is_reclaimed(self):
+        """Test that a message held by a crashed consumer is retried after its lease expires."""
+        queue = make_queue()
+        await queue.publish({"document_id": "doc1"})
+        await take(queue, lease_seconds=-1)
+
+        await queue._maintain()
+        await queue._maintain()
+
+        envelope = json.loads(await queue.redis.lindex(queue.queue_name, 0))
+        assert envelope["attempts"] == 1
+        assert envelope["last_error"] == "visibility timeout expired"
+        assert await queue.redis.llen(queue.processing_name) == 0
+
+    async def test_stale_receipt_is_not_requeued_twice(self):
+        """Test that only the caller that removes a message from processing requeues it."""
+        queue = make_queue()
+        await queue.publish({"document_id": "doc1"})
+        receipt = await take(queue)
+
+        await queue.nack(receipt, "first")
+        await queue.nack(receipt, "second")
+
+        assert await queue.redis.zcard(queue.delayed_name) == 1
+
+    async def test_lock_serializes_holders(self):
+        """Test that a second holder of the same lock waits for the first to release it."""
+        queue = make_queue()
+        order = []
+
+        async def hold(name, tag):
+            async with queue.lock(name):
+                order.append(f"{tag}-start")
+                await asyncio.sleep(0.05)
+                order.append(f"{tag}-end")
+
+        await asyncio.gather(hold("source:a", "first"), hold("source:a", "second"))
+
+        assert order in (
+            ["first-start", "first-end", "second-start", "second-end"],
+            ["second-start", "second-end", "first-start", "first-end"],
+        )
+        assert await queue.redis.keys("*:lock:*") == []
+
+    async def test_consume_bounds_concurrency_and_frees_failed_slots(self):
+        """Test that at most `concurrency` callbacks run at once and failures release their slot."""
+        queue = make_queue(max_retries=0)
+        await queue.publish_many([{"n": n} for n in range(6)])
+        active, peak, seen = 0, 0, []
+        finished = asyncio.Event()
+
+        async def callback(message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                await asyncio.sleep(0.02)
+                if message["n"] % 3 == 0:
+                    raise RuntimeError("boom")
+            finally:
+                active -= 1
+                seen.append(message["n"])
+                if len(seen) == 6:
+                    finished.set()
+
+        consumer = asyncio.create_task(queue.consume(callback, concurrency=2))
+        try:
+            await asyncio.wait_for(finished.wait(), timeout=5)
+        finally:
+            consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        await asyncio.sleep(0.05)
+
+        assert sorted(seen) == list(range(6))
+        assert peak == 2
+        assert await queue.redis.llen(queue.dead_letter_name) == 2
+        assert await queue.redis.llen(queue.processing_name) == 0
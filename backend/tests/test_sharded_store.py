@@ -0,0 +1,91 @@
+"""
+Unit tests for the sharded vector store wrapper.
+"""
+import pytest
+import numpy as np
+
+from app.domain.models.chunk import Chunk
+from app.domain.models.search_filter import SearchFilter
+from app.infrastructure.vector.numpy_store import NumpyVectorStore
+from app.infrastructure.vector.sharded_store import ShardedVectorStore, merge_top_k, tenant_shard
+from tests.conftest import make_chunk
+
+
+
+
+def make_store(tmp_path, **kwargs):
+    opened = []
+
+    def open_shard(name):
+        opened.append(name)
+        return NumpyVectorStore(str(tmp_path / name))
+
+    def list_shards():
+        return [path.name for path in tmp_path.iterdir() if path.is_dir()]
+
+    return ShardedVectorStore(open_shard, list_shards, **kwargs), opened
+
+
+class TestMergeTopK:
+    """Test the cross-shard merge."""
+
+    def test_merges_by_score(self):
+        """Test that the best k of several ranked lists are returned in order."""
+        a = [Chunk(id="a1", document_id="d", content="", score=0.9), Chunk(id="a2", document_id="d", content="", score=0.2)]
+        b = [Chunk(id="b1", document_id="d", content="", score=0.5)]
+
+        assert [c.id for c in merge_top_k([a, b], 2)] == ["a1", "b1"]
+
+
+@pytest.mark.asyncio
+class TestShardedStore:
+    """Test routing, scatter-gather search and lazy shard loading."""
+
+    async def test_tenant_routing_limits_searched_shards(self, tmp_path):
+        """Test that each owner gets a shard and owner filters only open those shards."""
+        store, opened = make_store(tmp_path, strategy="tenant")
+        await store.add_chunks([
+            make_chunk("alice", [1.0, 0.0], owner="alice"),
+            make_chunk("bob", [1.0, 0.0], owner="bob"),
+            make_chunk("shared", [0.5, 0.5]),
+        ])
+        store.close()
+        opened.clear()
+
+        results = await store.search([1.0, 0.0], k=5, filters=SearchFilter(owners=["alice", ""]))
+
+        assert [c.id for c in results] == ["alice", "shared"]
+        assert sorted(opened) == sorted([tenant_shard("alice"), tenant_shard("")])
+
+    async def test_hash_sharding_matches_single_index(self, tmp_path):
+        """Test that merged cross-shard results equal a search over one index."""
+        (tmp_path / "sharded").mkdir()
+        store, _ = make_store(tmp_path / "sharded", strategy="hash", num_shards=4)
+        single = NumpyVectorStore(str(tmp_path / "single"))
+        rng = np.random.default_rng(0)
+        chunks = [make_chunk(str(i), rng.normal(size=8).tolist(), source_id=f"{i}.txt") for i in range(60)]
+        await store.add_chunks(chunks)
+        await single.add_chunks(chunks)
+        queries = rng.normal(size=(3, 8)).tolist()
+
+        sharded_results = await store.search_many(queries, k=7)
+        single_results = await single.search_many(queries, k=7)
+
+        assert len(store.list_shards()) == 4
+        for got, expected in zip(sharded_results, single_results):
+            assert [c.id for c in got] == [c.id for c in expected]
+
+    async def test_idle_shards_are_closed_and_reopened(self, tmp_path):
+        """Test that at most max_open_shards stay open and evicted shards reload lazily."""
+        store, opened = make_store(tmp_path, strategy="tenant", max_open_shards=1)
+        await store.add_chunks([make_chunk("alice", [1.0, 0.0], owner="alice")])
+        await store.add_chunks([make_chunk("bob", [0.0, 1.0], document_id="doc2", source_id="b.txt", owner="bob")])
+
+        assert list(store._open) == [tenant_shard("bob")]
+
+        assert [c.id for c in await store.get_chunks(["alice"])] == ["alice"]
+        assert opened.count(tenant_shard("alice")) == 2
+        assert await store.get_source_chunks("b.txt") == {"bob": "doc2"}
+
+        await store.delete_document_chunks("doc1")
+        assert await store.search([1.0, 0.0], k=5, filters=SearchFilter(owners=["alice"])) == []
@@ -104,3 +104,64 @@ class TestDocumentMetadata:
         doc_id = f"{filename}_{timestamp}"
         
         assert doc_id == "test_document.pdf_20260117"
+
+
+class TestStreamingChunker:
+    """Test incremental chunking of streamed pages."""
+    
+    def test_streamed_chunks_respect_size(self):
+        """Test that streaming produces bounded chunks covering all text."""
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        from app.workers.document_reader import StreamingChunker
+        
+        splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=20)
+        chunker = StreamingChunker(splitter)
+        pages = [f"Page {p} sentence {i}." for p in range(5) for i in range(30)]
+        
+        chunks = []
+        for page in pages:
+            chunks.extend(chunker.feed(page, " "))
+        chunks.extend(chunker.flush())
+        
+        assert len(chunks) > 1
+        assert all(len(chunk.text) <= 100 for chunk in chunks)
+        assert "Page 4 sentence 29." in chunks[-1].text
+    
+    def test_short_stream_flushes_single_chunk(self):
+        """Test that text shorter than a chunk is emitted on flush."""
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        from app.workers.document_reader import StreamingChunker
+        
+        chunker = StreamingChunker(RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=20))
+        
+        assert chunker.feed("Short ") == []
+        assert chunker.feed("text") == []
+        assert [chunk.text for chunk in chunker.flush()] == ["Short text"]
+    
+    def test_page_numbers_and_offsets(self):
+        """Test that chunks carry their page and offsets in the stream."""
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        from app.workers.document_reader import StreamingChunker
+        
+        chunker = StreamingChunker(RecursiveCharacterTextSplitter(chunk_size=60, chunk_overlap=0))
+        pages = [" ".join(f"p{page}w{i}" for i in range(40)) for page in range(1, 4)]
+        stream = "\n".join(pages)
+        
+        chunks = []
+        for number, page in enumerate(pages, start=1):
+            chunks.extend(chunker.feed(page, "\n", number))
+        chunks.extend(chunker.flush())
+        
+        assert {chunk.page_number for chunk in chunks} == {1, 2, 3}
+        for chunk in chunks:
+            assert stream[chunk.start_offset:chunk.end_offset] == chunk.text
+            assert chunk.text.startswith(f"p{chunk.page_number}w")
+
+        # Consecutive pieces starting at the same position ("ccc", then "ccc \n a ...")
+        text = "a a \n\n \n ccc \n a bb ccc a \n \n\n"
+        chunker = StreamingChunker(RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=10))
+        chunks = chunker.feed(text, "", None) + chunker.flush()
+
+        assert [chunk.text for chunk in chunks] == ["a a", "ccc", "ccc \n a bb ccc a"]
+        for chunk in chunks:
+            assert text[chunk.start_offset:chunk.end_offset] == chunk.text
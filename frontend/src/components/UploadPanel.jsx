@@ -21,6 +21,8 @@ const UploadPanel = () => {
             const res = await axios.post('http://localhost:8000/api/v1/ingest', formData, {
                 headers: {
                     'Content-Type': 'multipart/form-data',
+                    // Uploads are private to the signed-in user
+                    ...(localStorage.getItem('token') && { Authorization: `Bearer ${localStorage.getItem('token')}` }),
                 },
             });
             setStatus("success");